@@ -13,6 +13,159 @@ class Settings:
     JWT_SECRET: str = os.getenv("JWT_SECRET")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRE_MINUTES: int = int(os.getenv("JWT_EXPIRE_MINUTES", 60))
+    # "jose" (python-jose) or "pyjwt" for decoding / verifying tokens
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose").lower()
+    # verified tokens kept decoded in memory (0 disables); entries never outlive `exp`
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", 1024))
+    JWT_CACHE_MAX_TTL: int = int(os.getenv("JWT_CACHE_MAX_TTL", 300))
+
+    # -------------------- PASSWORD HASHING CONFIG --------------------
+    # bcrypt cost; stored hashes with another cost are re-hashed on the next login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # "thread", "process" or "inline" (on the event loop)
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    # hashing calls allowed to wait for a worker before login answers 503
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+    # -------------------- FILE STORAGE CONFIG --------------------
+    # "gridfs" (default) or "local"
+    FILE_STORAGE_BACKEND: str = os.getenv("FILE_STORAGE_BACKEND", "gridfs").lower()
+    FILE_STORAGE_DIR: str = os.getenv("FILE_STORAGE_DIR", "")
+    GRIDFS_BUCKET: str = os.getenv("GRIDFS_BUCKET", "file_blobs")
+    FILE_STREAM_CHUNK_SIZE: int = int(os.getenv("FILE_STREAM_CHUNK_SIZE", 256 * 1024))
+
+    # -------------------- UPLOAD STREAMING CONFIG --------------------
+    # Peak memory per upload is roughly
+    #   UPLOAD_CHUNK_SIZE + UPLOAD_PART_SIZE * UPLOAD_MAX_CONCURRENCY
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+    # S3 multipart parts must be at least 5 MiB
+    UPLOAD_PART_SIZE: int = max(int(os.getenv("UPLOAD_PART_SIZE", 8 * 1024 * 1024)), 5 * 1024 * 1024)
+    UPLOAD_MAX_CONCURRENCY: int = int(os.getenv("UPLOAD_MAX_CONCURRENCY", 2))
+    # reuse the stored object / URL when the same bytes were uploaded before (SHA-256)
+    UPLOAD_DEDUP_ENABLED: bool = os.getenv("UPLOAD_DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # -------------------- BACKGROUND UPLOAD CONFIG --------------------
+    # `?async=true` on /upload/* stages the file locally and processes it on a queue
+    UPLOAD_ASYNC_ENABLED: bool = os.getenv("UPLOAD_ASYNC_ENABLED", "true").lower() in ("1", "true", "yes")
+    # "local": in-process asyncio workers (jobs survive restarts through `upload_jobs`)
+    UPLOAD_QUEUE_BACKEND: str = os.getenv("UPLOAD_QUEUE_BACKEND", "local").lower()
+    UPLOAD_QUEUE_WORKERS: int = int(os.getenv("UPLOAD_QUEUE_WORKERS", 2))
+    # must be on a disk shared with the workers; defaults to <repo>/storage/staging
+    UPLOAD_STAGING_DIR: str = os.getenv("UPLOAD_STAGING_DIR", "")
+    # served for a file id until its background upload has finished
+    UPLOAD_PLACEHOLDER_URL: str = os.getenv("UPLOAD_PLACEHOLDER_URL", "/uploads/processing.svg")
+    # a "processing" job not updated for this long is assumed dead and re-run
+    UPLOAD_JOB_STALE_SECONDS: int = int(os.getenv("UPLOAD_JOB_STALE_SECONDS", 15 * 60))
+    UPLOAD_JOB_RETENTION_SECONDS: int = int(os.getenv("UPLOAD_JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+    # seconds between sweeps re-delivering jobs orphaned by a crashed process (0 = off)
+    UPLOAD_JOB_SWEEP_INTERVAL: float = float(os.getenv("UPLOAD_JOB_SWEEP_INTERVAL", 60))
+
+    # -------------------- DIRECT UPLOAD CONFIG --------------------
+    # browsers upload straight to S3 with presigned URLs, then call finalize
+    DIRECT_UPLOAD_ENABLED: bool = os.getenv("DIRECT_UPLOAD_ENABLED", "true").lower() in ("1", "true", "yes")
+    # lifetime of the presigned POST / part URLs
+    DIRECT_UPLOAD_EXPIRES_SECONDS: int = int(os.getenv("DIRECT_UPLOAD_EXPIRES_SECONDS", 3600))
+    DIRECT_UPLOAD_MAX_BYTES: int = int(os.getenv("DIRECT_UPLOAD_MAX_BYTES", 5 * 1024 ** 3))
+    # files this size or larger go up as S3 multipart uploads, in parts of DIRECT_UPLOAD_PART_SIZE
+    DIRECT_UPLOAD_MULTIPART_THRESHOLD: int = int(os.getenv("DIRECT_UPLOAD_MULTIPART_THRESHOLD", 64 * 1024 * 1024))
+    DIRECT_UPLOAD_PART_SIZE: int = max(int(os.getenv("DIRECT_UPLOAD_PART_SIZE", 32 * 1024 * 1024)), 5 * 1024 * 1024)
+
+    # -------------------- STORAGE CLIENT CONFIG --------------------
+    # threads available to blocking S3 / Cloudinary SDK calls
+    STORAGE_MAX_WORKERS: int = int(os.getenv("STORAGE_MAX_WORKERS", 8))
+    # HTTP connections kept alive by the shared S3 client
+    STORAGE_MAX_POOL_CONNECTIONS: int = int(os.getenv("STORAGE_MAX_POOL_CONNECTIONS", 20))
+
+    # -------------------- RESPONSE CACHE CONFIG --------------------
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))
+    # shared tier for multi-worker deploys: "redis://host:6379/0" (needs the
+    # `redis` package) or "memory://" for the in-process stand-in
+    RESPONSE_CACHE_REDIS_URL: str = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+
+    # -------------------- PAGINATION CONFIG --------------------
+    # `count=estimated` on a filtered query stops counting here (the total is
+    # then a lower bound)
+    PAGINATION_COUNT_CAP: int = int(os.getenv("PAGINATION_COUNT_CAP", 10000))
+
+    # -------------------- INDEX CONFIG --------------------
+    # "apply" builds missing indexes at startup, "verify" only logs the
+    # report, "off" skips both (use `manage-indexes apply` for big collections)
+    INDEXES_ON_STARTUP: str = os.getenv("INDEXES_ON_STARTUP", "apply").lower()
+
+    # -------------------- HYDRATION CONFIG --------------------
+    # resolve /industries/url/ links with one $lookup aggregation instead of
+    # per-document queries
+    INDUSTRY_LOOKUP_HYDRATION: bool = os.getenv("INDUSTRY_LOOKUP_HYDRATION", "true").lower() in ("1", "true", "yes")
+
+    # -------------------- IMAGE VARIANT CONFIG --------------------
+    # resized / re-encoded copies of uploaded images (needs Pillow)
+    IMAGE_VARIANTS_ENABLED: bool = os.getenv("IMAGE_VARIANTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    IMAGE_VARIANT_WIDTHS: list = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,480,960,1600").split(",") if w.strip()]
+    # formats the installed Pillow cannot write are skipped
+    IMAGE_VARIANT_FORMATS: list = [f.strip().lower() for f in os.getenv("IMAGE_VARIANT_FORMATS", "webp,avif").split(",") if f.strip()]
+    IMAGE_VARIANT_QUALITY: int = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+    IMAGE_VARIANT_WORKERS: int = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))
+    IMAGE_VARIANT_PREFIX: str = os.getenv("IMAGE_VARIANT_PREFIX", "images/variants")
+    # decompression-bomb guard
+    IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", 50_000_000))
+
+    # -------------------- SEARCH CONFIG --------------------
+    # seconds between checks of catalog_versions for writes to re-index
+    SEARCH_REFRESH_INTERVAL: float = float(os.getenv("SEARCH_REFRESH_INTERVAL", 1.0))
+    # vocabulary terms a typeahead prefix may expand to
+    SEARCH_MAX_PREFIX_TERMS: int = int(os.getenv("SEARCH_MAX_PREFIX_TERMS", 50))
+    SEARCH_MAX_LIMIT: int = int(os.getenv("SEARCH_MAX_LIMIT", 50))
+    SEARCH_SNIPPET_LENGTH: int = int(os.getenv("SEARCH_SNIPPET_LENGTH", 160))
+
+    # -------------------- SPEC INDEX CONFIG --------------------
+    # /products/filter answered from an in-memory bitmap index (with facet counts)
+    SPEC_INDEX_ENABLED: bool = os.getenv("SPEC_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+    # seconds between checks of the products catalog version for writes to re-index
+    SPEC_INDEX_REFRESH_INTERVAL: float = float(os.getenv("SPEC_INDEX_REFRESH_INTERVAL", 1.0))
+
+    # -------------------- METRICS CONFIG --------------------
+    # request / upload / Mongo command metrics, served in Prometheus format on /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # when set, /metrics wants "Authorization: Bearer <token>"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # -------------------- QUERY TRACE CONFIG --------------------
+    # dev / CI: per-request Mongo command counts in X-Query-Count / X-DB-Time headers
+    QUERY_TRACE_ENABLED: bool = os.getenv("QUERY_TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+    # single-document finds on one collection, in one request, reported as a likely N+1
+    QUERY_TRACE_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_TRACE_REPEAT_THRESHOLD", 5))
+    # most Mongo commands a request may make (0 = no budget); "warn" logs, "fail" answers 500
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", 0))
+    QUERY_BUDGET_ACTION: str = os.getenv("QUERY_BUDGET_ACTION", "warn")
+
+    # -------------------- NOTIFICATION CONFIG --------------------
+    # queue notifications in-process and write them with insert_many
+    NOTIFICATION_WRITE_BEHIND: bool = os.getenv("NOTIFICATION_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+    NOTIFICATION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", 100))
+    # seconds a queued notification may wait for its batch to fill up
+    NOTIFICATION_FLUSH_INTERVAL: float = float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", 1.0))
+    # beyond this many pending notifications new ones are dropped (and counted)
+    NOTIFICATION_QUEUE_MAX: int = int(os.getenv("NOTIFICATION_QUEUE_MAX", 10_000))
+    NOTIFICATION_FLUSH_RETRIES: int = int(os.getenv("NOTIFICATION_FLUSH_RETRIES", 3))
+    NOTIFICATION_SHUTDOWN_TIMEOUT: float = float(os.getenv("NOTIFICATION_SHUTDOWN_TIMEOUT", 10.0))
+    # retention: read notifications expire (TTL), anything older is moved to
+    # `notifications_archive` by `archive-notifications`, which expires too
+    NOTIFICATION_READ_TTL_DAYS: int = int(os.getenv("NOTIFICATION_READ_TTL_DAYS", 30))
+    NOTIFICATION_ARCHIVE_AFTER_DAYS: int = int(os.getenv("NOTIFICATION_ARCHIVE_AFTER_DAYS", 90))
+    NOTIFICATION_ARCHIVE_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_ARCHIVE_RETENTION_DAYS", 365))
+
+    # -------------------- NOTIFICATION STREAM CONFIG --------------------
+    # "memory" (single worker) or "changestream" (Mongo replica set, any number of workers)
+    NOTIFICATION_BROKER: str = os.getenv("NOTIFICATION_BROKER", "memory")
+    NOTIFICATION_STREAM_HEARTBEAT: float = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", 15.0))
+    # events a slow connection may fall behind before it is closed (it resumes from Mongo)
+    NOTIFICATION_STREAM_QUEUE: int = int(os.getenv("NOTIFICATION_STREAM_QUEUE", 100))
+    # most notifications replayed after Last-Event-ID on reconnect
+    NOTIFICATION_STREAM_BACKLOG: int = int(os.getenv("NOTIFICATION_STREAM_BACKLOG", 100))
+    NOTIFICATION_STREAM_RETRY_MS: int = int(os.getenv("NOTIFICATION_STREAM_RETRY_MS", 3000))
 
 
 # Global instance
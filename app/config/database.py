@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from .config import settings
+from app.core.metrics import mongo_command_metrics
+from app.core.query_tracer import query_trace_listener
 
 server_timeout = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
 connect_timeout = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
@@ -11,5 +13,6 @@ client = AsyncIOMotorClient(
     serverSelectionTimeoutMS=server_timeout,
     connectTimeoutMS=connect_timeout,
     socketTimeoutMS=socket_timeout,
+    event_listeners=[mongo_command_metrics, query_trace_listener],
 )
 db = client[settings.DB_NAME]
@@ -1,139 +1,416 @@
-from fastapi import APIRouter, UploadFile, File,Depends,HTTPException, Request
+from fastapi import APIRouter, UploadFile, File,Depends,HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import Headers
 from app.repository.upload_repository import UploadRepository
 from app.services.auth_dependency import verify_user
 from app.repository.file_url_repository import FileUrlRepository
-from app.services.cloudinary_service import upload_to_cloudinary
+from app.repository.content_hash_repository import ContentHashRepository
+from app.repository.upload_job_repository import UploadJobRepository
+from app.config.config import settings
+from app.services.cloudinary_service import upload_to_cloudinary, s3_configured, s3_object_key, s3_object_url
+from app.services import direct_upload
+from app.services.storage_clients import storage_clients
+from app.repository.direct_upload_repository import DirectUploadRepository
+from app.schemas.upload_schema import DirectUploadCreate, DirectUploadFinalize
+from app.core.metrics import UPLOAD_BYTES
+from app.services.file_storage import get_file_storage
+from app.services.upload_stream import SpooledSource
+from app.services.upload_queue import JobProgress, create_upload_queue, discard_staged, stage_upload, tracked
+from app.services.image_variants import generate_image_variants
+from app.services.file_resolver import absolute_url, variant_list
 from uuid import uuid4
+from urllib.parse import quote
+import mimetypes
 import os
 import asyncio
 import logging
 router = APIRouter()
 
+# job steps per upload kind; a job is done once its result is saved
+UPLOAD_STEPS = {
+    "image": ("hash", "cloud", "storage", "variants", "finalize"),
+    "doc": ("hash", "cloud", "storage", "finalize"),
+    "video": ("hash", "cloud", "finalize"),
+    "3d-model": ("hash", "cloud", "finalize"),
+}
 
-@router.post("/upload/images", dependencies=[Depends(verify_user)])
-async def upload_images(request: Request, files: list[UploadFile] = File(...), category: str | None = None):
-    async def process_file(file: UploadFile):
-        file_bytes = await file.read()
-        cloud_task = asyncio.create_task(upload_to_cloudinary(
-            file_bytes,
-            file.filename,
-            resource_type="image",
-            key_prefix=category
-        ))
-        save_task = asyncio.create_task(UploadRepository.save_file(
-            file.filename,
-            file_bytes
-        ))
-        cloud_res, save_res = await asyncio.gather(cloud_task, save_task, return_exceptions=True)
-        cloud_url = cloud_res if not isinstance(cloud_res, Exception) else ""
-        if isinstance(cloud_res, Exception):
-            logging.exception(f"Cloud upload exception filename={file.filename} category={category}")
-        require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
-        if require_s3 and (not cloud_url or (isinstance(cloud_url, str) and cloud_url.startswith("/"))):
-            raise HTTPException(status_code=500, detail="S3 upload failed")
-        if isinstance(save_res, Exception):
-            logging.error(f"UploadRepository.save_file failed: {save_res}")
-            file_id = str(uuid4())
-        else:
-            file_id = save_res
-        try:
-            await FileUrlRepository.save_url(
-                file_id=file_id,
-                filename=file.filename,
-                url=cloud_url,
-                file_type="image"
-            )
-        except Exception as e:
-            logging.error(f"FileUrlRepository.save_url failed: {e}")
-        absolute_cloudinary_url = cloud_url if not isinstance(cloud_url, str) or not cloud_url.startswith("/") else (str(request.base_url) + cloud_url.lstrip("/"))
-        return {
-            "id": file_id,
-            "filename": file.filename,
-            "cloudinary_url": absolute_cloudinary_url,
-            "url": absolute_cloudinary_url
-        }
-    tasks = [process_file(f) for f in files]
-    return await asyncio.gather(*tasks)
 
-@router.post("/upload/docs", dependencies=[Depends(verify_user)])
-async def upload_docs(request: Request, files: list[UploadFile] = File(...), category: str | None = None):
-    async def process_file(file: UploadFile):
-        file_bytes = await file.read()
-        cloud_task = asyncio.create_task(upload_to_cloudinary(
-            file_bytes,
-            file.filename,
-            resource_type="raw",
-            key_prefix=category
-        ))
-        save_task = asyncio.create_task(UploadRepository.save_file(
-            file.filename,
-            file_bytes
-        ))
-        cloud_res, save_res = await asyncio.gather(cloud_task, save_task, return_exceptions=True)
-        cloud_url = cloud_res if not isinstance(cloud_res, Exception) else ""
-        if isinstance(cloud_res, Exception):
-            logging.exception(f"Cloud upload exception filename={file.filename} category={category}")
-        require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
-        if require_s3 and (not cloud_url or (isinstance(cloud_url, str) and cloud_url.startswith("/"))):
-            raise HTTPException(status_code=500, detail="S3 upload failed")
-        if isinstance(save_res, Exception):
-            logging.error(f"UploadRepository.save_file failed: {save_res}")
-            file_id = str(uuid4())
+async def find_duplicate(source: SpooledSource, need_blob: bool = False):
+    """
+    Hashes the spooled upload and takes a reference on matching content that
+    was stored before. Returns (sha256, content record or None).
+    """
+    if not settings.UPLOAD_DEDUP_ENABLED:
+        return None, None
+    try:
+        sha256 = await asyncio.to_thread(source.sha256)
+        return sha256, await ContentHashRepository.acquire(sha256, need_blob)
+    except Exception as e:
+        logging.error(f"Upload dedup lookup failed filename={source.filename}: {e}")
+        return None, None
+
+
+async def save_duplicate(file: UploadFile, content: dict, file_type: str, keep_blob: bool = True, file_id: str | None = None):
+    """New file id (and `file_urls` entry) for content that is already stored."""
+    try:
+        if keep_blob:
+            file_id = await UploadRepository.save_reference(file.filename, content, file.content_type, file_id=file_id)
         else:
-            file_id = save_res
-        try:
-            await FileUrlRepository.save_url(
-                file_id,
-                file.filename,
-                cloud_url,
-                "doc"
-            )
-        except Exception as e:
-            logging.error(f"FileUrlRepository.save_url failed: {e}")
-        absolute_cloudinary_url = cloud_url if not isinstance(cloud_url, str) or not cloud_url.startswith("/") else (str(request.base_url) + cloud_url.lstrip("/"))
-        return {
-            "id": file_id,
-            "filename": file.filename,
-            "cloudinary_url": absolute_cloudinary_url,
-            "url": absolute_cloudinary_url
-        }
-    tasks = [process_file(f) for f in files]
-    return await asyncio.gather(*tasks)
+            file_id = file_id or str(uuid4())
+        await FileUrlRepository.save_url(
+            file_id=file_id,
+            filename=file.filename,
+            url=content["url"],
+            file_type=file_type
+        )
+        if content.get("variants"):
+            await FileUrlRepository.save_variants(file_id, content["variants"])
+    except Exception:
+        await ContentHashRepository.release(content["_id"])
+        raise
+    return file_id
 
-@router.post("/upload/videos", dependencies=[Depends(verify_user)])
-async def upload_videos(request: Request, files: list[UploadFile] = File(...), category: str | None = None):
-    async def process_file(file: UploadFile):
-        file_bytes = await file.read()
-        cloud_url = await upload_to_cloudinary(
-            file_bytes,
+
+async def register_content(sha256: str | None, url, blob_id: str | None = None, variants: list | None = None):
+    if not sha256 or not url or isinstance(url, Exception):
+        return
+    try:
+        meta = await UploadRepository.get_file_meta(blob_id) if blob_id else None
+        await ContentHashRepository.register(
+            sha256,
+            url,
+            blob_id=blob_id if meta else None,
+            storage=meta.get("storage") if meta else None,
+            length=meta.get("length") if meta else None,
+            content_type=meta.get("content_type") if meta else None,
+            variants=variants,
+        )
+    except Exception as e:
+        logging.error(f"ContentHashRepository.register failed: {e}")
+
+
+def stored_file(file_id: str, filename: str, url, variants: list | None = None):
+    res = {"id": file_id, "filename": filename, "url": url}
+    if variants:
+        res["variants"] = variants
+    return res
+
+
+def upload_response(request: Request, stored: dict):
+    url = absolute_url(stored["url"], request)
+    res = {
+        "id": stored["id"],
+        "filename": stored["filename"],
+        "cloudinary_url": url,
+        "url": url
+    }
+    if stored.get("variants"):
+        res["variants"] = variant_list(stored, request)
+    return res
+
+
+def check_cloud_url(cloud_url):
+    require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
+    if require_s3 and (not cloud_url or (isinstance(cloud_url, str) and cloud_url.startswith("/"))):
+        raise HTTPException(status_code=500, detail="S3 upload failed")
+
+
+# ---------------- processing (request handler or background job) ----------------
+async def store_image(file: UploadFile, category: str | None = None, file_id: str | None = None, progress: JobProgress | None = None):
+    source = SpooledSource(file)
+    sha256, duplicate = await tracked(progress, "hash", find_duplicate(source, need_blob=True))
+    if duplicate:
+        file_id = await save_duplicate(file, duplicate, "image", file_id=file_id)
+        return stored_file(file_id, file.filename, duplicate["url"], duplicate.get("variants"))
+    cloud_task = asyncio.create_task(tracked(progress, "cloud", upload_to_cloudinary(
+        source,
+        file.filename,
+        resource_type="image",
+        key_prefix=category
+    )))
+    save_task = asyncio.create_task(tracked(progress, "storage", UploadRepository.save_file(
+        file.filename,
+        source.chunks(),
+        content_type=file.content_type,
+        sha256=sha256,
+        file_id=file_id
+    )))
+    variants_task = asyncio.create_task(tracked(progress, "variants", generate_image_variants(
+        source,
+        file.filename,
+        key_prefix=category
+    )))
+    cloud_res, save_res, variants = await asyncio.gather(cloud_task, save_task, variants_task, return_exceptions=True)
+    cloud_url = cloud_res if not isinstance(cloud_res, Exception) else ""
+    if isinstance(cloud_res, Exception):
+        logging.exception(f"Cloud upload exception filename={file.filename} category={category}")
+    check_cloud_url(cloud_url)
+    if isinstance(save_res, Exception):
+        logging.error(f"UploadRepository.save_file failed: {save_res}")
+        file_id = file_id or str(uuid4())
+    else:
+        file_id = save_res
+    if isinstance(variants, Exception):
+        logging.error(f"Image variants failed filename={file.filename}: {variants}")
+        variants = []
+    try:
+        await FileUrlRepository.save_url(
+            file_id=file_id,
+            filename=file.filename,
+            url=cloud_url,
+            file_type="image"
+        )
+        if variants:
+            await FileUrlRepository.save_variants(file_id, variants)
+    except Exception as e:
+        logging.error(f"FileUrlRepository.save_url failed: {e}")
+    if not isinstance(save_res, Exception):
+        await register_content(sha256, cloud_url, blob_id=file_id, variants=variants)
+    return stored_file(file_id, file.filename, cloud_url, variants)
+
+
+async def store_doc(file: UploadFile, category: str | None = None, file_id: str | None = None, progress: JobProgress | None = None):
+    source = SpooledSource(file)
+    sha256, duplicate = await tracked(progress, "hash", find_duplicate(source, need_blob=True))
+    if duplicate:
+        file_id = await save_duplicate(file, duplicate, "doc", file_id=file_id)
+        return stored_file(file_id, file.filename, duplicate["url"])
+    cloud_task = asyncio.create_task(tracked(progress, "cloud", upload_to_cloudinary(
+        source,
+        file.filename,
+        resource_type="raw",
+        key_prefix=category
+    )))
+    save_task = asyncio.create_task(tracked(progress, "storage", UploadRepository.save_file(
+        file.filename,
+        source.chunks(),
+        content_type=file.content_type,
+        sha256=sha256,
+        file_id=file_id
+    )))
+    cloud_res, save_res = await asyncio.gather(cloud_task, save_task, return_exceptions=True)
+    cloud_url = cloud_res if not isinstance(cloud_res, Exception) else ""
+    if isinstance(cloud_res, Exception):
+        logging.exception(f"Cloud upload exception filename={file.filename} category={category}")
+    check_cloud_url(cloud_url)
+    if isinstance(save_res, Exception):
+        logging.error(f"UploadRepository.save_file failed: {save_res}")
+        file_id = file_id or str(uuid4())
+    else:
+        file_id = save_res
+    try:
+        await FileUrlRepository.save_url(
+            file_id,
             file.filename,
-            resource_type="video",
-            key_prefix=category
+            cloud_url,
+            "doc"
+        )
+    except Exception as e:
+        logging.error(f"FileUrlRepository.save_url failed: {e}")
+    if not isinstance(save_res, Exception):
+        await register_content(sha256, cloud_url, blob_id=file_id)
+    return stored_file(file_id, file.filename, cloud_url)
+
+
+async def store_video(file: UploadFile, category: str | None = None, file_id: str | None = None, progress: JobProgress | None = None):
+    source = SpooledSource(file)
+    sha256, duplicate = await tracked(progress, "hash", find_duplicate(source))
+    if duplicate:
+        file_id = await save_duplicate(file, duplicate, "video", keep_blob=False, file_id=file_id)
+        return stored_file(file_id, file.filename, duplicate["url"])
+    cloud_url = await tracked(progress, "cloud", upload_to_cloudinary(
+        source,
+        file.filename,
+        resource_type="video",
+        key_prefix=category
+    ))
+    if not cloud_url:
+        logging.error(f"Cloud upload returned empty url filename={file.filename} category={category}")
+    check_cloud_url(cloud_url)
+    file_id = file_id or str(uuid4())
+    try:
+        await FileUrlRepository.save_url(
+            file_id=file_id,
+            filename=file.filename,
+            url=cloud_url,
+            file_type="video"
+        )
+    except Exception as e:
+        logging.error(f"FileUrlRepository.save_url failed: {e}")
+    await register_content(sha256, cloud_url)
+    return stored_file(file_id, file.filename, cloud_url)
+
+
+async def store_3d_model(file: UploadFile, category: str | None = None, file_id: str | None = None, progress: JobProgress | None = None):
+    # 1️⃣ Stream from the spooled upload (never held in memory)
+    source = SpooledSource(file)
+    sha256, duplicate = await tracked(progress, "hash", find_duplicate(source))
+    if duplicate:
+        file_id = await save_duplicate(file, duplicate, "3d-model", keep_blob=False, file_id=file_id)
+        return stored_file(file_id, file.filename, duplicate["url"])
+
+    # 2️⃣ Upload as RAW (important for GLB)
+    cloud_url = await tracked(progress, "cloud", upload_to_cloudinary(
+        source,
+        file.filename,
+        resource_type="raw",
+        key_prefix=category or "product-3d-models"
+    ))
+
+    if not cloud_url:
+        logging.error(
+            f"Cloud upload returned empty url filename={file.filename} category={category}"
+        )
+
+    # 3️⃣ Optional S3 safety
+    check_cloud_url(cloud_url)
+
+    # 4️⃣ Generate file ID
+    file_id = file_id or str(uuid4())
+
+    # 5️⃣ Save URL mapping
+    try:
+        await FileUrlRepository.save_url(
+            file_id=file_id,
+            filename=file.filename,
+            url=cloud_url,
+            file_type="3d-model"
+        )
+    except Exception as e:
+        logging.error(f"FileUrlRepository.save_url failed: {e}")
+    await register_content(sha256, cloud_url)
+    return stored_file(file_id, file.filename, cloud_url)
+
+
+STORE_UPLOAD = {
+    "image": store_image,
+    "doc": store_doc,
+    "video": store_video,
+    "3d-model": store_3d_model,
+}
+
+
+# ---------------- background mode (?async=true) ----------------
+def check_async_mode(async_mode: bool):
+    if async_mode and not settings.UPLOAD_ASYNC_ENABLED:
+        raise HTTPException(status_code=400, detail="Background uploads are disabled")
+
+
+async def accept_upload(request: Request, file: UploadFile, kind: str, category: str | None = None):
+    """
+    Stages the bytes locally, points the new file id at the placeholder URL
+    and queues the real upload. Responds as soon as the copy is on disk.
+    """
+    file_id = str(uuid4())
+    staged_path = await stage_upload(file_id, SpooledSource(file))
+    try:
+        await FileUrlRepository.save_url(
+            file_id=file_id,
+            filename=file.filename,
+            url=settings.UPLOAD_PLACEHOLDER_URL,
+            file_type=kind,
+            status="processing"
         )
-        if not cloud_url:
-            logging.error(f"Cloud upload returned empty url filename={file.filename} category={category}")
-        require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
-        if require_s3 and (not cloud_url or (isinstance(cloud_url, str) and cloud_url.startswith("/"))):
-            raise HTTPException(status_code=500, detail="S3 upload failed")
-        file_id = str(uuid4())
+        await UploadJobRepository.create_job({
+            "_id": file_id,
+            "kind": kind,
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "category": category,
+            "staged_path": staged_path,
+            "size": os.path.getsize(staged_path),
+        })
+        await upload_queue.enqueue(file_id)
+    except Exception:
+        await discard_staged(staged_path)
+        raise
+    placeholder = absolute_url(settings.UPLOAD_PLACEHOLDER_URL, request)
+    return {
+        "id": file_id,
+        "filename": file.filename,
+        "status": "queued",
+        "status_url": absolute_url(f"/upload/status/{file_id}", request),
+        "cloudinary_url": placeholder,
+        "url": placeholder
+    }
+
+
+async def process_upload_job(job: dict):
+    file_id, kind = job["_id"], job["kind"]
+    path = job["staged_path"]
+    try:
+        if job["status"] == "processing" or job.get("interrupted"):
+            # interrupted by a restart: drop whatever the last attempt stored and redo it
+            await UploadRepository.delete_file(file_id)
+            await get_file_storage().delete(file_id)
+        fh = await asyncio.to_thread(open, path, "rb")
         try:
-            await FileUrlRepository.save_url(
-                file_id=file_id,
-                filename=file.filename,
-                url=cloud_url,
-                file_type="video"
+            headers = Headers({"content-type": job["content_type"]}) if job.get("content_type") else None
+            file = UploadFile(fh, filename=job["filename"], headers=headers)
+            stored = await STORE_UPLOAD[kind](
+                file, job.get("category"), file_id=file_id, progress=JobProgress(file_id, UPLOAD_STEPS[kind])
             )
-        except Exception as e:
-            logging.error(f"FileUrlRepository.save_url failed: {e}")
-        absolute_cloudinary_url = cloud_url if not isinstance(cloud_url, str) or not cloud_url.startswith("/") else (str(request.base_url) + cloud_url.lstrip("/"))
-        return {
-            "id": file_id,
-            "filename": file.filename,
-            "cloudinary_url": absolute_cloudinary_url,
-            "url": absolute_cloudinary_url
-        }
-    tasks = [process_file(f) for f in files]
-    data = await asyncio.gather(*tasks)
+        finally:
+            fh.close()
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e) or type(e).__name__
+        logging.exception(f"Background upload failed file_id={file_id} filename={job['filename']}")
+        try:
+            await FileUrlRepository.save_url(file_id, job["filename"], "", kind)
+        finally:
+            # a job left "processing" would be requeued by the sweep and fail the same way
+            await UploadJobRepository.finish_job(file_id, "failed", error=error)
+            await discard_staged(path)
+        return
+    await UploadJobRepository.finish_job(
+        file_id, "done", result={"url": stored["url"], "variants": stored.get("variants") or []}
+    )
+    await discard_staged(path)
+
+
+upload_queue = create_upload_queue(process_upload_job)
+
+
+# ---------------- endpoints ----------------
+@router.post("/upload/images", dependencies=[Depends(verify_user)])
+async def upload_images(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    category: str | None = None,
+    async_mode: bool = Query(False, alias="async")
+):
+    check_async_mode(async_mode)
+    if async_mode:
+        return await asyncio.gather(*[accept_upload(request, f, "image", category) for f in files])
+    stored = await asyncio.gather(*[store_image(f, category) for f in files])
+    return [upload_response(request, s) for s in stored]
+
+@router.post("/upload/docs", dependencies=[Depends(verify_user)])
+async def upload_docs(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    category: str | None = None,
+    async_mode: bool = Query(False, alias="async")
+):
+    check_async_mode(async_mode)
+    if async_mode:
+        return await asyncio.gather(*[accept_upload(request, f, "doc", category) for f in files])
+    stored = await asyncio.gather(*[store_doc(f, category) for f in files])
+    return [upload_response(request, s) for s in stored]
+
+@router.post("/upload/videos", dependencies=[Depends(verify_user)])
+async def upload_videos(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    category: str | None = None,
+    async_mode: bool = Query(False, alias="async")
+):
+    check_async_mode(async_mode)
+    if async_mode:
+        data = await asyncio.gather(*[accept_upload(request, f, "video", category) for f in files])
+    else:
+        stored = await asyncio.gather(*[store_video(f, category) for f in files])
+        data = [upload_response(request, s) for s in stored]
     return {"success": True, "data": data}
 
 
@@ -142,12 +419,13 @@ async def upload_videos(request: Request, files: list[UploadFile] = File(...), c
 async def upload_3d_models(
     request: Request,
     files: list[UploadFile] = File(...),
-    category: str | None = None
+    category: str | None = None,
+    async_mode: bool = Query(False, alias="async")
 ):
     ALLOWED_EXTENSIONS = {".glb"}
 
-    async def process_file(file: UploadFile):
-        # 1️⃣ Validate extension
+    # Validate extensions before anything is uploaded or queued
+    for file in files:
         ext = os.path.splitext(file.filename)[1].lower()
         if ext not in ALLOWED_EXTENSIONS:
             raise HTTPException(
@@ -155,74 +433,267 @@ async def upload_3d_models(
                 detail="Only .glb files are allowed"
             )
 
-        # 2️⃣ Read file
-        file_bytes = await file.read()
+    check_async_mode(async_mode)
+    if async_mode:
+        data = await asyncio.gather(*[accept_upload(request, f, "3d-model", category) for f in files])
+    else:
+        stored = await asyncio.gather(*[store_3d_model(f, category) for f in files])
+        data = [upload_response(request, s) for s in stored]
 
-        # 3️⃣ Upload as RAW (important for GLB)
-        cloud_url = await upload_to_cloudinary(
-            file_bytes,
-            file.filename,
-            resource_type="raw",
-            key_prefix=category or "product-3d-models"
-        )
+    return {
+        "success": True,
+        "data": data
+    }
+
+# ---------------- direct-to-S3 uploads ----------------
+def direct_upload_target():
+    if not settings.DIRECT_UPLOAD_ENABLED:
+        raise HTTPException(status_code=404, detail="Direct uploads are disabled")
+    if not s3_configured():
+        raise HTTPException(status_code=501, detail="Direct uploads need S3 storage")
+    return storage_clients.s3_client(), os.environ["AWS_S3_BUCKET"]
+
+
+async def get_direct_upload(file_id: str, request: Request):
+    upload = await DirectUploadRepository.get(file_id)
+    if not upload or upload.get("created_by") != request.state.user or upload.get("finalized_url"):
+        raise HTTPException(404, "Upload not found")
+    return upload
 
-        if not cloud_url:
-            logging.error(
-                f"Cloud upload returned empty url filename={file.filename} category={category}"
-            )
 
-        # 4️⃣ Optional S3 safety
-        require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
-        if require_s3 and (
-            not cloud_url or
-            (isinstance(cloud_url, str) and cloud_url.startswith("/"))
-        ):
-            raise HTTPException(status_code=500, detail="S3 upload failed")
+@router.post("/upload/direct", dependencies=[Depends(verify_user)])
+async def create_direct_upload(body: DirectUploadCreate, request: Request):
+    """
+    Presigned upload straight to S3. Below DIRECT_UPLOAD_MULTIPART_THRESHOLD
+    the browser POSTs the form `fields` plus the file to `url`; above it,
+    it PUTs each slice of `part_size` bytes to its part URL. Either way it
+    then calls `finalize_url`.
+    """
+    s3, bucket = direct_upload_target()
+    if not direct_upload.check_extension(body.kind, body.filename):
+        raise HTTPException(status_code=400, detail="Only .glb files are allowed")
+    if body.size > settings.DIRECT_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Files are limited to {settings.DIRECT_UPLOAD_MAX_BYTES} bytes")
+
+    resource_type, default_prefix, _ = direct_upload.DIRECT_UPLOAD_KINDS[body.kind]
+    key = s3_object_key(body.filename, resource_type, body.category or default_prefix)
+    content_type = body.content_type or mimetypes.guess_type(body.filename)[0] or "application/octet-stream"
+    expires = settings.DIRECT_UPLOAD_EXPIRES_SECONDS
+    file_id = str(uuid4())
+    record = {
+        "_id": file_id,
+        "kind": body.kind,
+        "filename": body.filename,
+        "content_type": content_type,
+        "size": body.size,
+        "bucket": bucket,
+        "key": key,
+        "created_by": request.state.user,
+    }
+    res = {
+        "id": file_id,
+        "key": key,
+        "expires_in": expires,
+        "finalize_url": absolute_url(f"/upload/direct/{file_id}/finalize", request),
+    }
+    if body.size >= settings.DIRECT_UPLOAD_MULTIPART_THRESHOLD:
+        part_size, count = direct_upload.part_plan(body.size, settings.DIRECT_UPLOAD_PART_SIZE)
+        upload_id, parts = await storage_clients.run(
+            direct_upload.start_multipart, s3, bucket, key, content_type, count, expires
+        )
+        record.update(upload_id=upload_id, part_size=part_size, part_count=count)
+        res.update(method="PUT", multipart=True, part_size=part_size, parts=parts)
+    else:
+        post = await storage_clients.run(direct_upload.presign_post, s3, bucket, key, content_type, body.size, expires)
+        res.update(method="POST", multipart=False, url=post["url"], fields=post["fields"])
+    await DirectUploadRepository.create(record)
+    return res
 
-        # 5️⃣ Generate file ID
-        file_id = str(uuid4())
 
-        # 6️⃣ Save URL mapping
+@router.post("/upload/direct/{file_id}/finalize", dependencies=[Depends(verify_user)])
+async def finalize_direct_upload(file_id: str, request: Request, body: DirectUploadFinalize | None = None):
+    upload = await DirectUploadRepository.get(file_id)
+    if not upload or upload.get("created_by") != request.state.user:
+        raise HTTPException(404, "Upload not found")
+    if upload.get("finalized_url"):
+        # a retried request: answer with what was recorded
+        return upload_response(request, stored_file(file_id, upload["filename"], upload["finalized_url"]))
+
+    s3, _ = direct_upload_target()
+    bucket, key = upload["bucket"], upload["key"]
+    if upload.get("upload_id"):
+        parts = [p.model_dump() for p in body.parts] if body and body.parts else None
         try:
-            await FileUrlRepository.save_url(
-                file_id=file_id,
-                filename=file.filename,
-                url=cloud_url,
-                file_type="3d-model"
+            completed = await storage_clients.run(
+                direct_upload.complete_multipart, s3, bucket, key, upload["upload_id"], upload["part_count"], parts
             )
         except Exception as e:
-            logging.error(f"FileUrlRepository.save_url failed: {e}")
+            # also what a retry gets once S3 has completed the upload
+            logging.error(f"Completing multipart upload failed file_id={file_id} key={key}: {e}")
+            completed = await storage_clients.run(direct_upload.object_size, s3, bucket, key) is not None
+        if not completed:
+            raise HTTPException(status_code=409, detail="Upload is incomplete; send every part, then finalize again")
 
-        # 7️⃣ Normalize URL
-        absolute_cloudinary_url = (
-            cloud_url
-            if not isinstance(cloud_url, str) or not cloud_url.startswith("/")
-            else str(request.base_url) + cloud_url.lstrip("/")
-        )
+    size = await storage_clients.run(direct_upload.object_size, s3, bucket, key)
+    if size is None:
+        raise HTTPException(status_code=409, detail="The file has not been uploaded yet")
+    if size != upload["size"]:
+        await storage_clients.run(direct_upload.delete_object, s3, bucket, key)
+        await DirectUploadRepository.delete(file_id)
+        raise HTTPException(status_code=422, detail=f"Uploaded {size} bytes, {upload['size']} were declared")
 
-        return {
+    url = s3_object_url(s3, bucket, key)
+    await FileUrlRepository.save_url(
+        file_id=file_id,
+        filename=upload["filename"],
+        url=url,
+        file_type=upload["kind"]
+    )
+    await DirectUploadRepository.mark_finalized(file_id, url)
+    UPLOAD_BYTES.inc(size, backend="s3_direct")
+    return upload_response(request, stored_file(file_id, upload["filename"], url))
+
+
+@router.delete("/upload/direct/{file_id}", dependencies=[Depends(verify_user)])
+async def cancel_direct_upload(file_id: str, request: Request):
+    upload = await get_direct_upload(file_id, request)
+    s3, _ = direct_upload_target()
+    if upload.get("upload_id"):
+        await storage_clients.run(direct_upload.abort_multipart, s3, upload["bucket"], upload["key"], upload["upload_id"])
+    else:
+        await storage_clients.run(direct_upload.delete_object, s3, upload["bucket"], upload["key"])
+    await DirectUploadRepository.delete(file_id)
+    return {"success": True}
+
+
+@router.get("/upload/status/{file_id}", dependencies=[Depends(verify_user)])
+async def upload_status(file_id: str, request: Request):
+    job = await UploadJobRepository.get_job(file_id)
+    if not job:
+        # uploaded synchronously (or before background mode existed)
+        url_doc = await FileUrlRepository.get_url_by_file_id(file_id)
+        if not url_doc:
+            raise HTTPException(404, "Upload not found")
+        res = {
             "id": file_id,
-            "filename": file.filename,
-            "cloudinary_url": absolute_cloudinary_url,
-            "url": absolute_cloudinary_url
+            "filename": url_doc.get("filename"),
+            "kind": url_doc.get("type"),
+            "status": "done",
+            "progress": 1.0,
+            "url": absolute_url(url_doc.get("url"), request),
         }
+        if url_doc.get("variants"):
+            res["variants"] = variant_list(url_doc, request)
+        return res
 
-    tasks = [process_file(f) for f in files]
-    data = await asyncio.gather(*tasks)
-
-    return {
-        "success": True,
-        "data": data
+    result = job.get("result") or {}
+    if job["status"] == "done":
+        url = result["url"]
+    else:
+        url = "" if job["status"] == "failed" else settings.UPLOAD_PLACEHOLDER_URL
+    res = {
+        "id": file_id,
+        "filename": job["filename"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": round(job.get("progress") or 0.0, 3),
+        "steps": {step: bool((job.get("steps") or {}).get(step)) for step in UPLOAD_STEPS[job["kind"]]},
+        "url": absolute_url(url, request) if url else url,
+        "created_at": job["created_at"],
+        "updated_at": job.get("updated_at"),
+        "finished_at": job.get("finished_at"),
     }
+    if result.get("variants"):
+        res["variants"] = variant_list(result, request)
+    if job.get("error"):
+        res["error"] = job["error"]
+    return res
+
+
+@router.delete("/upload/{file_id}", dependencies=[Depends(verify_user)])
+async def delete_upload(file_id: str):
+    deleted = await UploadRepository.delete_file(file_id)
+    url_doc = await FileUrlRepository.get_url_by_file_id(file_id)
+    if not deleted and not url_doc:
+        raise HTTPException(404, "File not found")
+    if url_doc:
+        await FileUrlRepository.delete_url(file_id)
+    return {"success": True}
+
+
+def parse_range(range_header: str | None, length: int):
+    """
+    Parses a single `bytes=start-end` range. Returns (start, end) inclusive,
+    or None when the whole file should be sent.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_s, _, end_s = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_s:
+            start = int(start_s)
+            end = int(end_s) if end_s else length - 1
+        else:
+            # suffix range: last N bytes
+            start = max(length - int(end_s), 0)
+            end = length - 1
+    except ValueError:
+        return None
+    if start >= length or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"},
+        )
+    return start, min(end, length - 1)
+
 
 @router.get("/{file_id}")
-async def get_file(file_id: str):
-    file_doc = await UploadRepository.get_file_by_id(file_id)
+async def get_file(file_id: str, request: Request, encoding: str | None = None):
+    file_doc = await UploadRepository.get_file_meta(file_id)
     if not file_doc:
         raise HTTPException(404, "File not found")
-    # return as JSON with base64 content; frontend can use `data:image/...;base64,${content}`
-    return {
-        "id": file_doc["_id"],
-        "filename": file_doc["filename"],
-        "content": file_doc["content"]
+
+    if encoding == "base64":
+        # legacy JSON shape; frontend can use `data:image/...;base64,${content}`
+        file_doc = await UploadRepository.get_file_by_id(file_id, include_content=True)
+        return {
+            "id": file_doc["_id"],
+            "filename": file_doc["filename"],
+            "content": file_doc["content"]
+        }
+
+    legacy_bytes = None
+    if file_doc.get("storage"):
+        length = file_doc.get("length", 0)
+    else:
+        # not migrated yet: bytes are still inline as base64
+        legacy_bytes = await UploadRepository.get_legacy_content(file_id) or b""
+        length = len(legacy_bytes)
+
+    content_type = (
+        file_doc.get("content_type")
+        or mimetypes.guess_type(file_doc.get("filename") or "")[0]
+        or "application/octet-stream"
+    )
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"inline; filename*=utf-8''{quote(file_doc.get('filename') or file_id)}",
     }
+
+    byte_range = parse_range(request.headers.get("range"), length) if length else None
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    else:
+        start, end = 0, length - 1
+        status_code = 200
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+
+    return StreamingResponse(
+        UploadRepository.iter_content(file_doc, start, end, legacy_bytes=legacy_bytes),
+        status_code=status_code,
+        media_type=content_type,
+        headers=headers,
+    )
@@ -0,0 +1,242 @@
+import functools
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config.config import settings
+from app.core.responses import FastJSONResponse
+
+logger = logging.getLogger("response_cache")
+
+# Cached responses tagged with the key also embed documents of the listed
+# collections, so a write to the key has to invalidate them as well.
+TAG_DEPENDENTS = {
+    "products": ("industries",),
+    "clients": ("industries",),
+    "certifications": ("industries",),
+    "file_urls": ("products", "industries", "clients", "certifications", "news", "about"),
+}
+
+
+class LocalTTLCache:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: int):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class InMemoryRedis:
+    """
+    Local stand-in for the small part of the redis.asyncio API the cache
+    uses (get / set with ex / mget / incr), for tests and single-node runs.
+    """
+
+    def __init__(self):
+        self._data: dict = {}
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def get(self, key):
+        return self._live(key)
+
+    async def mget(self, keys):
+        return [self._live(k) for k in keys]
+
+    async def set(self, key, value, ex: Optional[int] = None):
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    async def incr(self, key):
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = (None, value)
+        return value
+
+
+class ResponseCache:
+    """
+    Two-tier cache for rendered JSON responses.
+
+    Entries are grouped by tag (normally a collection name). Instead of
+    tracking which keys belong to a tag, every tag has a generation counter
+    that is part of the entry key; invalidating a tag bumps its generation,
+    so stale entries are simply never read again and age out through the
+    LRU / TTL. With a shared (Redis) tier the generations live there too,
+    which keeps every worker's local tier consistent.
+    """
+
+    def __init__(self):
+        self.local = LocalTTLCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+        self._generations: dict = {}
+        self._remote = None
+        self._remote_ready = False
+
+    @property
+    def remote(self):
+        if not self._remote_ready:
+            self._remote_ready = True
+            url = settings.RESPONSE_CACHE_REDIS_URL
+            if url == "memory://":
+                self._remote = InMemoryRedis()
+            elif url:
+                try:
+                    import redis.asyncio as redis
+                    self._remote = redis.from_url(url)
+                except ImportError:
+                    logger.error("RESPONSE_CACHE_REDIS_URL is set but the `redis` package is not installed")
+        return self._remote
+
+    @staticmethod
+    def _expand(tags):
+        expanded = []
+        for tag in tags:
+            for t in (tag, *TAG_DEPENDENTS.get(tag, ())):
+                if t not in expanded:
+                    expanded.append(t)
+        return expanded
+
+    async def _generation_key(self, tags) -> str:
+        tags = sorted(tags)
+        if self.remote is not None:
+            try:
+                values = await self.remote.mget([f"cache:gen:{t}" for t in tags])
+                return ".".join(f"{t}{int(v or 0)}" for t, v in zip(tags, values))
+            except Exception:
+                logger.exception("Response cache: reading generations failed")
+        return ".".join(f"{t}{self._generations.get(t, 0)}" for t in tags)
+
+    async def lookup(self, key: str, tags):
+        """
+        Returns (entry_key, body). `entry_key` pins the tag generations seen
+        before the response is built; store the fresh body under it so a
+        write that lands mid-build can't be cached as current.
+        """
+        entry_key = f"{key}|{await self._generation_key(tags)}"
+        body = self.local.get(entry_key)
+        if body is not None or self.remote is None:
+            return entry_key, body
+        try:
+            body = await self.remote.get(self._remote_key(entry_key))
+        except Exception:
+            logger.exception("Response cache: remote get failed")
+            return entry_key, None
+        if body is not None:
+            self.local.set(entry_key, body, settings.RESPONSE_CACHE_TTL_SECONDS)
+        return entry_key, body
+
+    async def store(self, entry_key: str, body: bytes, ttl: Optional[int] = None):
+        ttl = ttl or settings.RESPONSE_CACHE_TTL_SECONDS
+        self.local.set(entry_key, body, ttl)
+        if self.remote is not None:
+            try:
+                await self.remote.set(self._remote_key(entry_key), body, ex=ttl)
+            except Exception:
+                logger.exception("Response cache: remote set failed")
+
+    @staticmethod
+    def _remote_key(entry_key: str):
+        return "cache:resp:" + hashlib.sha1(entry_key.encode()).hexdigest()
+
+    async def invalidate(self, *tags):
+        for tag in self._expand(tags):
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            if self.remote is not None:
+                try:
+                    await self.remote.incr(f"cache:gen:{tag}")
+                except Exception:
+                    logger.exception(f"Response cache: invalidating tag={tag} failed")
+
+
+# Global instance
+response_cache = ResponseCache()
+
+
+def request_cache_key(request: Request) -> str:
+    # base_url is part of the key: relative upload URLs are made absolute per host
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.method}:{request.base_url}{request.url.path.lstrip('/')}?{query}"
+
+
+async def catalog_versions_key(tags) -> str:
+    """
+    `catalog_versions` counters of the tags and of the collections embedded
+    in them. Unlike the generations they are shared by every worker.
+    """
+    from app.repository.catalog_version_repository import CatalogVersionRepository
+
+    sources = set(tags) | {src for src, deps in TAG_DEPENDENTS.items() if set(deps) & set(tags)}
+    versions = await CatalogVersionRepository.get_versions(sources)
+    return "|".join(f"{name}:{(versions.get(name) or {}).get('version', 0)}" for name in sorted(sources))
+
+
+def cached_response(*tags: str, ttl: Optional[int] = None):
+    """
+    Caches the JSON body of a GET endpoint, keyed by route, query
+    parameters and the catalog versions the body was built from (those
+    `conditional_get` read, or the tags' own). The endpoint must take a
+    `request: Request` argument.
+
+        @router.get("/url/")
+        @cached_response("products")
+        async def get_products_url(request: Request, ...):
+    """
+    tag_list = list(tags)
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.get("request")
+            if not settings.RESPONSE_CACHE_ENABLED or request is None:
+                return await endpoint(*args, **kwargs)
+
+            versions = getattr(request.state, "catalog_versions", None)
+            if versions is None:
+                versions = await catalog_versions_key(tag_list)
+            key = f"{request_cache_key(request)}|{versions}"
+            entry_key, body = await response_cache.lookup(key, tag_list)
+            if body is not None:
+                return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            response = FastJSONResponse(result, headers={"X-Cache": "MISS"})
+            await response_cache.store(entry_key, response.body, ttl)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,104 @@
+import functools
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.cache import request_cache_key
+from app.core.responses import FastJSONResponse
+from app.repository.catalog_version_repository import CatalogVersionRepository
+
+
+def _http_date(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2); weak comparison
+        candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_get(*collections: str, doc=None, private: bool = False):
+    """
+    Adds a strong ETag and Last-Modified to a GET endpoint and answers
+    conditional requests with 304 before the endpoint (and its hydration)
+    runs. The endpoint must take a `request: Request` argument.
+
+    `collections` are every catalogue collection the response is built
+    from; their `catalog_versions` counters go into the ETag. For
+    single-document endpoints pass `doc=(Repository.get_version, "<path
+    param>")` so the document's own `version` / `updated_at` are used too.
+
+        @router.get("/url/{product_id}")
+        @conditional_get("file_urls", doc=(ProductRepository.get_version, "product_id"))
+        async def get_product_by_id_url(product_id: str, request: Request):
+    """
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.get("request")
+            if request is None:
+                return await endpoint(*args, **kwargs)
+
+            parts = [request_cache_key(request)]
+            stamps = []
+            if collections:
+                versions = await CatalogVersionRepository.get_versions(collections)
+                for name in sorted(collections):
+                    v = versions.get(name) or {}
+                    parts.append(f"{name}:{v.get('version', 0)}")
+                    stamps.append(v.get("updated_at"))
+            if doc is not None:
+                get_version, param = doc
+                current = await get_version(kwargs[param])
+                if current is None:
+                    # unknown id: let the endpoint produce its 404
+                    return await endpoint(*args, **kwargs)
+                parts.append(f"doc:{current.get('version', 0)}:{current.get('updated_at')}")
+                stamps.append(current.get("updated_at"))
+
+            # cached_response keys its entry on the same versions, so a body
+            # cached by another worker is never served under this ETag
+            request.state.catalog_versions = "|".join(parts[1:])
+            etag = '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+            last_modified = max((s for s in stamps if s), default=None)
+            headers = {
+                "ETag": etag,
+                # stored copies must be revalidated, which is cheap now
+                "Cache-Control": "private, no-cache" if private else "no-cache",
+            }
+            if last_modified is not None:
+                headers["Last-Modified"] = _http_date(last_modified)
+
+            if is_not_modified(request, etag, last_modified):
+                return Response(status_code=304, headers=headers)
+
+            result = await endpoint(*args, **kwargs)
+            response = result if isinstance(result, Response) else FastJSONResponse(result)
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+
+        return wrapper
+
+    return decorator
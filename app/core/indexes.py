@@ -0,0 +1,140 @@
+import logging
+from collections import defaultdict
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("indexes")
+
+# collection name -> IndexModels declared by the repositories
+INDEX_REGISTRY: dict = defaultdict(list)
+
+# modules that declare indexes; imported before the registry is read so the
+# CLI sees the same declarations as the app
+REPOSITORY_MODULES = (
+    "app.repository.direct_upload_repository",
+    "app.repository.file_url_repository",
+    "app.repository.notification_repository",
+    "app.repository.product_repository",
+    "app.repository.quote_repository",
+    "app.repository.upload_job_repository",
+    "app.repository.user_repository",
+)
+
+
+def register_indexes(collection: str, *indexes: IndexModel):
+    """
+    Declare the indexes a repository's queries rely on. Every index needs an
+    explicit `name` so re-registering (module reloads) stays idempotent.
+
+        register_indexes("file_urls", IndexModel([("file_id", ASCENDING)], name="file_id_1"))
+    """
+    existing = {m.document["name"] for m in INDEX_REGISTRY[collection]}
+    for index in indexes:
+        if "name" not in index.document:
+            raise ValueError(f"Index on {collection} needs an explicit name")
+        if index.document["name"] not in existing:
+            INDEX_REGISTRY[collection].append(index)
+            existing.add(index.document["name"])
+
+
+def load_registry():
+    import importlib
+
+    for module in REPOSITORY_MODULES:
+        importlib.import_module(module)
+    return INDEX_REGISTRY
+
+
+def _default_db(database):
+    if database is not None:
+        return database
+    from app.config.database import db
+    return db
+
+
+async def apply_indexes(database=None, collections=None, dry_run: bool = False):
+    """
+    Creates every registered index that does not exist yet. createIndexes is
+    a no-op for identical specs; a spec that conflicts with an existing index
+    of the same name is reported, never dropped.
+
+    Returns {collection: {"created": [...], "existing": [...], "failed": {name: error}}}.
+    """
+    database = _default_db(database)
+    result = {}
+    for collection, indexes in load_registry().items():
+        if collections and collection not in collections:
+            continue
+        present = await database[collection].index_information()
+        entry = {"created": [], "existing": [], "failed": {}}
+        for index in indexes:
+            name = index.document["name"]
+            if name in present:
+                entry["existing"].append(name)
+                continue
+            if dry_run:
+                entry["created"].append(name)
+                continue
+            try:
+                await database[collection].create_indexes([index])
+                entry["created"].append(name)
+            except OperationFailure as e:
+                entry["failed"][name] = str(e)
+                logger.error(f"Creating index {collection}.{name} failed: {e}")
+        result[collection] = entry
+    return result
+
+
+async def index_report(database=None):
+    """
+    Compares the registry with what the server has:
+        missing     - registered but not built
+        unregistered - built but not declared by any repository
+        unused      - declared, built and never used since the last restart
+                      ($indexStats; empty where the server does not support it)
+    """
+    database = _default_db(database)
+    report = {}
+    for collection, indexes in load_registry().items():
+        declared = {m.document["name"] for m in indexes}
+        present = set(await database[collection].index_information()) - {"_id_"}
+        unused = []
+        try:
+            stats = await database[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+            unused = sorted(
+                s["name"] for s in stats
+                if s["name"] in declared and not s.get("accesses", {}).get("ops")
+            )
+        except Exception:
+            pass
+        report[collection] = {
+            "missing": sorted(declared - present),
+            "unregistered": sorted(present - declared),
+            "unused": unused,
+        }
+    return report
+
+
+async def ensure_indexes(mode: str = "apply", database=None):
+    """Startup hook: "apply" builds missing indexes, "verify" only logs, "off" skips."""
+    if mode == "off":
+        return None
+    try:
+        if mode == "apply":
+            applied = await apply_indexes(database)
+            created = [f"{c}.{n}" for c, r in applied.items() for n in r["created"]]
+            if created:
+                logger.info(f"Created indexes: {', '.join(created)}")
+        report = await index_report(database)
+    except Exception:
+        logger.exception("Index check failed")
+        return None
+    for collection, r in report.items():
+        if r["missing"]:
+            logger.warning(f"Missing indexes on {collection}: {', '.join(r['missing'])}")
+        if r["unregistered"]:
+            logger.info(f"Indexes on {collection} not declared by any repository: {', '.join(r['unregistered'])}")
+        if r["unused"]:
+            logger.info(f"Unused indexes on {collection}: {', '.join(r['unused'])}")
+    return report
@@ -0,0 +1,250 @@
+"""
+Process-local metrics in the Prometheus text format, served on /metrics.
+
+Counters, gauges and histograms with labels, kept dependency free. Every
+worker process exposes its own values; scrape each worker (or run one
+worker per container) and aggregate in Prometheus.
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from pymongo import monitoring
+
+from app.config.config import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list = []
+
+    def register(self, metric: Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], Iterable[Metric]]):
+        """`fn` builds metrics from state kept elsewhere, at scrape time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for fn in self._collectors:
+            try:
+                for metric in fn():
+                    lines += metric.render()
+            except Exception:
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} failed")
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time to the last response byte", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "Requests being handled")
+HTTP_RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS)
+
+UPLOAD_BYTES = registry.counter("upload_bytes_total", "Bytes stored per storage backend", ("backend",))
+UPLOAD_DURATION = registry.histogram(
+    "upload_duration_seconds", "Time to store one file per storage backend", ("backend", "outcome"))
+
+MONGO_COMMANDS = registry.counter("mongodb_commands_total", "Mongo commands by name and outcome", ("command", "outcome"))
+MONGO_DURATION = registry.histogram(
+    "mongodb_command_duration_seconds", "Mongo command round trip", ("command",), MONGO_BUCKETS)
+
+
+def route_label(scope) -> str:
+    # the route template, never the raw path: ids would explode the series count
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI so streaming responses (SSE, file downloads) are measured to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        status, size = 500, 0
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_DURATION.observe(time.perf_counter() - started, method=method, route=route)
+            HTTP_RESPONSE_SIZE.observe(size, method=method, route=route)
+
+
+class upload_timer:
+    """
+        with upload_timer("s3", size):
+            ...store the file...
+    """
+
+    def __init__(self, backend: str, size: Optional[int] = None):
+        self.backend = backend
+        self.size = size
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "error" if exc_type else "ok"
+        UPLOAD_DURATION.observe(time.perf_counter() - self.started, backend=self.backend, outcome=outcome)
+        if not exc_type and self.size:
+            UPLOAD_BYTES.inc(self.size, backend=self.backend)
+        return False
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Command counts and latencies, from pymongo's command monitoring (runs on driver threads)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if settings.METRICS_ENABLED:
+            MONGO_COMMANDS.inc(command=event.command_name, outcome="ok")
+            MONGO_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        if settings.METRICS_ENABLED:
+            MONGO_COMMANDS.inc(command=event.command_name, outcome="error")
+            MONGO_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+
+# Global instance
+mongo_command_metrics = MongoCommandMetrics()
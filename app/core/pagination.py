@@ -0,0 +1,74 @@
+import base64
+import binascii
+import json
+from typing import Optional
+
+from bson import json_util
+from fastapi import HTTPException
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+
+def parse_sort(sort: Optional[str], allowed: tuple[str, ...]):
+    """`"name"` / `"-name"` -> ("name", 1) / ("name", -1); only `allowed` fields (plus `_id`)."""
+    sort = sort or "_id"
+    field, direction = (sort[1:], -1) if sort.startswith("-") else (sort, 1)
+    if field != "_id" and field not in allowed:
+        raise HTTPException(400, f"Unsupported sort field: {field}")
+    return field, direction
+
+
+def check_count_mode(count: Optional[str], default: str = "exact"):
+    count = (count or default).lower()
+    if count not in COUNT_MODES:
+        raise HTTPException(400, f"count must be one of: {', '.join(COUNT_MODES)}")
+    return count
+
+
+def encode_cursor(sort: str, doc: dict):
+    """Opaque token pointing just past `doc` in the given sort order."""
+    field = sort.lstrip("-")
+    payload = {"s": sort, "id": doc["_id"]}
+    if field != "_id":
+        payload["v"] = doc.get(field)
+    raw = json_util.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json_util.loads(raw)
+    except (binascii.Error, ValueError, json.JSONDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(payload, dict) or "id" not in payload:
+        raise HTTPException(400, "Invalid cursor")
+    if payload.get("s") != sort:
+        raise HTTPException(400, "Cursor was issued for a different sort order")
+    return payload
+
+
+def keyset_query(query: dict, field: str, direction: int, after: Optional[dict]):
+    """
+    Adds the seek condition for the page after `after` to `query`. Ties on
+    `field` are broken by `_id`, so the sort is always `[(field, dir), ("_id", dir)]`.
+    """
+    if not after:
+        return query
+    op = "$gt" if direction == 1 else "$lt"
+    if field == "_id":
+        seek = {"_id": {op: after["id"]}}
+    else:
+        seek = {
+            "$or": [
+                {field: {op: after.get("v")}},
+                {field: after.get("v"), "_id": {op: after["id"]}},
+            ]
+        }
+    return {"$and": [query, seek]} if query else seek
+
+
+def sort_spec(field: str, direction: int):
+    if field == "_id":
+        return [("_id", direction)]
+    return [(field, direction), ("_id", direction)]
@@ -0,0 +1,171 @@
+"""
+Request-scoped Mongo command tracing, for development and CI.
+
+With QUERY_TRACE_ENABLED every request gets a `QueryTrace` in a context
+variable. The pymongo command listener (registered on the Motor client)
+adds each command to it. This works because Motor runs driver calls on
+its executor with a copy of the caller's context. Responses then carry:
+
+    X-Query-Count    commands sent while producing the response
+    X-DB-Time        their summed round trip, in ms
+    X-Query-Repeats  collections hit by QUERY_TRACE_REPEAT_THRESHOLD or more
+                     single-document finds (find_one in a loop: an N+1)
+
+Past QUERY_BUDGET commands a warning is logged. With QUERY_BUDGET_ACTION
+"fail", the request is answered with a 500 instead, so a test suite or a
+load test catches the regression.
+"""
+import json
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from pymongo import monitoring
+
+from app.config.config import settings
+
+logger = logging.getLogger("query_tracer")
+
+# commands whose first field is not a collection name
+_COLLECTION_FIELD = {"getMore": "collection"}
+
+
+class QueryTrace:
+    def __init__(self):
+        self._lock = threading.Lock()  # listener callbacks come from Motor's executor threads
+        self.count = 0
+        self.db_time = 0.0  # seconds
+        self.collections = Counter()
+        self.single_lookups = Counter()
+
+    def started(self, command_name: str, command: dict):
+        collection = command.get(_COLLECTION_FIELD.get(command_name, command_name))
+        if not isinstance(collection, str):
+            collection = "<none>"
+        single = command_name == "find" and command.get("limit") == 1
+        with self._lock:
+            self.count += 1
+            self.collections[collection] += 1
+            if single:
+                self.single_lookups[collection] += 1
+
+    def finished(self, seconds: float):
+        with self._lock:
+            self.db_time += seconds
+
+    def repeats(self):
+        threshold = settings.QUERY_TRACE_REPEAT_THRESHOLD
+        return {c: n for c, n in self.single_lookups.most_common() if n >= threshold}
+
+    def headers(self):
+        out = [
+            (b"x-query-count", str(self.count).encode()),
+            (b"x-db-time", f"{self.db_time * 1000:.2f}".encode()),
+        ]
+        repeats = self.repeats()
+        if repeats:
+            out.append((b"x-query-repeats", ", ".join(f"{c}={n}" for c, n in repeats.items()).encode()))
+        return out
+
+
+_current: ContextVar[Optional[QueryTrace]] = ContextVar("query_trace", default=None)
+
+
+def current_trace() -> Optional[QueryTrace]:
+    return _current.get()
+
+
+class QueryTraceListener(monitoring.CommandListener):
+    """Feeds the command events to the trace of the request that sent them, if any."""
+
+    def started(self, event):
+        trace = _current.get()
+        if trace is not None:
+            trace.started(event.command_name, event.command)
+
+    def succeeded(self, event):
+        trace = _current.get()
+        if trace is not None:
+            trace.finished(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+# Global instance
+query_trace_listener = QueryTraceListener()
+
+
+class QueryTraceMiddleware:
+    """
+    Pure ASGI: the headers are added to `http.response.start`, so they count
+    the commands made before the response started. Queries made while a
+    streaming response is being sent are not counted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_TRACE_ENABLED:
+            return await self.app(scope, receive, send)
+
+        trace = QueryTrace()
+        token = _current.set(trace)
+        suppressed = False
+
+        async def send_wrapper(message):
+            nonlocal suppressed
+            if suppressed:
+                return
+            if message["type"] == "http.response.start":
+                if over_budget(scope, trace):
+                    suppressed = True
+                    return await send_budget_error(send, trace)
+                message = {**message, "headers": [*message.get("headers", []), *trace.headers()]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+        log_trace(scope, trace)
+
+
+def over_budget(scope, trace: QueryTrace) -> bool:
+    budget = settings.QUERY_BUDGET
+    if not budget or trace.count <= budget:
+        return False
+    logger.warning(f"Query budget exceeded: {scope['method']} {scope['path']} made {trace.count} "
+                   f"Mongo commands (budget {budget}); by collection {dict(trace.collections)}")
+    return settings.QUERY_BUDGET_ACTION == "fail"
+
+
+async def send_budget_error(send, trace: QueryTrace):
+    body = json.dumps({
+        "detail": f"Query budget exceeded: {trace.count} Mongo commands (budget {settings.QUERY_BUDGET})",
+        "collections": dict(trace.collections),
+        "repeats": trace.repeats(),
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *trace.headers(),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def log_trace(scope, trace: QueryTrace):
+    repeats = trace.repeats()
+    if repeats:
+        logger.warning(f"Possible N+1: {scope['method']} {scope['path']} made {trace.count} Mongo commands; "
+                       f"repeated single-document finds {repeats}")
+    elif trace.count:
+        logger.debug(f"{scope['method']} {scope['path']}: {trace.count} Mongo commands, "
+                     f"{trace.db_time * 1000:.2f} ms; {dict(trace.collections)}")
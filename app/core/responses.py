@@ -0,0 +1,81 @@
+import datetime
+import json
+from decimal import Decimal
+from typing import Any
+
+from bson import Decimal128, ObjectId
+from fastapi.encoders import ENCODERS_BY_TYPE, jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+
+def _decimal(value: Decimal):
+    # same shape jsonable_encoder gives Decimal
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
+
+
+# routes that still go through jsonable_encoder (response_model, plain dicts)
+ENCODERS_BY_TYPE.setdefault(ObjectId, str)
+ENCODERS_BY_TYPE.setdefault(Decimal128, lambda d: _decimal(d.to_decimal()))
+
+
+def encode_default(obj: Any):
+    """Types the encoder has no native form for (Mongo types and what jsonable_encoder handles)."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return _decimal(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return _decimal(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def _stdlib_default(obj: Any):
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return encode_default(obj)
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content, default=_stdlib_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON of raw repository data: documents may contain
+    ObjectId, datetime, Decimal128 etc. without a `jsonable_encoder` pass.
+
+    orjson output matches JSONResponse except for non-finite floats: NaN
+    and +/-Infinity are written as `null`, where the stdlib encoder raises.
+    Payloads orjson rejects (non-str dict keys, ints over 64 bits) are
+    rendered by the stdlib encoder, as JSONResponse would.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=encode_default)
+        except orjson.JSONEncodeError:
+            pass
+    return _stdlib_dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide response class. Endpoints that build their own response (the
+    `cached_response` / `conditional_get` catalogue routes) pass the raw
+    result straight in and skip `jsonable_encoder` entirely.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 from pathlib import Path
 import os
 from app.routes import auth_routes
@@ -14,9 +15,41 @@ from app.routes.news_routes import router as news_router
 from app.routes.about_routes import router as about_router
 from app.routes.file_url_routes import router as file_url_router
 from app.routes.quote_routes import router as quote_router
+from app.routes.search_routes import router as search_router
+from app.routes.metrics_routes import router as metrics_router
+from app.services.storage_clients import storage_clients
+from app.services.image_variants import image_variant_pool
+from app.controllers.upload_controller import upload_queue
+from app.repository.notification_repository import notification_sink
+from app.services.notification_hub import notification_hub
+from app.services.password_hasher import password_hasher
+from app.core.indexes import ensure_indexes
+from app.core.responses import FastJSONResponse
+from app.core.metrics import MetricsMiddleware
+from app.core.query_tracer import QueryTraceMiddleware
+from app.config.config import settings
 
-app = FastAPI(title="User Management API")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    storage_clients.start()
+    password_hasher.start()
+    await ensure_indexes(settings.INDEXES_ON_STARTUP)
+    await upload_queue.start()
+    notification_hub.start()
+    yield
+    await upload_queue.shutdown()
+    await notification_sink.shutdown()
+    await notification_hub.shutdown()
+    image_variant_pool.shutdown()
+    password_hasher.shutdown()
+    storage_clients.shutdown()
+
+
+app = FastAPI(title="User Management API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# inside CORS, so its headers (and budget errors) reach browsers too
+app.add_middleware(QueryTraceMiddleware)
 # ✔ FINAL WORKING CORS CONFIG
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +64,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Query-Count", "X-DB-Time", "X-Query-Repeats"],
 )
+# outermost, so the time spent in CORS and error handling is counted too
+app.add_middleware(MetricsMiddleware)
 
+# ahead of the upload router's catch-all GET /{file_id}, which would swallow /metrics and /search
+app.include_router(metrics_router)
+app.include_router(search_router)
 app.include_router(auth_routes.router)
 app.include_router(upload_router)
 app.include_router(product_router)
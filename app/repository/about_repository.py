@@ -1,34 +1,53 @@
 from app.config.database import db
+from app.repository.catalog_version_repository import CatalogVersionRepository
 import uuid
+from datetime import datetime
 
 COLLECTION = db["about"]
 
 class AboutRepository:
+    # list rows for `lite` responses
+    LITE_PROJECTION = {"long_description": 0}
 
     @staticmethod
     async def create_about(doc: dict):
         doc["_id"] = str(uuid.uuid4())
+        doc["version"] = 1
+        doc["updated_at"] = datetime.utcnow()
         await COLLECTION.insert_one(doc)
+        await CatalogVersionRepository.record_write("about")
         return doc["_id"]
 
     @staticmethod
-    async def get_all(skip=0, limit=10):
-        return await COLLECTION.find().skip(skip).limit(limit).to_list(limit)
+    async def get_all(skip=0, limit=10, projection: dict | None = None):
+        return await COLLECTION.find({}, projection).skip(skip).limit(limit).to_list(limit)
 
     @staticmethod
     async def count():
         return await COLLECTION.count_documents({})
 
     @staticmethod
-    async def get_by_id(about_id: str):
-        return await COLLECTION.find_one({"_id": about_id})
+    async def get_by_id(about_id: str, projection: dict | None = None):
+        return await COLLECTION.find_one({"_id": about_id}, projection)
+
+    @staticmethod
+    async def get_version(about_id: str):
+        return await COLLECTION.find_one({"_id": about_id}, {"version": 1, "updated_at": 1})
 
     @staticmethod
     async def update(about_id: str, update_data: dict):
-        await COLLECTION.update_one({"_id": about_id}, {"$set": update_data})
+        await COLLECTION.update_one(
+            {"_id": about_id},
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
+        )
+        await CatalogVersionRepository.record_write("about")
         return await COLLECTION.find_one({"_id": about_id})
 
     @staticmethod
     async def delete(about_id: str):
         result = await COLLECTION.delete_one({"_id": about_id})
+        await CatalogVersionRepository.record_write("about")
         return result.deleted_count > 0
@@ -0,0 +1,30 @@
+from app.config.database import db
+from app.core.cache import response_cache
+from datetime import datetime
+
+COLLECTION = db["catalog_versions"]
+
+
+class CatalogVersionRepository:
+    """
+    One counter document per catalogue collection:
+        {"_id": "products", "version": int, "updated_at": datetime}
+
+    Every repository write goes through `record_write`, which bumps the
+    counter (used for list ETags / Last-Modified) and invalidates cached
+    responses for the collection.
+    """
+
+    @staticmethod
+    async def record_write(collection: str):
+        await COLLECTION.update_one(
+            {"_id": collection},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        await response_cache.invalidate(collection)
+
+    @staticmethod
+    async def get_versions(collections: list[str]):
+        docs = await COLLECTION.find({"_id": {"$in": list(collections)}}).to_list(None)
+        return {d["_id"]: d for d in docs}
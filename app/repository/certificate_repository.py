@@ -1,5 +1,7 @@
 from app.config.database import db
+from app.repository.catalog_version_repository import CatalogVersionRepository
 import uuid
+from datetime import datetime
 
 COLLECTION = db["certifications"]
 
@@ -8,23 +10,38 @@ class CertificateRepository:
     @staticmethod
     async def create_certificate(doc: dict):
         doc["_id"] = doc.get("_id", str(uuid.uuid4()))
+        doc["version"] = 1
+        doc["updated_at"] = datetime.utcnow()
         await COLLECTION.insert_one(doc)
+        await CatalogVersionRepository.record_write("certifications")
         return doc["_id"]
 
     @staticmethod
-    async def get_all_certificates():
-        return await COLLECTION.find().to_list(None)
+    async def get_all_certificates(projection: dict | None = None):
+        return await COLLECTION.find({}, projection).to_list(None)
 
     @staticmethod
-    async def get_certificate_by_id(cert_id: str):
-        return await COLLECTION.find_one({"_id": cert_id})
+    async def get_certificate_by_id(cert_id: str, projection: dict | None = None):
+        return await COLLECTION.find_one({"_id": cert_id}, projection)
+
+    @staticmethod
+    async def get_version(cert_id: str):
+        return await COLLECTION.find_one({"_id": cert_id}, {"version": 1, "updated_at": 1})
 
     @staticmethod
     async def update_certificate(cert_id: str, update_data: dict):
-        await COLLECTION.update_one({"_id": cert_id}, {"$set": update_data})
+        await COLLECTION.update_one(
+            {"_id": cert_id},
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
+        )
+        await CatalogVersionRepository.record_write("certifications")
         return await COLLECTION.find_one({"_id": cert_id})
 
     @staticmethod
     async def delete_certificate(cert_id: str):
         result = await COLLECTION.delete_one({"_id": cert_id})
+        await CatalogVersionRepository.record_write("certifications")
         return result.deleted_count > 0
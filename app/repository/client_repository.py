@@ -1,5 +1,7 @@
 from app.config.database import db
+from app.repository.catalog_version_repository import CatalogVersionRepository
 import uuid
+from datetime import datetime
 
 COLLECTION = db["clients"]
 
@@ -8,23 +10,38 @@ class ClientRepository:
     @staticmethod
     async def create_client(doc: dict):
         doc["_id"] = doc.get("_id", str(uuid.uuid4()))
+        doc["version"] = 1
+        doc["updated_at"] = datetime.utcnow()
         await COLLECTION.insert_one(doc)
+        await CatalogVersionRepository.record_write("clients")
         return doc["_id"]
 
     @staticmethod
-    async def get_all_clients():
-        return await COLLECTION.find().to_list(None)
+    async def get_all_clients(projection: dict | None = None):
+        return await COLLECTION.find({}, projection).to_list(None)
 
     @staticmethod
-    async def get_client_by_id(client_id: str):
-        return await COLLECTION.find_one({"_id": client_id})
+    async def get_client_by_id(client_id: str, projection: dict | None = None):
+        return await COLLECTION.find_one({"_id": client_id}, projection)
+
+    @staticmethod
+    async def get_version(client_id: str):
+        return await COLLECTION.find_one({"_id": client_id}, {"version": 1, "updated_at": 1})
 
     @staticmethod
     async def update_client(client_id: str, update_data: dict):
-        await COLLECTION.update_one({"_id": client_id}, {"$set": update_data})
+        await COLLECTION.update_one(
+            {"_id": client_id},
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
+        )
+        await CatalogVersionRepository.record_write("clients")
         return await COLLECTION.find_one({"_id": client_id})
 
     @staticmethod
     async def delete_client(client_id: str):
         result = await COLLECTION.delete_one({"_id": client_id})
+        await CatalogVersionRepository.record_write("clients")
         return result.deleted_count > 0
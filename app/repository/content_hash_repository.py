@@ -0,0 +1,69 @@
+from app.config.database import db
+from datetime import datetime
+from pymongo import ReturnDocument
+
+COLLECTION = db["content_hashes"]
+
+
+class ContentHashRepository:
+    """
+    One document per distinct upload content, keyed by SHA-256:
+        {"_id": sha256, "url", "variants", "blob_id", "storage", "length",
+         "content_type", "refcount", "created_at"}
+
+    `blob_id` is the `files` id whose storage object holds the bytes (None
+    for URL-only uploads such as videos); `refcount` is the number of file
+    ids currently pointing at this content.
+    """
+
+    @staticmethod
+    async def acquire(sha256: str, need_blob: bool = False):
+        """Takes a reference on known content; None if the hash is unknown."""
+        query = {"_id": sha256, "url": {"$nin": [None, ""]}}
+        if need_blob:
+            query["blob_id"] = {"$ne": None}
+        return await COLLECTION.find_one_and_update(
+            query,
+            {"$inc": {"refcount": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def register(sha256: str, url: str, blob_id: str | None = None, storage: str | None = None,
+                       length: int | None = None, content_type: str | None = None, variants: list | None = None):
+        """
+        Records freshly uploaded content with one reference. If the same
+        content was registered concurrently the first copy stays canonical
+        and this upload just adds a reference.
+        """
+        await COLLECTION.update_one(
+            {"_id": sha256},
+            {
+                "$setOnInsert": {
+                    "url": url,
+                    "variants": variants or [],
+                    "blob_id": blob_id,
+                    "storage": storage,
+                    "length": length,
+                    "content_type": content_type,
+                    "created_at": datetime.utcnow(),
+                },
+                "$inc": {"refcount": 1},
+            },
+            upsert=True,
+        )
+
+    @staticmethod
+    async def release(sha256: str):
+        """
+        Drops one reference and returns the updated record (None for an
+        unknown hash). The record is removed once `refcount` reaches 0.
+        """
+        doc = await COLLECTION.find_one_and_update(
+            {"_id": sha256},
+            {"$inc": {"refcount": -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc and doc["refcount"] <= 0:
+            await COLLECTION.delete_one({"_id": sha256, "refcount": {"$lte": 0}})
+        return doc
@@ -0,0 +1,48 @@
+from app.config.database import db
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import register_indexes
+from datetime import datetime, timedelta
+from app.config.config import settings
+
+COLLECTION = db["direct_uploads"]
+
+
+class DirectUploadRepository:
+    """
+    Browser-to-S3 uploads that were presigned but not finalized yet, keyed
+    by the file id handed back to the client:
+        {"_id": file_id, "kind", "filename", "content_type", "size",
+         "bucket", "key", "upload_id", "part_size", "part_count" (multipart only),
+         "created_by", "created_at", "expires_at", "finalized_url" (once finalized)}
+    Finalizing writes a `file_urls` entry and marks the record, so a retried
+    finalize still goes through the owner check; every record expires.
+    """
+
+    @staticmethod
+    async def create(upload: dict):
+        now = datetime.utcnow()
+        upload["created_at"] = now
+        # the presigned URLs stop working at expires_at; keep the record a
+        # little longer so an upload that finished just in time can be finalized
+        upload["expires_at"] = now + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRES_SECONDS * 2)
+        await COLLECTION.insert_one(upload)
+        return upload["_id"]
+
+    @staticmethod
+    async def get(file_id: str):
+        return await COLLECTION.find_one({"_id": file_id})
+
+    @staticmethod
+    async def mark_finalized(file_id: str, url: str):
+        await COLLECTION.update_one({"_id": file_id}, {"$set": {"finalized_url": url}})
+
+    @staticmethod
+    async def delete(file_id: str):
+        result = await COLLECTION.delete_one({"_id": file_id})
+        return result.deleted_count > 0
+
+
+register_indexes(
+    "direct_uploads",
+    IndexModel([("expires_at", ASCENDING)], name="expires_at_1", expireAfterSeconds=0),
+)
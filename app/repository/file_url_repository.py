@@ -1,4 +1,7 @@
 from app.config.database import db
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import register_indexes
+from app.repository.catalog_version_repository import CatalogVersionRepository
 # from app.db.mongo import db
 COLLECTION = db["file_urls"]
 class FileUrlRepository:
@@ -9,15 +12,46 @@ class FileUrlRepository:
     async def get_url_by_file_id(file_id: str):
         return await COLLECTION.find_one({"file_id": file_id})
 
+    @staticmethod
+    async def get_urls_by_file_ids(file_ids: list[str]):
+        ids = list(dict.fromkeys(fid for fid in file_ids if fid))
+        if not ids:
+            return {}
+        docs = await COLLECTION.find({"file_id": {"$in": ids}}).to_list(None)
+        urls = {}
+        for doc in docs:
+            urls.setdefault(doc["file_id"], doc)
+        return urls
+
+    @staticmethod
+    async def save_url(file_id: str, filename: str, url: str, file_type: str, status: str | None = None):
+        """
+        `status="processing"` marks a placeholder written for a background
+        upload; saving the real URL later replaces it in place.
+        """
+        update = {"$set": {"filename": filename, "url": url, "type": file_type}}
+        if status:
+            update["$set"]["status"] = status
+        else:
+            update["$unset"] = {"status": ""}
+        result = await COLLECTION.update_one({"file_id": file_id}, update, upsert=True)
+        if result.matched_count:
+            # cached hydrations still carry the placeholder
+            await CatalogVersionRepository.record_write("file_urls")
+
+    @staticmethod
+    async def save_variants(file_id: str, variants: list[dict]):
+        """Resized / re-encoded copies of an image: [{url, width, height, format, content_type}]."""
+        await COLLECTION.update_one(
+            {"file_id": file_id},
+            {"$set": {"variants": variants}}
+        )
+        await CatalogVersionRepository.record_write("file_urls")
 
     @staticmethod
-    async def save_url(file_id: str, filename: str, url: str, file_type: str):
-        await COLLECTION.insert_one({
-            "file_id": file_id,
-            "filename": filename,
-            "url": url,
-            "type": file_type
-        })
+    async def delete_url(file_id: str):
+        await COLLECTION.delete_many({"file_id": file_id})
+        await CatalogVersionRepository.record_write("file_urls")
 
     @staticmethod
     async def update_url(file_id: str, url: str):
@@ -25,3 +59,11 @@ class FileUrlRepository:
             {"file_id": file_id},
             {"$set": {"url": url}}
         )
+        await CatalogVersionRepository.record_write("file_urls")
+
+
+# every hydration looks file ids up here
+register_indexes(
+    "file_urls",
+    IndexModel([("file_id", ASCENDING)], name="file_id_1"),
+)
@@ -1,30 +1,118 @@
 from app.config.database import db
+from app.repository.catalog_version_repository import CatalogVersionRepository
 import uuid
+from datetime import datetime
 
 COLLECTION = db["industries"]
 
+
+def _as_array(expr):
+    # scalar -> [scalar], missing/null -> [], array -> array
+    return {
+        "$cond": [
+            {"$isArray": expr},
+            expr,
+            {"$cond": [{"$eq": [{"$ifNull": [expr, None]}, None]}, [], [expr]]},
+        ]
+    }
+
+
+def _flatten(expr):
+    # [[a, b], c, null] -> [a, b, c]
+    return {
+        "$reduce": {
+            "input": {"$ifNull": [expr, []]},
+            "initialValue": [],
+            "in": {"$concatArrays": ["$$value", _as_array("$$this")]},
+        }
+    }
+
+
+# industry -> clients / products / certifications -> file_urls in one round trip.
+# product_ids are stored as strings of the products' ObjectIds.
+LINKED_PIPELINE = [
+    {"$lookup": {"from": "clients", "localField": "client_ids", "foreignField": "_id", "as": "_clients"}},
+    {"$lookup": {
+        "from": "certifications", "localField": "certification_ids", "foreignField": "_id", "as": "_certifications",
+    }},
+    {"$addFields": {"_product_oids": {"$map": {
+        "input": _as_array("$product_ids"),
+        "as": "pid",
+        "in": {"$convert": {"input": "$$pid", "to": "objectId", "onError": None, "onNull": None}},
+    }}}},
+    {"$lookup": {"from": "products", "localField": "_product_oids", "foreignField": "_id", "as": "_products"}},
+    {"$addFields": {"_file_ids": {"$setUnion": [
+        _as_array("$industry_logo"),
+        _as_array("$cover_image"),
+        _as_array("$industry_images"),
+        _as_array("$industry_images.keep"),
+        _as_array("$industry_images.new_uploaded_ids"),
+        _flatten("$_clients.client_logo"),
+        _flatten("$_certifications.certificate_logo"),
+        _flatten("$_products.cover_image"),
+        _flatten("$_products.product_360_image"),
+        _flatten("$_products.product_3d_video"),
+        _flatten("$_products.images"),
+        _flatten("$_products.documents"),
+        _flatten({"$reduce": {
+            "input": {"$ifNull": ["$_products.features", []]},
+            "initialValue": [],
+            "in": {"$concatArrays": ["$$value", _as_array("$$this.image_id")]},
+        }}),
+    ]}}},
+    {"$lookup": {"from": "file_urls", "localField": "_file_ids", "foreignField": "file_id", "as": "_file_urls"}},
+    {"$project": {"_product_oids": 0, "_file_ids": 0}},
+]
+
 class IndustryRepository:
+    # list rows for `lite` responses
+    LITE_PROJECTION = {"long_description": 0}
 
     @staticmethod
     async def create_industry(doc: dict):
         doc["_id"] = doc.get("_id", str(uuid.uuid4()))
+        doc["version"] = 1
+        doc["updated_at"] = datetime.utcnow()
         await COLLECTION.insert_one(doc)
+        await CatalogVersionRepository.record_write("industries")
         return doc["_id"]
 
     @staticmethod
-    async def get_all_industries():
-        return await COLLECTION.find().to_list(None)
+    async def get_all_industries(projection: dict | None = None):
+        return await COLLECTION.find({}, projection).to_list(None)
 
     @staticmethod
-    async def get_industry_by_id(ind_id: str):
-        return await COLLECTION.find_one({"_id": ind_id})
+    async def get_industry_by_id(ind_id: str, projection: dict | None = None):
+        return await COLLECTION.find_one({"_id": ind_id}, projection)
+
+    @staticmethod
+    async def get_industries_linked(match: dict | None = None):
+        """
+        Industries with their linked documents resolved server-side:
+        `_clients`, `_products`, `_certifications` (unordered, de-duplicated)
+        and `_file_urls` for every file any of them references.
+        """
+        pipeline = ([{"$match": match}] if match else []) + LINKED_PIPELINE
+        return await COLLECTION.aggregate(pipeline).to_list(None)
+
+    @staticmethod
+    async def get_version(ind_id: str):
+        return await COLLECTION.find_one({"_id": ind_id}, {"version": 1, "updated_at": 1})
 
     @staticmethod
     async def update_industry(ind_id: str, update_data: dict):
-        await COLLECTION.update_one({"_id": ind_id}, {"$set": update_data})
+        await COLLECTION.update_one(
+            {"_id": ind_id},
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
+        )
+        await CatalogVersionRepository.record_write("industries")
         return await COLLECTION.find_one({"_id": ind_id})
 
     @staticmethod
     async def delete_industry(ind_id: str):
         result = await COLLECTION.delete_one({"_id": ind_id})
+        await CatalogVersionRepository.record_write("industries")
         return result.deleted_count > 0
@@ -1,34 +1,50 @@
 from app.config.database import db
+from app.repository.catalog_version_repository import CatalogVersionRepository
 import uuid
+from datetime import datetime
 
 COLLECTION = db["news"]
 
 
 class NewsRepository:
+    # list rows for `lite` responses
+    LITE_PROJECTION = {"long_description": 0}
 
     @staticmethod
     async def create_news(doc: dict):
         doc["_id"] = doc.get("_id", str(uuid.uuid4()))
+        doc["version"] = 1
+        doc["updated_at"] = datetime.utcnow()
         await COLLECTION.insert_one(doc)
+        await CatalogVersionRepository.record_write("news")
         return doc["_id"]
 
     @staticmethod
-    async def get_all_news():
-        return await COLLECTION.find().to_list(None)
+    async def get_all_news(projection: dict | None = None):
+        return await COLLECTION.find({}, projection).to_list(None)
 
     @staticmethod
-    async def get_news_by_id(news_id: str):
-        return await COLLECTION.find_one({"_id": news_id})
+    async def get_news_by_id(news_id: str, projection: dict | None = None):
+        return await COLLECTION.find_one({"_id": news_id}, projection)
+
+    @staticmethod
+    async def get_version(news_id: str):
+        return await COLLECTION.find_one({"_id": news_id}, {"version": 1, "updated_at": 1})
 
     @staticmethod
     async def update_news(news_id: str, update_data: dict):
         await COLLECTION.update_one(
             {"_id": news_id},
-            {"$set": update_data}
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
         )
+        await CatalogVersionRepository.record_write("news")
         return await COLLECTION.find_one({"_id": news_id})
 
     @staticmethod
     async def delete_news(news_id: str):
         result = await COLLECTION.delete_one({"_id": news_id})
+        await CatalogVersionRepository.record_write("news")
         return result.deleted_count > 0
@@ -1,8 +1,29 @@
 from app.config.database import db
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.core.indexes import register_indexes
+from app.core.pagination import decode_cursor, encode_cursor, keyset_query, sort_spec
 from bson.objectid import ObjectId
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
+from app.config.config import settings
+from app.services.notification_sink import NotificationSink
+from app.services.notification_hub import notification_hub
+from pymongo.errors import BulkWriteError
+import logging
+
+logger = logging.getLogger("notification_repository")
+
+# newest first; ObjectIds are assigned when the notification is created
+PAGE_SORT = "-_id"
+
 
 class NotificationRepository:
+    """
+    Besides `notifications`, keeps one counter document per user in
+    `notification_counters` ({"_id": user_email, "unread": int}). It is
+    adjusted by exactly the number of documents each write inserted or
+    flipped to read, so the unread count is a single-document read.
+    """
 
     @staticmethod
     async def create_notification(notification_data: dict):
@@ -15,17 +36,137 @@ class NotificationRepository:
             "created_at": datetime,
             "read": bool
         }
+
+        With NOTIFICATION_WRITE_BEHIND the document is queued on
+        `notification_sink` and written in a later batch; the returned id is
+        assigned up front either way.
         """
+        if hasattr(notification_data, "model_dump"):
+            notification_data = notification_data.model_dump()
         if "created_at" not in notification_data:
             notification_data["created_at"] = datetime.utcnow()
         if "read" not in notification_data:
             notification_data["read"] = False
+        notification_data.setdefault("_id", ObjectId())
 
+        if settings.NOTIFICATION_WRITE_BEHIND:
+            notification_sink.submit(notification_data)
+            return str(notification_data["_id"])
         result = await db.notifications.insert_one(notification_data)
+        await NotificationRepository._inserted([notification_data])
         return str(result.inserted_id)
 
+    @staticmethod
+    async def insert_notifications(docs: list[dict]):
+        # unordered: one bad document does not hold back the rest of the batch
+        await db.notifications.insert_many(docs, ordered=False)
+
+    @staticmethod
+    async def _inserted(docs: list[dict]):
+        """
+        Unread counters and live delivery for notifications that are stored.
+        Runs once per document, after (never inside) the insert retries; a
+        document without a usable `user_email` only skips itself.
+        """
+        unread = Counter()
+        valid = []
+        for doc in docs:
+            email = doc.get("user_email")
+            if not isinstance(email, str) or not email:
+                logger.error(f"Notification {doc.get('_id')} has no usable user_email: {email!r}")
+                continue
+            if not doc.get("read"):
+                unread[email] += 1
+            valid.append(doc)
+        await NotificationRepository._adjust_unread(unread)
+        await notification_hub.publish(valid)
+
+    # ---------------- UNREAD COUNTERS ----------------
+    @staticmethod
+    async def _adjust_unread(deltas: dict):
+        # a batch rarely spans more than a couple of users (the acting admins)
+        for email, delta in deltas.items():
+            if not email or not delta:
+                continue
+            try:
+                await db.notification_counters.update_one({"_id": email}, {"$inc": {"unread": delta}}, upsert=True)
+            except Exception as e:
+                logger.error(f"Unread counter update failed user={email} delta={delta}: {e}")
+
+    @staticmethod
+    async def get_unread_count(user_email: str):
+        await notification_sink.flush()
+        doc = await db.notification_counters.find_one({"_id": user_email})
+        if not doc or "seeded_at" not in doc:
+            # first read for this user: start from a real count (notifications
+            # may predate the counters)
+            unread = await db.notifications.count_documents({"user_email": user_email, "read": False})
+            await db.notification_counters.update_one(
+                {"_id": user_email},
+                {"$set": {"unread": unread, "seeded_at": datetime.utcnow()}},
+                upsert=True,
+            )
+            return unread
+        # a read racing the counter increment of a fresh batch can dip below 0 briefly
+        return max(doc.get("unread", 0), 0)
+
+    @staticmethod
+    async def rebuild_unread_counts(user_email: str | None = None):
+        """Recounts from `notifications` (repair after manual edits). Returns {user_email: unread}."""
+        match = {"read": False}
+        if user_email:
+            match["user_email"] = user_email
+        rows = await db.notifications.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$user_email", "unread": {"$sum": 1}}},
+        ]).to_list(None)
+        counts = {r["_id"]: r["unread"] for r in rows}
+        now = datetime.utcnow()
+        reset = {"_id": user_email} if user_email else {}
+        await db.notification_counters.update_many(reset, {"$set": {"unread": 0, "seeded_at": now}})
+        for email, n in counts.items():
+            await db.notification_counters.update_one(
+                {"_id": email}, {"$set": {"unread": n, "seeded_at": now}}, upsert=True
+            )
+        return counts
+
+    # ---------------- PAGINATION ----------------
+    @staticmethod
+    async def find_user_notifications_after(user_email: str, limit: int, cursor: str = "", unread_only: bool = False):
+        """
+        Keyset page of a user's notifications, newest first. Returns
+        (notifications, next_cursor); next_cursor is None on the last page.
+        """
+        await notification_sink.flush()
+        query = {"user_email": user_email}
+        if unread_only:
+            query["read"] = False
+        after = decode_cursor(cursor, PAGE_SORT) if cursor else None
+        docs = await (
+            db.notifications.find(keyset_query(query, "_id", -1, after))
+            .sort(sort_spec("_id", -1))
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = encode_cursor(PAGE_SORT, docs[limit - 1]) if len(docs) > limit else None
+        notifications = []
+        for n in docs[:limit]:
+            n["id"] = str(n.pop("_id"))
+            notifications.append(n)
+        return notifications, next_cursor
+
+    @staticmethod
+    async def get_notifications_after(user_email: str, after_id: ObjectId, limit: int = 100):
+        """Oldest first; used to replay what a stream missed since `after_id`."""
+        await notification_sink.flush()
+        return await db.notifications.find(
+            {"user_email": user_email, "_id": {"$gt": after_id}}
+        ).sort("_id", ASCENDING).to_list(limit)
+
     @staticmethod
     async def get_user_notifications(user_email: str):
+        # read-your-writes within this process
+        await notification_sink.flush()
         notifications = await db.notifications.find({"user_email": user_email}).sort("created_at", -1).to_list(100)
         for n in notifications:
             n["id"] = str(n["_id"])
@@ -34,13 +175,109 @@ class NotificationRepository:
 
     @staticmethod
     async def mark_as_read(notification_id: str):
-        await db.notifications.update_one(
-            {"_id": ObjectId(notification_id)},
-            {"$set": {"read": True}}
+        await notification_sink.flush()
+        doc = await db.notifications.find_one_and_update(
+            {"_id": ObjectId(notification_id), "read": False},
+            {"$set": {"read": True, "read_at": datetime.utcnow()}},
+            projection={"user_email": 1},
         )
+        if doc and isinstance(doc.get("user_email"), str):
+            await NotificationRepository._adjust_unread({doc["user_email"]: -1})
         return True
 
+    @staticmethod
+    async def mark_read(user_email: str, notification_ids: list[str]):
+        """Marks the listed notifications of `user_email` read; returns how many changed."""
+        ids = [ObjectId(i) for i in dict.fromkeys(notification_ids)]
+        if not ids:
+            return 0
+        await notification_sink.flush()
+        result = await db.notifications.update_many(
+            {"_id": {"$in": ids}, "user_email": user_email, "read": False},
+            {"$set": {"read": True, "read_at": datetime.utcnow()}},
+        )
+        await NotificationRepository._adjust_unread({user_email: -result.modified_count})
+        return result.modified_count
+
+    @staticmethod
+    async def mark_all_read(user_email: str):
+        await notification_sink.flush()
+        result = await db.notifications.update_many(
+            {"user_email": user_email, "read": False},
+            {"$set": {"read": True, "read_at": datetime.utcnow()}},
+        )
+        await NotificationRepository._adjust_unread({user_email: -result.modified_count})
+        return result.modified_count
+
     @staticmethod
     async def delete_notification(notification_id: str):
-        await db.notifications.delete_one({"_id": ObjectId(notification_id)})
+        await notification_sink.flush()
+        doc = await db.notifications.find_one_and_delete(
+            {"_id": ObjectId(notification_id)}, projection={"user_email": 1, "read": 1}
+        )
+        if doc and not doc.get("read") and isinstance(doc.get("user_email"), str):
+            await NotificationRepository._adjust_unread({doc["user_email"]: -1})
         return True
+
+    # ---------------- RETENTION ----------------
+    @staticmethod
+    async def archive_notifications(older_than_days: int | None = None, batch_size: int = 1000):
+        """
+        Moves notifications created more than `older_than_days` ago (read or
+        not) to `notifications_archive`, keeping the unread counters in
+        step. Read notifications normally expire earlier through the TTL
+        index; this catches the ones nobody ever reads. Returns the number moved.
+        """
+        days = older_than_days if older_than_days is not None else settings.NOTIFICATION_ARCHIVE_AFTER_DAYS
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        moved = 0
+        while True:
+            docs = await db.notifications.find({"created_at": {"$lt": cutoff}}).limit(batch_size).to_list(batch_size)
+            if not docs:
+                return moved
+            try:
+                await db.notifications_archive.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # already archived by an earlier, interrupted run
+                if any(w.get("code") != 11000 for w in e.details.get("writeErrors", [])):
+                    raise
+            ids = [d["_id"] for d in docs]
+            unread = Counter(
+                d["user_email"]
+                # older product notifications stored the whole token payload
+                if isinstance(d.get("user_email"), str) else None
+                for d in await db.notifications.find(
+                    {"_id": {"$in": ids}, "read": False}, {"user_email": 1}
+                ).to_list(None)
+            )
+            await db.notifications.delete_many({"_id": {"$in": ids}})
+            await NotificationRepository._adjust_unread({email: -n for email, n in unread.items()})
+            moved += len(docs)
+
+
+notification_sink = NotificationSink(
+    NotificationRepository.insert_notifications, after_write=NotificationRepository._inserted
+)
+
+
+register_indexes(
+    "notifications",
+    IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)], name="user_email_1_created_at_-1"),
+    # stream replay after Last-Event-ID, keyset pages and unread filters
+    IndexModel([("user_email", ASCENDING), ("_id", ASCENDING)], name="user_email_1__id_1"),
+    IndexModel([("user_email", ASCENDING), ("read", ASCENDING), ("_id", ASCENDING)], name="user_email_1_read_1__id_1"),
+    # read notifications expire; unread ones are only archived (see archive_notifications)
+    IndexModel(
+        [("read_at", ASCENDING)],
+        name="read_at_1",
+        expireAfterSeconds=settings.NOTIFICATION_READ_TTL_DAYS * 24 * 3600,
+    ),
+)
+register_indexes(
+    "notifications_archive",
+    IndexModel(
+        [("created_at", ASCENDING)],
+        name="created_at_1",
+        expireAfterSeconds=settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS * 24 * 3600,
+    ),
+)
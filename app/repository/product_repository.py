@@ -1,64 +1,162 @@
 from unittest import skip
 from app.config.database import db
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import register_indexes
+from app.config.config import settings
+from app.core.pagination import decode_cursor, encode_cursor, keyset_query, parse_sort, sort_spec
+from app.repository.catalog_version_repository import CatalogVersionRepository
 from bson.objectid import ObjectId
+from datetime import datetime
 
 
 
 
 class ProductRepository:
+    # fields a listing may be sorted / seeked by, besides `_id`
+    SORT_FIELDS = ("name",)
+    # list rows for `lite` responses
+    LITE_PROJECTION = {"long_description": 0}
+    # what the spec index reads per product
+    SPEC_PROJECTION = {"productType": 1, "specifications": 1, "name": 1}
+
     def _serialize_product(product: dict):
         product["id"] = str(product["_id"])
         del product["_id"]
         return product
     @staticmethod
     async def create_product(product_data: dict):
+        product_data["version"] = 1
+        product_data["updated_at"] = datetime.utcnow()
         result = await db.products.insert_one(product_data)
+        await CatalogVersionRepository.record_write("products")
         return str(result.inserted_id)
 
     @staticmethod
-    async def get_all_products():
-        products = await db.products.find().to_list(500)
+    async def get_all_products(projection: dict | None = None):
+        products = await db.products.find({}, projection).to_list(500)
         for p in products:
             p["id"] = str(p["_id"])
             del p["_id"]
         return products
 
     @staticmethod
-    async def get_product_by_id(product_id: str):
-        product = await db.products.find_one({"_id": ObjectId(product_id)})
+    async def get_product_by_id(product_id: str, projection: dict | None = None):
+        product = await db.products.find_one({"_id": ObjectId(product_id)}, projection)
         if product:
             product["id"] = str(product["_id"])
             del product["_id"]
         return product
 
+    @staticmethod
+    async def get_version(product_id: str):
+        if not ObjectId.is_valid(product_id):
+            return None
+        return await db.products.find_one(
+            {"_id": ObjectId(product_id)}, {"version": 1, "updated_at": 1}
+        )
+
+    @staticmethod
+    async def get_spec_documents(updated_since: datetime | None = None):
+        """Every product, or those written at or after `updated_since` (every write sets `updated_at`)."""
+        query = {} if updated_since is None else {"updated_at": {"$gte": updated_since}}
+        return await db.products.find(query, ProductRepository.SPEC_PROJECTION).to_list(None)
+
+    @staticmethod
+    async def get_ids():
+        docs = await db.products.find({}, {"_id": 1}).to_list(None)
+        return {d["_id"] for d in docs}
+
+    @staticmethod
+    async def get_products_by_ids(ids: list, projection: dict | None = None):
+        """The products with these `_id`s, in the order given."""
+        if not ids:
+            return []
+        docs = await db.products.find({"_id": {"$in": list(ids)}}, projection).to_list(None)
+        by_id = {d["_id"]: d for d in docs}
+        return [ProductRepository._serialize_product(by_id[i]) for i in ids if i in by_id]
+
     @staticmethod
     async def update_product(product_id: str, update_data: dict):
         await db.products.update_one(
             {"_id": ObjectId(product_id)},
-            {"$set": update_data}
+            {
+                "$set": {**update_data, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            }
         )
+        await CatalogVersionRepository.record_write("products")
         return True
 
     @staticmethod
     async def delete_product(product_id: str):
         await db.products.delete_one({"_id": ObjectId(product_id)})
+        await CatalogVersionRepository.record_write("products")
         return True
     
     @staticmethod
-    async def get_products_paginated(skip: int, limit: int):
-        products = await db.products.find().skip(skip).limit(limit).to_list(limit)
-        return [ProductRepository._serialize_product(p) for p in products]
+    async def get_products_paginated(skip: int, limit: int, sort: str | None = None, projection: dict | None = None):
+        return await ProductRepository.filter_products({}, skip, limit, sort, projection)
 
     @staticmethod
     async def count_products():
         return await db.products.count_documents({})
 
     @staticmethod
-    async def filter_products(query: dict, skip: int, limit: int):
-        products = await db.products.find(query).skip(skip).limit(limit).to_list(limit)
+    async def filter_products(query: dict, skip: int, limit: int, sort: str | None = None, projection: dict | None = None):
+        cursor = db.products.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort_spec(*parse_sort(sort, ProductRepository.SORT_FIELDS)))
+        products = await cursor.skip(skip).limit(limit).to_list(limit)
         return [ProductRepository._serialize_product(p) for p in products]
     
     @staticmethod
     async def count_filtered_products(query: dict):
         return await db.products.count_documents(query)
 
+    @staticmethod
+    async def find_products_after(
+        query: dict, limit: int, sort: str | None = None, cursor: str = "", projection: dict | None = None
+    ):
+        """
+        Keyset page: seeks past `cursor` on (sort field, _id) instead of
+        skipping, so every page costs the same. Returns (products, next_cursor);
+        next_cursor is None on the last page.
+        """
+        sort = sort or "_id"
+        field, direction = parse_sort(sort, ProductRepository.SORT_FIELDS)
+        after = decode_cursor(cursor, sort) if cursor else None
+        docs = await (
+            db.products.find(keyset_query(query, field, direction, after), projection)
+            .sort(sort_spec(field, direction))
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = encode_cursor(sort, docs[limit - 1]) if len(docs) > limit else None
+        return [ProductRepository._serialize_product(p) for p in docs[:limit]], next_cursor
+
+    @staticmethod
+    async def count_products_by_mode(query: dict, mode: str):
+        """`exact`, `estimated` (collection metadata, or a capped count when filtered) or `none`."""
+        if mode == "none":
+            return None
+        if mode == "estimated":
+            if not query:
+                return await db.products.estimated_document_count()
+            return await db.products.count_documents(query, limit=settings.PAGINATION_COUNT_CAP)
+        return await db.products.count_documents(query)
+
+
+register_indexes(
+    "products",
+    # by-type listings, seeked on _id
+    IndexModel([("productType", ASCENDING), ("_id", ASCENDING)], name="productType_1__id_1"),
+    # /products/filter: {"specifications": {"$all": [{"$elemMatch": {key, value}}]}}
+    IndexModel(
+        [("specifications.key", ASCENDING), ("specifications.value", ASCENDING)],
+        name="specifications.key_1_specifications.value_1",
+    ),
+    # sort=name keyset pages
+    IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_1__id_1"),
+    # spec index refresh: products written since the last sync
+    IndexModel([("updated_at", ASCENDING)], name="updated_at_1"),
+)
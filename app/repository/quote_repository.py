@@ -1,4 +1,6 @@
 from app.config.database import db
+from pymongo import DESCENDING, IndexModel
+from app.core.indexes import register_indexes
 import uuid
 from datetime import datetime
 
@@ -21,3 +23,9 @@ class QuoteRepository:
     @staticmethod
     async def get_contact_by_id(quote_id: str):
         return await COLLECTION.find_one({"_id": quote_id})
+
+
+register_indexes(
+    "quotes",
+    IndexModel([("created_at", DESCENDING)], name="created_at_-1"),
+)
@@ -0,0 +1,44 @@
+from app.config.database import db
+
+# what the search index reads from each catalogue collection
+SOURCES = {
+    "product": {
+        "collection": "products",
+        "title": "name",
+        "text": ("productType", "short_description", "long_description", "specifications", "features"),
+        "image": ("cover_image",),
+    },
+    "industry": {
+        "collection": "industries",
+        "title": "industry_name",
+        "text": ("short_description", "long_description"),
+        "image": ("cover_image", "industry_logo"),
+    },
+    "news": {
+        "collection": "news",
+        "title": "title",
+        "text": ("short_description", "long_description"),
+        "image": ("cover_image", "news_logo"),
+    },
+}
+
+STAMP_PROJECTION = {"version": 1, "updated_at": 1}
+
+
+class SearchRepository:
+
+    @staticmethod
+    def _projection(kind: str):
+        source = SOURCES[kind]
+        return {f: 1 for f in (source["title"], *source["text"], *source["image"], *STAMP_PROJECTION)}
+
+    @staticmethod
+    async def get_stamps(kind: str):
+        """{_id: (version, updated_at)} for every document; every write changes the stamp."""
+        docs = await db[SOURCES[kind]["collection"]].find({}, STAMP_PROJECTION).to_list(None)
+        return {d["_id"]: (d.get("version"), d.get("updated_at")) for d in docs}
+
+    @staticmethod
+    async def get_documents(kind: str, ids: list | None = None):
+        query = {} if ids is None else {"_id": {"$in": list(ids)}}
+        return await db[SOURCES[kind]["collection"]].find(query, SearchRepository._projection(kind)).to_list(None)
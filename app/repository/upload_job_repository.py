@@ -0,0 +1,116 @@
+from app.config.database import db
+from app.config.config import settings
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import register_indexes
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+
+COLLECTION = db["upload_jobs"]
+
+PENDING = ("queued", "processing")
+
+
+class UploadJobRepository:
+    """
+    Background upload jobs, keyed by the file id handed back to the client:
+        {"_id": file_id, "kind": "image" | "doc" | "video" | "3d-model",
+         "filename", "content_type", "category", "staged_path", "size",
+         "status": "queued" | "processing" | "done" | "failed",
+         "interrupted": true (requeued by a shutdown mid-run),
+         "steps": {step: bool}, "progress": 0..1, "result", "error",
+         "created_at", "updated_at", "finished_at"}
+    """
+
+    @staticmethod
+    async def create_job(job: dict):
+        now = datetime.utcnow()
+        job.setdefault("status", "queued")
+        job.setdefault("steps", {})
+        job.setdefault("progress", 0.0)
+        job["created_at"] = job["updated_at"] = now
+        await COLLECTION.insert_one(job)
+        return job["_id"]
+
+    @staticmethod
+    async def get_job(file_id: str):
+        return await COLLECTION.find_one({"_id": file_id})
+
+    @staticmethod
+    async def get_pending_jobs():
+        return await COLLECTION.find({"status": {"$in": list(PENDING)}}).sort("created_at", ASCENDING).to_list(None)
+
+    @staticmethod
+    async def get_stale_jobs():
+        """
+        Jobs nobody is working on: "processing" without progress for
+        UPLOAD_JOB_STALE_SECONDS (their worker died), or "queued" that long
+        (the process that queued them went away before running them).
+        """
+        stale = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_JOB_STALE_SECONDS)
+        return await COLLECTION.find(
+            {"status": {"$in": list(PENDING)}, "updated_at": {"$lt": stale}},
+            {"_id": 1},
+        ).sort("created_at", ASCENDING).to_list(None)
+
+    @staticmethod
+    async def release_jobs(file_ids: list[str]):
+        """Hands jobs this process was running back to the queue (on shutdown)."""
+        if not file_ids:
+            return
+        await COLLECTION.update_many(
+            {"_id": {"$in": file_ids}, "status": "processing"},
+            {"$set": {"status": "queued", "interrupted": True, "updated_at": datetime.utcnow()}},
+        )
+
+    @staticmethod
+    async def claim_job(file_id: str):
+        """
+        Marks a job as processing for this worker. Returns the job as it was
+        before the claim (status "processing" or `interrupted` means an
+        earlier attempt was cut short), or None if it is finished or being
+        run elsewhere.
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.UPLOAD_JOB_STALE_SECONDS)
+        return await COLLECTION.find_one_and_update(
+            {
+                "_id": file_id,
+                "$or": [
+                    {"status": "queued"},
+                    {"status": "processing", "updated_at": {"$lt": stale}},
+                ],
+            },
+            {"$set": {"status": "processing", "steps": {}, "progress": 0.0, "updated_at": now},
+             "$unset": {"interrupted": ""}},
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    @staticmethod
+    async def complete_step(file_id: str, step: str, progress: float):
+        await COLLECTION.update_one(
+            {"_id": file_id},
+            {"$set": {f"steps.{step}": True, "updated_at": datetime.utcnow()}, "$max": {"progress": progress}},
+        )
+
+    @staticmethod
+    async def finish_job(file_id: str, status: str, result: dict | None = None, error: str | None = None):
+        now = datetime.utcnow()
+        fields = {"status": status, "updated_at": now, "finished_at": now}
+        if status == "done":
+            fields["progress"] = 1.0
+            fields["steps.finalize"] = True
+        if result is not None:
+            fields["result"] = result
+        if error is not None:
+            fields["error"] = error
+        await COLLECTION.update_one({"_id": file_id}, {"$set": fields})
+
+
+register_indexes(
+    "upload_jobs",
+    # startup recovery looks up unfinished jobs
+    IndexModel([("status", ASCENDING)], name="status_1"),
+    # finished jobs are only kept for status polling
+    IndexModel([("finished_at", ASCENDING)], name="finished_at_1",
+               expireAfterSeconds=settings.UPLOAD_JOB_RETENTION_SECONDS),
+)
@@ -1,29 +1,153 @@
 from app.config.database import db
+from app.repository.content_hash_repository import ContentHashRepository
+from app.services.file_storage import get_file_storage, ChunkSource
+from datetime import datetime
+import asyncio
+import mimetypes
 import uuid
 import base64
 
 class UploadRepository:
 
     COLLECTION = db["files"]  # <--- single source of truth
+    # everything except the inline base64 bytes
+    META_PROJECTION = {"content": 0}
 
     @staticmethod
-    async def save_file(filename: str, content_bytes: bytes):
-        file_id = str(uuid.uuid4())
-        b64 = base64.b64encode(content_bytes).decode("utf-8")
+    async def save_file(filename: str, content: ChunkSource, content_type: str | None = None,
+                        sha256: str | None = None, file_id: str | None = None):
+        """
+        Writes the raw bytes to the configured storage backend (GridFS by
+        default) and keeps only metadata in `files`.
+        """
+        file_id = file_id or str(uuid.uuid4())
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        storage = get_file_storage()
+        length = await storage.save(file_id, filename, content, content_type)
 
         file_doc = {
             "_id": file_id,
             "filename": filename,
-            "content": b64
+            "content_type": content_type,
+            "length": length,
+            "storage": storage.name,
+            "created_at": datetime.utcnow(),
         }
+        if sha256:
+            file_doc["sha256"] = sha256
 
         await UploadRepository.COLLECTION.insert_one(file_doc)
         return file_id
 
+    @staticmethod
+    async def save_reference(filename: str, content: dict, content_type: str | None = None, file_id: str | None = None):
+        """
+        New file id for already stored content (a `content_hashes` record):
+        the document points at the existing blob through `blob_id` instead
+        of writing the bytes again.
+        """
+        file_id = file_id or str(uuid.uuid4())
+        file_doc = {
+            "_id": file_id,
+            "filename": filename,
+            "content_type": content_type or content.get("content_type") or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "length": content.get("length"),
+            "storage": content.get("storage"),
+            "blob_id": content["blob_id"],
+            "sha256": content["_id"],
+            "created_at": datetime.utcnow(),
+        }
+        await UploadRepository.COLLECTION.insert_one(file_doc)
+        return file_id
+
+    @staticmethod
+    async def delete_file(file_id: str):
+        """
+        Removes a file id. Content shared with other uploads is only deleted
+        from storage once its last reference is gone.
+        """
+        doc = await UploadRepository.COLLECTION.find_one_and_delete({"_id": file_id}, UploadRepository.META_PROJECTION)
+        if not doc:
+            return False
+        blob_id = doc.get("blob_id") or doc["_id"]
+        content = await ContentHashRepository.release(doc["sha256"]) if doc.get("sha256") else None
+        if content is None:
+            blobs = {blob_id}
+        else:
+            blobs = set()
+            if content["refcount"] <= 0 and content.get("blob_id"):
+                blobs.add(content["blob_id"])
+            if not doc.get("blob_id") and doc["_id"] != content.get("blob_id"):
+                # a concurrent first upload of the same bytes stored its own copy
+                blobs.add(doc["_id"])
+        if doc.get("storage"):
+            storage = get_file_storage(doc["storage"])
+            for blob in blobs:
+                await storage.delete(blob)
+        return True
+
+    # ---------------- RAW BYTES (streaming) ----------------
+    @staticmethod
+    async def get_file_meta(file_id: str):
+        return await UploadRepository.COLLECTION.find_one({"_id": file_id}, UploadRepository.META_PROJECTION)
+
+    @staticmethod
+    async def get_legacy_content(file_id: str):
+        """Decoded bytes of a document that still stores inline base64 `content`."""
+        doc = await UploadRepository.COLLECTION.find_one({"_id": file_id}, {"content": 1})
+        if not doc or doc.get("content") is None:
+            return None
+        return base64.b64decode(doc["content"])
+
+    @staticmethod
+    async def iter_content(file_doc: dict, start: int = 0, end: int | None = None, legacy_bytes: bytes | None = None):
+        if file_doc.get("storage"):
+            # deduplicated uploads read the blob of the first copy
+            blob_id = file_doc.get("blob_id") or file_doc["_id"]
+            async for chunk in get_file_storage(file_doc["storage"]).stream(blob_id, start, end):
+                yield chunk
+            return
+        data = legacy_bytes if legacy_bytes is not None else b""
+        yield data[start:None if end is None else end + 1]
+
+    @staticmethod
+    async def read_content(file_doc: dict):
+        return b"".join([chunk async for chunk in UploadRepository.iter_content(file_doc)])
+
+    # ---------------- LEGACY (base64 `content`) ----------------
+    @staticmethod
+    async def _with_content(file_doc: dict | None):
+        # Older callers expect inline base64 `content`; build it on demand for
+        # documents whose bytes live in a storage backend.
+        if file_doc and "content" not in file_doc and file_doc.get("storage"):
+            raw = await UploadRepository.read_content(file_doc)
+            file_doc["content"] = base64.b64encode(raw).decode("utf-8")
+        return file_doc
+
     @staticmethod
     async def get_file(file_id: str):
-        return await UploadRepository.COLLECTION.find_one({"_id": file_id})
+        doc = await UploadRepository.COLLECTION.find_one({"_id": file_id})
+        return await UploadRepository._with_content(doc)
+
+    @staticmethod
+    async def get_file_by_id(file_id: str, include_content: bool = False):
+        """
+        Metadata of one file. `include_content` adds the bytes as base64
+        `content` (read back from storage); only legacy JSON shapes want it.
+        """
+        if not include_content:
+            return await UploadRepository.get_file_meta(file_id)
+        doc = await UploadRepository.COLLECTION.find_one({"_id": file_id})
+        return await UploadRepository._with_content(doc)
 
     @staticmethod
-    async def get_file_by_id(file_id: str):
-        return await UploadRepository.COLLECTION.find_one({"_id": file_id})
+    async def get_files_by_ids(file_ids: list[str], include_content: bool = False):
+        """Metadata of several files, keyed by id; `include_content` as for `get_file_by_id`."""
+        ids = list(dict.fromkeys(fid for fid in file_ids if fid))
+        if not ids:
+            return {}
+        projection = None if include_content else UploadRepository.META_PROJECTION
+        docs = await UploadRepository.COLLECTION.find({"_id": {"$in": ids}}, projection).to_list(None)
+        if include_content:
+            await asyncio.gather(*[UploadRepository._with_content(doc) for doc in docs])
+        return {doc["_id"]: doc for doc in docs}
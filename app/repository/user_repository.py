@@ -1,4 +1,6 @@
 from app.config.database import db 
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import register_indexes
 from app.models.user_model import User
 
 
@@ -12,9 +14,22 @@ class UserRepository:
     async def get_user_by_email(email: str):
         return await db.users.find_one({"email": email})
 
+    @staticmethod
+    async def update_password_hash(email: str, hashed_password: str):
+        return await db.users.update_one(
+            {"email": email},
+            {"$set": {"hashed_password": hashed_password}}
+        )
+
     @staticmethod
     async def update_login(email: str, time):
         return await db.users.update_one(
             {"email": email},
             {"$set": {"last_login": time}}
         )
+
+
+register_indexes(
+    "users",
+    IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+)
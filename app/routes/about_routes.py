@@ -151,7 +151,7 @@
 #     })
 
 #     return {"message": "About page deleted"}
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from datetime import datetime
 from typing import List
 
@@ -161,6 +161,9 @@ from app.repository.upload_repository import UploadRepository
 from app.repository.file_url_repository import FileUrlRepository
 from app.repository.notification_repository import NotificationRepository
 from app.services.auth_dependency import verify_user
+from app.services.file_resolver import FileResolver
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
 
 router = APIRouter(prefix="/about", tags=["About"])
 
@@ -173,7 +176,7 @@ async def expand_file(file_id: str):
     if not file_id:
         return None
 
-    f = await UploadRepository.get_file_by_id(file_id)
+    f = await UploadRepository.get_file_by_id(file_id, include_content=True)
     if not f:
         return None
 
@@ -297,6 +300,38 @@ async def expand_about_url(doc: dict):
     return doc
 
 
+# =========================================================
+# LITE (METADATA + URLS, NO BASE64 CONTENT)
+# =========================================================
+
+def gallery_ids(doc: dict):
+    ids = []
+    for item in doc.get("gallery", []):
+        if isinstance(item, str):
+            ids.append(item)
+        elif isinstance(item, dict):
+            ids.append(item.get("file_id"))
+    return [i for i in ids if i]
+
+
+async def expand_about_lite(docs: List[dict], request: Request):
+    ids = []
+    for doc in docs:
+        ids.append(doc.get("about_video"))
+        ids += doc.get("product_images", [])
+        ids += [i.get("image_id") for i in doc.get("industries_served", [])]
+        ids += gallery_ids(doc)
+    resolver = await FileResolver(request, with_meta=True).load(ids)
+
+    for doc in docs:
+        doc["about_video_file"] = resolver.file_lite(doc.get("about_video"))
+        doc["product_images_files"] = resolver.file_lite_list(doc.get("product_images", []))
+        for industry in doc.get("industries_served", []):
+            industry["image_file"] = resolver.file_lite(industry.get("image_id"))
+        doc["gallery_files"] = resolver.file_lite_list(gallery_ids(doc))
+    return docs
+
+
 # =========================================================
 # CREATE
 # =========================================================
@@ -328,13 +363,18 @@ async def create_about(payload: AboutCreate, user=Depends(verify_user)):
 # =========================================================
 
 @router.get("/", dependencies=[Depends(verify_user)])
-async def get_all_about(page: int = 1, limit: int = 10):
+@conditional_get("about", "file_urls", private=True)
+async def get_all_about(request: Request, page: int = 1, limit: int = 10, lite: bool = False):
     skip = (page - 1) * limit
 
-    data = await AboutRepository.get_all(skip, limit)
+    projection = AboutRepository.LITE_PROJECTION if lite else None
+    data = await AboutRepository.get_all(skip, limit, projection)
     total = await AboutRepository.count()
 
-    expanded = [await expand_about(d) for d in data]
+    if lite:
+        expanded = await expand_about_lite(data, request)
+    else:
+        expanded = [await expand_about(d) for d in data]
 
     return {
         "page": page,
@@ -349,7 +389,8 @@ async def get_all_about(page: int = 1, limit: int = 10):
 # =========================================================
 
 @router.get("/{about_id}", dependencies=[Depends(verify_user)])
-async def get_about(about_id: str):
+@conditional_get("file_urls", doc=(AboutRepository.get_version, "about_id"), private=True)
+async def get_about(about_id: str, request: Request):
     about = await AboutRepository.get_by_id(about_id)
     if not about:
         raise HTTPException(404, "About page not found")
@@ -362,7 +403,9 @@ async def get_about(about_id: str):
 # =========================================================
 
 @router.get("/url/")
-async def get_about_url():
+@conditional_get("about", "file_urls")
+@cached_response("about")
+async def get_about_url(request: Request):
     data = await AboutRepository.get_all()  # ✅ FIXED
 
     return {
@@ -376,7 +419,9 @@ async def get_about_url():
 # =========================================================
 
 @router.get("/url/{about_id}")
-async def get_about_url_by_id(about_id: str):
+@conditional_get("file_urls", doc=(AboutRepository.get_version, "about_id"))
+@cached_response("about")
+async def get_about_url_by_id(about_id: str, request: Request):
     about = await AboutRepository.get_by_id(about_id)
     if not about:
         raise HTTPException(404, "About page not found")
@@ -6,6 +6,9 @@ from app.repository.certificate_repository import CertificateRepository
 from app.repository.upload_repository import UploadRepository
 from app.repository.notification_repository import NotificationRepository
 from app.services.auth_dependency import verify_user
+from app.services.file_resolver import FileResolver
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
 from app.schemas.certificate_schema import CertificateCreate, CertificateUpdate
 import logging
 import asyncio
@@ -21,7 +24,7 @@ router = APIRouter(prefix="/certifications", tags=["Certifications"])
 async def expand_file_ids(file_ids: List[str]):
     expanded = []
     for fid in file_ids or []:
-        file_data = await UploadRepository.get_file_by_id(fid)
+        file_data = await UploadRepository.get_file_by_id(fid, include_content=True)
         if file_data:
             expanded.append({
                 "id": str(file_data["_id"]),
@@ -38,7 +41,7 @@ async def expand_certificate(cert: dict):
     if isinstance(cert["certificate_logo"], list):
         cert["certificate_logo"] = await expand_file_ids(cert["certificate_logo"])
     else:
-        file_doc = await UploadRepository.get_file_by_id(cert["certificate_logo"])
+        file_doc = await UploadRepository.get_file_by_id(cert["certificate_logo"], include_content=True)
         if file_doc:
             cert["certificate_logo"] = {
                 "id": str(file_doc["_id"]),
@@ -48,6 +51,22 @@ async def expand_certificate(cert: dict):
     return cert
 
 
+async def expand_certificates_lite(certs: List[dict], request: Request):
+    def logo_ids(cert):
+        logo = cert.get("certificate_logo")
+        return logo if isinstance(logo, list) else [logo]
+
+    resolver = await FileResolver(request, with_meta=True).load(
+        [i for c in certs for i in logo_ids(c)]
+    )
+    for cert in certs:
+        if isinstance(cert.get("certificate_logo"), list):
+            cert["certificate_logo"] = resolver.file_lite_list(cert["certificate_logo"])
+        elif cert.get("certificate_logo"):
+            cert["certificate_logo"] = resolver.file_lite(cert["certificate_logo"]) or cert["certificate_logo"]
+    return certs
+
+
 # ------------------------------------------------------------------
 # CREATE Certificate (Product-style)
 # ------------------------------------------------------------------
@@ -76,57 +95,38 @@ async def create_certificate(payload: CertificateCreate, user=Depends(verify_use
 
 
 # ------------------------------------------------------------------
-# Helper: expand file ids to Cloudinary URLs
+# Helper: expand certificate logo ids to URLs
 # ------------------------------------------------------------------
-async def expand_file_url_ids(file_ids: List[str], request: Request):
-    ids = file_ids or []
-    docs = await asyncio.gather(
-        *[FileUrlRepository.get_url_by_file_id(fid) for fid in ids],
-        return_exceptions=False
-    )
-    result = []
-    for fid, f in zip(ids, docs):
-        if f:
-            url_value = f["url"]
-            if isinstance(url_value, str) and url_value.startswith("/"):
-                url_value = str(request.base_url) + url_value.lstrip("/")
-            result.append({
-                "file_id": str(fid),
-                "filename": f["filename"],
-                "url": url_value
-            })
-    return result
-
-
-async def expand_certificate_url(cert: dict, request: Request):
+def hydrate_certificate_url(cert: dict, resolver: FileResolver):
     if not cert or not cert.get("certificate_logo"):
         return cert
 
     if isinstance(cert["certificate_logo"], list):
-        cert["certificate_logo"] = await expand_file_url_ids(cert["certificate_logo"], request)
-        logger.info("EXPANDED CERT LOGO LIST:", cert["certificate_logo"])
+        cert["certificate_logo"] = [f for f in resolver.file_url_list(cert["certificate_logo"]) if f]
     else:
-        f = await FileUrlRepository.get_url_by_file_id(cert["certificate_logo"])
-        logger.info("EXPANDED CERT LOGO SINGLE FILE:", f)
-        if f:
-            url_value = f["url"]
-            if isinstance(url_value, str) and url_value.startswith("/"):
-                url_value = str(request.base_url) + url_value.lstrip("/")
-            cert["certificate_logo"] = {
-                "file_id": cert["certificate_logo"],
-                "filename": f["filename"],
-                "url": url_value
-            }
-
+        cert["certificate_logo"] = resolver.file_url(cert["certificate_logo"]) or cert["certificate_logo"]
     return cert
 
 
+async def expand_certificate_url(cert: dict, request: Request):
+    if not cert or not cert.get("certificate_logo"):
+        return cert
+
+    logo = cert["certificate_logo"]
+    resolver = await FileResolver(request).load(logo if isinstance(logo, list) else [logo])
+    return hydrate_certificate_url(cert, resolver)
+
+
 # ------------------------------------------------------------------
 # GET all Certificates (Product-style)
 # ------------------------------------------------------------------
 @router.get("/")
-async def get_certificates():
+@conditional_get("certifications", "file_urls")
+async def get_certificates(request: Request, lite: bool = False):
     certs = await CertificateRepository.get_all_certificates()
+    if lite:
+        certs = await expand_certificates_lite(certs, request)
+        return {"count": len(certs), "certificates": certs}
 
     expanded = []
     for cert in certs:
@@ -142,7 +142,8 @@ async def get_certificates():
 # GET Certificate by ID (Product-style)
 # ------------------------------------------------------------------
 @router.get("/{cert_id}")
-async def get_certificate(cert_id: str):
+@conditional_get("file_urls", doc=(CertificateRepository.get_version, "cert_id"))
+async def get_certificate(cert_id: str, request: Request):
     cert = await CertificateRepository.get_certificate_by_id(cert_id)
     if not cert:
         raise HTTPException(status_code=404, detail="Certificate not found")
@@ -225,6 +226,8 @@ async def delete_certificate(cert_id: str, user=Depends(verify_user)):
 
 
 @router.get("/url/")
+@conditional_get("certifications", "file_urls")
+@cached_response("certifications")
 async def get_certificates_url(request: Request):
     certs = await CertificateRepository.get_all_certificates()
     expanded = await asyncio.gather(*[expand_certificate_url(c, request) for c in certs]) if certs else []
@@ -235,6 +238,8 @@ async def get_certificates_url(request: Request):
 
 
 @router.get("/url/{cert_id}")
+@conditional_get("file_urls", doc=(CertificateRepository.get_version, "cert_id"))
+@cached_response("certifications")
 async def get_certificate_url(cert_id: str, request: Request):
     cert = await CertificateRepository.get_certificate_by_id(cert_id)
     if not cert:
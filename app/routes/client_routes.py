@@ -6,6 +6,9 @@ from app.repository.client_repository import ClientRepository
 from app.repository.upload_repository import UploadRepository
 from app.repository.notification_repository import NotificationRepository
 from app.services.auth_dependency import verify_user
+from app.services.file_resolver import FileResolver
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
 from app.schemas.client_schema import ClientCreate, ClientUpdate
 import asyncio
 
@@ -16,7 +19,7 @@ router = APIRouter(prefix="/clients", tags=["Clients"])
 async def expand_file_ids(file_ids: List[str]):
     expanded = []
     for fid in file_ids or []:
-        file_data = await UploadRepository.get_file_by_id(fid)
+        file_data = await UploadRepository.get_file_by_id(fid, include_content=True)
         if file_data:
             expanded.append({
                 "id": file_data["_id"],
@@ -27,52 +30,33 @@ async def expand_file_ids(file_ids: List[str]):
 
 
 # ------------------------------------------------------------------
-# Helper: expand file ids to Cloudinary URLs (Client)
+# Helper: expand client logo ids to URLs
 # ------------------------------------------------------------------
-async def expand_file_url_ids(file_ids: List[str], request: Request):
-    ids = file_ids or []
-    docs = await asyncio.gather(
-        *[FileUrlRepository.get_url_by_file_id(fid) for fid in ids],
-        return_exceptions=False
-    )
-    result = []
-    for fid, f in zip(ids, docs):
-        if f:
-            url_value = f["url"]
-            if isinstance(url_value, str) and url_value.startswith("/"):
-                url_value = str(request.base_url) + url_value.lstrip("/")
-            result.append({
-                "file_id": fid,
-                "filename": f["filename"],
-                "url": url_value
-            })
-    return result
-
-
-async def expand_client_url(client: dict, request: Request):
+def hydrate_client_url(client: dict, resolver: FileResolver):
     if not client or not client.get("client_logo"):
         return client
 
     if isinstance(client["client_logo"], list):
-        client["client_logo"] = await expand_file_url_ids(client["client_logo"], request)
+        client["client_logo"] = [f for f in resolver.file_url_list(client["client_logo"]) if f]
     else:
-        f = await FileUrlRepository.get_url_by_file_id(client["client_logo"])
-        if f:
-            url_value = f["url"]
-            if isinstance(url_value, str) and url_value.startswith("/"):
-                url_value = str(request.base_url) + url_value.lstrip("/")
-            client["client_logo"] = {
-                "file_id": client["client_logo"],
-                "filename": f["filename"],
-                "url": url_value
-            }
-
+        client["client_logo"] = resolver.file_url(client["client_logo"]) or client["client_logo"]
     return client
 
 
+async def expand_client_url(client: dict, request: Request):
+    if not client or not client.get("client_logo"):
+        return client
+
+    logo = client["client_logo"]
+    resolver = await FileResolver(request).load(logo if isinstance(logo, list) else [logo])
+    return hydrate_client_url(client, resolver)
+
+
 
 
 @router.get("/url")
+@conditional_get("clients", "file_urls")
+@cached_response("clients")
 async def get_clients_url(request: Request):
     clients = await ClientRepository.get_all_clients()
     expanded = await asyncio.gather(*[expand_client_url(c, request) for c in clients]) if clients else []
@@ -83,6 +67,8 @@ async def get_clients_url(request: Request):
 
 
 @router.get("/url/{client_id}")
+@conditional_get("file_urls", doc=(ClientRepository.get_version, "client_id"))
+@cached_response("clients")
 async def get_client_url(client_id: str, request: Request):
     client = await ClientRepository.get_client_by_id(client_id)
     if not client:
@@ -106,7 +92,7 @@ async def create_client(payload: ClientCreate, user=Depends(verify_user)):
     if isinstance(client.get("client_logo"), list):
         client["client_logo"] = await expand_file_ids(client["client_logo"])
     elif client.get("client_logo"):
-        file_doc = await UploadRepository.get_file_by_id(client["client_logo"])
+        file_doc = await UploadRepository.get_file_by_id(client["client_logo"], include_content=True)
         if file_doc:
             client["client_logo"] = {
                 "id": file_doc["_id"],
@@ -136,7 +122,7 @@ async def expand_client(client: dict):
     if isinstance(client["client_logo"], list):
         client["client_logo"] = await expand_file_ids(client["client_logo"])
     else:
-        file_doc = await UploadRepository.get_file_by_id(client["client_logo"])
+        file_doc = await UploadRepository.get_file_by_id(client["client_logo"], include_content=True)
         if file_doc:
             client["client_logo"] = {
                 "id": file_doc["_id"],
@@ -146,9 +132,29 @@ async def expand_client(client: dict):
     return client
 
 
+async def expand_clients_lite(clients: List[dict], request: Request):
+    def logo_ids(client):
+        logo = client.get("client_logo")
+        return logo if isinstance(logo, list) else [logo]
+
+    resolver = await FileResolver(request, with_meta=True).load(
+        [i for c in clients for i in logo_ids(c)]
+    )
+    for client in clients:
+        if isinstance(client.get("client_logo"), list):
+            client["client_logo"] = resolver.file_lite_list(client["client_logo"])
+        elif client.get("client_logo"):
+            client["client_logo"] = resolver.file_lite(client["client_logo"]) or client["client_logo"]
+    return clients
+
+
 @router.get("/", dependencies=[Depends(verify_user)])
-async def get_clients():
+@conditional_get("clients", "file_urls", private=True)
+async def get_clients(request: Request, lite: bool = False):
     clients = await ClientRepository.get_all_clients()
+    if lite:
+        clients = await expand_clients_lite(clients, request)
+        return {"count": len(clients), "clients": clients}
 
     expanded = []
     for client in clients:
@@ -160,7 +166,8 @@ async def get_clients():
     }
 
 @router.get("/{client_id}", dependencies=[Depends(verify_user)])
-async def get_client(client_id: str):
+@conditional_get("file_urls", doc=(ClientRepository.get_version, "client_id"), private=True)
+async def get_client(client_id: str, request: Request):
     client = await ClientRepository.get_client_by_id(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import List
 from datetime import datetime
 import os
+import copy
 import asyncio
 
 from app.repository.industry_repository import IndustryRepository
@@ -13,6 +14,10 @@ from app.repository.certificate_repository import CertificateRepository
 from app.repository.file_url_repository import FileUrlRepository
 
 from app.services.auth_dependency import verify_user
+from app.services.file_resolver import FileResolver, variant_list
+from app.config.config import settings
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
 from app.schemas.industry_schema import IndustryCreate, IndustryUpdate
 
 router = APIRouter(prefix="/industries", tags=["Industries"])
@@ -36,9 +41,8 @@ async def expand_products_url(ids: List[str], request: Request):
         *[ProductRepository.get_product_by_id(pid) for pid in ids],
         return_exceptions=False
     )
-    from app.routes.product_routes import expand_product_url
-    tasks = [expand_product_url(p, request) for p in products if p]
-    return await asyncio.gather(*tasks) if tasks else []
+    from app.routes.product_routes import expand_product_url_batch
+    return await expand_product_url_batch([p for p in products if p], request)
 
 
 async def expand_certifications_url(ids: List[str], request: Request):
@@ -55,7 +59,7 @@ async def expand_certifications_url(ids: List[str], request: Request):
 async def expand_file(file_id: str | None):
     if not file_id:
         return None
-    file = await UploadRepository.get_file_by_id(file_id)
+    file = await UploadRepository.get_file_by_id(file_id, include_content=True)
     if not file:
         return None
     return {
@@ -68,7 +72,7 @@ async def expand_file(file_id: str | None):
 async def expand_files(file_ids: List[str]):
     expanded = []
     for fid in file_ids or []:
-        file = await UploadRepository.get_file_by_id(fid)
+        file = await UploadRepository.get_file_by_id(fid, include_content=True)
         if file:
             expanded.append({
                 "id": file["_id"],
@@ -92,11 +96,14 @@ async def expand_file_url(file_id: str | None, request: Request):
     url_value = f["url"]
     if isinstance(url_value, str) and url_value.startswith("/"):
         url_value = str(request.base_url) + url_value.lstrip("/")
-    return {
+    res = {
         "file_id": file_id,
         "filename": f["filename"],
         "url": url_value
     }
+    if f.get("variants"):
+        res["variants"] = variant_list(f, request)
+    return res
 
 
 async def expand_files_url(file_ids: List[str], request: Request):
@@ -111,11 +118,14 @@ async def expand_files_url(file_ids: List[str], request: Request):
             url_value = f["url"]
             if isinstance(url_value, str) and url_value.startswith("/"):
                 url_value = str(request.base_url) + url_value.lstrip("/")
-            result.append({
+            res = {
                 "file_id": fid,
                 "filename": f["filename"],
                 "url": url_value
-            })
+            }
+            if f.get("variants"):
+                res["variants"] = variant_list(f, request)
+            result.append(res)
     return result
 
 async def hydrate_industry_url(industry: dict, request: Request):
@@ -160,17 +170,71 @@ async def hydrate_industry_url(industry: dict, request: Request):
 
     return industry
 
+# ---------- $lookup-joined hydration ----------
+
+def hydrate_industry_linked(industry: dict, request: Request):
+    """
+    Same output as `hydrate_industry_url`, built from a document returned by
+    `IndustryRepository.get_industries_linked` without further queries.
+    """
+    from app.routes.client_routes import hydrate_client_url
+    from app.routes.product_routes import hydrate_product_url
+    from app.routes.certificate_routes import hydrate_certificate_url
+
+    resolver = FileResolver(request)
+    for doc in industry.pop("_file_urls", []):
+        resolver.urls.setdefault(doc["file_id"], doc)
+    clients = {c["_id"]: c for c in industry.pop("_clients", [])}
+    products = {str(p["_id"]): p for p in industry.pop("_products", [])}
+    certs = {c["_id"]: c for c in industry.pop("_certifications", [])}
+
+    def linked(ids, docs):
+        # keep the stored order (and repeats); $lookup returns neither
+        return [copy.deepcopy(docs[i]) for i in map(str, ids or []) if i in docs]
+
+    industry["industry_logo"] = resolver.file_url(industry.get("industry_logo"))
+    industry["cover_image"] = resolver.file_url(industry.get("cover_image"))
+    industry["industry_images"] = [f for f in resolver.file_url_list(industry_image_ids(industry)) if f]
+    industry["clients"] = [
+        hydrate_client_url(c, resolver) for c in linked(industry.get("client_ids"), clients)
+    ]
+    industry["products"] = [
+        hydrate_product_url(ProductRepository._serialize_product(p), resolver)
+        for p in linked(industry.get("product_ids"), products)
+    ]
+    industry["certifications"] = [
+        hydrate_certificate_url(c, resolver) for c in linked(industry.get("certification_ids"), certs)
+    ]
+    return industry
+
+
 @router.get("/url/")
+@conditional_get("industries", "products", "clients", "certifications", "file_urls")
+@cached_response("industries")
 async def get_industries_url(request: Request):
-    industries = await IndustryRepository.get_all_industries()
+    if settings.INDUSTRY_LOOKUP_HYDRATION:
+        industries = await IndustryRepository.get_industries_linked()
+        return {
+            "count": len(industries),
+            "industries": [hydrate_industry_linked(i, request) for i in industries]
+        }
 
+    industries = await IndustryRepository.get_all_industries()
     return {
         "count": len(industries),
-        "industries": [await hydrate_industry_url(i, request) for i in industries]
+        "industries": list(await asyncio.gather(*[hydrate_industry_url(i, request) for i in industries]))
     }
 
 @router.get("/url/{industry_id}")
+@conditional_get("products", "clients", "certifications", "file_urls", doc=(IndustryRepository.get_version, "industry_id"))
+@cached_response("industries")
 async def get_industry_url(industry_id: str, request: Request):
+    if settings.INDUSTRY_LOOKUP_HYDRATION:
+        industries = await IndustryRepository.get_industries_linked({"_id": industry_id})
+        if not industries:
+            raise HTTPException(404, "Industry not found")
+        return hydrate_industry_linked(industries[0], request)
+
     industry = await IndustryRepository.get_industry_by_id(industry_id)
     if not industry:
         raise HTTPException(404, "Industry not found")
@@ -182,8 +246,8 @@ async def expand_clients(ids: List[str]):
     return [c for cid in ids if (c := await ClientRepository.get_client_by_id(cid))]
 
 
-async def expand_products(ids: List[str]):
-    return [p for pid in ids if (p := await ProductRepository.get_product_by_id(pid))]
+async def expand_products(ids: List[str], projection: dict | None = None):
+    return [p for pid in ids if (p := await ProductRepository.get_product_by_id(pid, projection))]
 
 
 async def expand_certifications(ids: List[str]):
@@ -205,6 +269,37 @@ async def hydrate_industry(industry: dict):
     return industry
 
 
+# ---------- lite (metadata + URLs, no base64 content) ----------
+
+def industry_image_ids(industry: dict):
+    raw_images = industry.get("industry_images", [])
+    if isinstance(raw_images, dict):
+        raw_images = raw_images.get("keep", []) + raw_images.get("new_uploaded_ids", [])
+    return [str(i) for i in raw_images or [] if i]
+
+
+async def hydrate_industry_lite(industry: dict, resolver: FileResolver):
+    industry["industry_logo"] = resolver.file_lite(industry.get("industry_logo"))
+    industry["cover_image"] = resolver.file_lite(industry.get("cover_image"))
+    industry["industry_images"] = resolver.file_lite_list(industry_image_ids(industry))
+
+    industry["clients"], industry["products"], industry["certifications"] = await asyncio.gather(
+        expand_clients(industry.get("client_ids", [])),
+        expand_products(industry.get("product_ids", []), ProductRepository.LITE_PROJECTION),
+        expand_certifications(industry.get("certification_ids", [])),
+    )
+    return industry
+
+
+async def expand_industries_lite(industries: List[dict], request: Request):
+    ids = [
+        i for ind in industries
+        for i in (ind.get("industry_logo"), ind.get("cover_image"), *industry_image_ids(ind))
+    ]
+    resolver = await FileResolver(request, with_meta=True).load(ids)
+    return list(await asyncio.gather(*[hydrate_industry_lite(i, resolver) for i in industries]))
+
+
 @router.post("/", dependencies=[Depends(verify_user)])
 async def create_industry(payload: IndustryCreate, user=Depends(verify_user)):
     data = payload.dict()
@@ -235,7 +330,14 @@ async def create_industry(payload: IndustryCreate, user=Depends(verify_user)):
     }
 
 @router.get("/", dependencies=[Depends(verify_user)])
-async def get_industries():
+@conditional_get("industries", "products", "clients", "certifications", "file_urls", private=True)
+async def get_industries(request: Request, lite: bool = False):
+    if lite:
+        industries = await IndustryRepository.get_all_industries(IndustryRepository.LITE_PROJECTION)
+        return {
+            "count": len(industries),
+            "industries": await expand_industries_lite(industries, request),
+        }
     industries = await IndustryRepository.get_all_industries()
     return {
         "count": len(industries),
@@ -244,7 +346,8 @@ async def get_industries():
 
 
 @router.get("/{industry_id}", dependencies=[Depends(verify_user)])
-async def get_industry(industry_id: str):
+@conditional_get("products", "clients", "certifications", "file_urls", doc=(IndustryRepository.get_version, "industry_id"), private=True)
+async def get_industry(industry_id: str, request: Request):
     industry = await IndustryRepository.get_industry_by_id(industry_id)
     if not industry:
         raise HTTPException(404, "Industry not found")
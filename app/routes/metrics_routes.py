@@ -0,0 +1,45 @@
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.config.config import settings
+from app.core.metrics import Gauge, Counter, registry
+from app.repository.notification_repository import notification_sink
+from app.services.search_index import search_index
+from app.services.spec_index import spec_index
+
+router = APIRouter(tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@registry.collector
+def notification_sink_metrics():
+    written = Counter("notifications_written_total", "Notifications written by the write-behind sink")
+    written.inc(notification_sink.metrics["written"])
+    dropped = Counter("notifications_dropped_total", "Notifications dropped on a full queue or failed flush")
+    dropped.inc(notification_sink.metrics["dropped"] + notification_sink.metrics["failed"])
+    pending = Gauge("notifications_pending", "Notifications waiting for their batch")
+    pending.set(notification_sink.pending)
+    return written, dropped, pending
+
+
+@registry.collector
+def index_metrics():
+    documents = Gauge("search_index_documents", "Documents in this worker's search index")
+    documents.set(search_index.stats()["documents"])
+    products = Gauge("spec_index_products", "Products in this worker's spec index")
+    products.set(spec_index.stats()["products"])
+    return documents, products
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, settings.METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
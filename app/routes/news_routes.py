@@ -8,6 +8,9 @@ from app.repository.upload_repository import UploadRepository
 from app.repository.file_url_repository import FileUrlRepository
 from app.repository.notification_repository import NotificationRepository
 from app.services.auth_dependency import verify_user
+from app.services.file_resolver import FileResolver
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
 from app.schemas.news_schema import NewsCreate, NewsUpdate
 
 router = APIRouter(prefix="/news", tags=["News"])
@@ -21,7 +24,7 @@ async def expand_file(file_id: str | None):
     if not file_id:
         return None
 
-    f = await UploadRepository.get_file_by_id(file_id)
+    f = await UploadRepository.get_file_by_id(file_id, include_content=True)
     if not f:
         return None
 
@@ -35,7 +38,7 @@ async def expand_file(file_id: str | None):
 async def expand_files(file_ids: List[str]):
     expanded = []
     for fid in file_ids or []:
-        f = await UploadRepository.get_file_by_id(fid)
+        f = await UploadRepository.get_file_by_id(fid, include_content=True)
         if f:
             expanded.append({
                 "id": f["_id"],
@@ -130,6 +133,30 @@ async def hydrate_news_url(news: dict, request: Request):
     return news
 
 
+# =====================================================
+# LITE (METADATA + URLS, NO BASE64 CONTENT)
+# =====================================================
+
+def news_image_ids(news: dict):
+    raw_images = news.get("news_images", [])
+    if isinstance(raw_images, dict):
+        raw_images = raw_images.get("keep", []) + raw_images.get("new_uploaded_ids", [])
+    return [str(i) for i in raw_images or [] if i]
+
+
+async def expand_news_lite(news_list: List[dict], request: Request):
+    ids = [
+        i for n in news_list
+        for i in (n.get("news_logo"), n.get("cover_image"), *news_image_ids(n))
+    ]
+    resolver = await FileResolver(request, with_meta=True).load(ids)
+    for n in news_list:
+        n["news_logo"] = resolver.file_lite(n.get("news_logo"))
+        n["cover_image"] = resolver.file_lite(n.get("cover_image"))
+        n["news_images"] = resolver.file_lite_list(news_image_ids(n))
+    return news_list
+
+
 # =====================================================
 # CREATE
 # =====================================================
@@ -167,7 +194,14 @@ async def create_news(payload: NewsCreate, user=Depends(verify_user)):
 # =====================================================
 
 @router.get("/", dependencies=[Depends(verify_user)])
-async def get_news():
+@conditional_get("news", "file_urls", private=True)
+async def get_news(request: Request, lite: bool = False):
+    if lite:
+        news = await NewsRepository.get_all_news(NewsRepository.LITE_PROJECTION)
+        return {
+            "count": len(news),
+            "news": await expand_news_lite(news, request),
+        }
     news = await NewsRepository.get_all_news()
     return {
         "count": len(news),
@@ -180,7 +214,8 @@ async def get_news():
 # =====================================================
 
 @router.get("/{news_id}", dependencies=[Depends(verify_user)])
-async def get_news_by_id(news_id: str):
+@conditional_get("file_urls", doc=(NewsRepository.get_version, "news_id"), private=True)
+async def get_news_by_id(news_id: str, request: Request):
     news = await NewsRepository.get_news_by_id(news_id)
     if not news:
         raise HTTPException(404, "News not found")
@@ -193,6 +228,8 @@ async def get_news_by_id(news_id: str):
 # =====================================================
 
 @router.get("/url/")
+@conditional_get("news", "file_urls")
+@cached_response("news")
 async def get_news_url(request: Request):
     items = await NewsRepository.get_all_news()
     expanded = await asyncio.gather(*[hydrate_news_url(n, request) for n in items]) if items else []
@@ -207,6 +244,8 @@ async def get_news_url(request: Request):
 # =====================================================
 
 @router.get("/url/{news_id}")
+@conditional_get("file_urls", doc=(NewsRepository.get_version, "news_id"))
+@cached_response("news")
 async def get_news_url_by_id(news_id: str, request: Request):
     news = await NewsRepository.get_news_by_id(news_id)
     if not news:
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends
-from app.repository.notification_repository import NotificationRepository
-from app.schemas.notification_schema import NotificationOut, NotificationCreate
-from app.services.auth_dependency import verify_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from bson.errors import InvalidId
+import asyncio
+import json
+from typing import Optional, Union
+from app.config.config import settings
+from app.repository.notification_repository import NotificationRepository, notification_sink
+from app.schemas.notification_schema import NotificationOut, NotificationCreate, NotificationIds, NotificationPage
+from app.services.auth_dependency import verify_user, verify_user_or_token
+from app.services.notification_hub import notification_hub
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -17,11 +26,108 @@ async def create_notification(message: str, type: str, payload=Depends(verify_us
     return {"message": "Notification created", "notification_id": notification_id}
 
 # ------------------------- GET USER NOTIFICATIONS -------------------------
-@router.get("/", dependencies=[Depends(verify_user)], response_model=list[NotificationOut])
-async def get_notifications(payload=Depends(verify_user)):
+@router.get("/", dependencies=[Depends(verify_user)], response_model=Union[list[NotificationOut], NotificationPage])
+async def get_notifications(
+    payload=Depends(verify_user),
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    unread: bool = False,
+):
+    """
+    Without `cursor`: the latest 100 notifications (unchanged). With
+    `cursor` (empty for the first page): a keyset page, newest first, plus
+    `next_cursor` and the unread count.
+    """
     user_email = payload["sub"]
-    notifications = await NotificationRepository.get_user_notifications(user_email)
-    return notifications
+    if cursor is None:
+        return await NotificationRepository.get_user_notifications(user_email)
+    limit = min(max(limit, 1), 100)
+    notifications, next_cursor = await NotificationRepository.find_user_notifications_after(
+        user_email, limit, cursor, unread_only=unread
+    )
+    unread_count = await NotificationRepository.get_unread_count(user_email)
+    return {"notifications": notifications, "next_cursor": next_cursor, "unread_count": unread_count}
+
+# ------------------------- UNREAD COUNT -------------------------
+@router.get("/unread-count", dependencies=[Depends(verify_user)])
+async def get_unread_count(payload=Depends(verify_user)):
+    return {"unread": await NotificationRepository.get_unread_count(payload["sub"])}
+
+# ------------------------- BULK MARK AS READ -------------------------
+@router.put("/mark-read", dependencies=[Depends(verify_user)])
+async def mark_notifications_read(body: NotificationIds, payload=Depends(verify_user)):
+    if not all(ObjectId.is_valid(i) for i in body.ids):
+        raise HTTPException(400, "Invalid notification id")
+    updated = await NotificationRepository.mark_read(payload["sub"], body.ids)
+    return {"message": "Notifications marked as read", "updated": updated}
+
+@router.put("/mark-all-read", dependencies=[Depends(verify_user)])
+async def mark_all_notifications_read(payload=Depends(verify_user)):
+    updated = await NotificationRepository.mark_all_read(payload["sub"])
+    return {"message": "All notifications marked as read", "updated": updated}
+
+# ------------------------- WRITE-BEHIND METRICS -------------------------
+@router.get("/metrics", dependencies=[Depends(verify_user)])
+async def notification_metrics():
+    """Counters of the notification write-behind queue and stream hub (this process only)."""
+    return {**notification_sink.stats(), "stream": notification_hub.stats()}
+
+# ------------------------- NOTIFICATION STREAM (SSE) -------------------------
+def sse_event(doc: dict):
+    data = NotificationOut(id=str(doc["_id"]), **{k: v for k, v in doc.items() if k not in ("_id", "id")})
+    return f"id: {doc['_id']}\nevent: notification\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+def parse_event_id(value: str | None):
+    try:
+        return ObjectId(value) if value else None
+    except (InvalidId, TypeError):
+        return None
+
+
+async def notification_events(user_email: str, last_id: ObjectId | None):
+    # subscribe before replaying, so nothing created in between is missed
+    async with notification_hub.subscribe(user_email) as sub:
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n"
+        if last_id is not None:
+            for doc in await NotificationRepository.get_notifications_after(
+                user_email, last_id, settings.NOTIFICATION_STREAM_BACKLOG
+            ):
+                yield sse_event(doc)
+                last_id = doc["_id"]
+        while True:
+            try:
+                doc = await asyncio.wait_for(sub.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if doc is None:
+                # fell too far behind (or shutting down); the client resumes from Last-Event-ID
+                return
+            if last_id is not None and doc["_id"] <= last_id:
+                continue
+            yield sse_event(doc)
+            last_id = doc["_id"]
+
+
+@router.get("/stream")
+async def stream_notifications(
+    payload=Depends(verify_user_or_token),
+    last_event_id: str | None = Header(None),
+    since: str | None = Query(None, description="resume after this notification id (same as Last-Event-ID)"),
+):
+    """
+    Server-Sent Events feed of the logged-in user's new notifications.
+    Reconnects send `Last-Event-ID` (browsers do this automatically) and get
+    what they missed replayed from Mongo; `: ping` comments keep idle
+    connections open through proxies.
+    """
+    last_id = parse_event_id(last_event_id or since)
+    return StreamingResponse(
+        notification_events(payload["sub"], last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # ------------------------- MARK NOTIFICATION AS READ -------------------------
 @router.put("/{notification_id}/read", dependencies=[Depends(verify_user)])
@@ -150,140 +150,40 @@ from app.schemas.product_schema import (
 )
 from app.repository.product_repository import ProductRepository
 from app.repository.notification_repository import NotificationRepository
-from app.repository.file_url_repository import FileUrlRepository
 from app.services.auth_dependency import verify_user
-from app.repository.upload_repository import UploadRepository
+from app.services.file_resolver import FileResolver, collect_product_file_ids
+from app.core.cache import cached_response
+from app.core.http_cache import conditional_get
+from app.core.pagination import check_count_mode, decode_cursor, encode_cursor, parse_sort
+from app.config.config import settings
+from app.services.spec_index import spec_index
 from typing import Optional
 import logging
-import asyncio
 logging.basicConfig(level=logging.INFO)
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
-# ---------------- EXPAND FILE IDS ----------------
-async def expand_file(file_id: str):
-    if not file_id:
-        return None
-    f = await UploadRepository.get_file_by_id(file_id)
-    if not f:
-        return None
-    return {"id": f["_id"], "filename": f["filename"], "content": f["content"]}
-
-
-async def expand_file_list(ids: list[str]):
-    return [await expand_file(i) for i in ids if i]
-
-
-async def expand_file_with_url(file_id: str):
-    if not file_id:
-        return None
-    base = await UploadRepository.get_file_by_id(file_id)
-    url_doc = await FileUrlRepository.get_url_by_file_id(file_id)
-    if not base and not url_doc:
-        return None
-    res = {}
-    if base:
-        res.update(
-            {
-                "id": base["_id"],
-                "filename": base["filename"],
-                "content": base["content"],
-            }
-        )
-    else:
-        res.update(
-            {"id": file_id, "filename": url_doc.get("filename") if url_doc else None}
-        )
-    if url_doc:
-        res.update({"url": url_doc.get("url"), "type": url_doc.get("type")})
-    return res
-
-
-async def expand_file_with_url_list(ids: list[str]):
-    return [await expand_file_with_url(i) for i in ids if i]
-
-async def expand_file_meta(file_id: str, request: Request):
-    if not file_id:
-        return None
-    f = await FileUrlRepository.get_url_by_file_id(file_id)
-    if not f:
-        return {"id": str(file_id), "filename": None, "content": None}
-    url_value = f.get("url")
-    if isinstance(url_value, str) and url_value.startswith("/"):
-        url_value = str(request.base_url) + url_value.lstrip("/")
-    return {
-        "id": str(file_id),
-        "filename": f.get("filename"),
-        "url": url_value,
-        "content": None,
-    }
-
-async def expand_file_meta_list(ids: list[str], request: Request):
-    tasks = [expand_file_meta(i, request) for i in ids if i]
-    return await asyncio.gather(*tasks) if tasks else []
-
-async def expand_file_url(file_id: str, request: Request):
-    if not file_id:
-        return None
-
-    f = await FileUrlRepository.get_url_by_file_id(file_id)
-    if not f:
-        return None
-
-    url_value = f["url"]
-    if isinstance(url_value, str) and url_value.startswith("/"):
-        url_value = str(request.base_url) + url_value.lstrip("/")
-    return {"file_id": str(file_id), "filename": f["filename"], "url": url_value}
-
-
-async def expand_file_url_list(ids: list[str], request: Request):
-    tasks = [expand_file_url(i, request) for i in ids if i]
-    return await asyncio.gather(*tasks) if tasks else []
-
-
-async def expand_video(file_id: str, request: Request):
-    if not file_id:
-        return None
-
-    f = await FileUrlRepository.get_url_by_file_id(file_id)
-    if not f:
-        return None
-
-    url_value = f.get("url")
-    if isinstance(url_value, str) and url_value.startswith("/"):
-        url_value = str(request.base_url) + url_value.lstrip("/")
-    return {
-        "file_id": str(file_id),
-        "filename": f.get("filename"),
-        "url": url_value,
-        "type": "video",
-    }
-
 # ---------------- EXPAND PRODUCT (URL ONLY) ----------------
-async def expand_product_url(product: dict, request: Request):
-    cover_task = expand_file_url(product.get("cover_image"), request)
-    p360_task = expand_file_url(product.get("product_360_image"), request)
-    video_task = expand_video(product.get("product_3d_video"), request)
-    images_task = expand_file_url_list(product.get("images", []), request)
-    docs_task = expand_file_url_list(product.get("documents", []), request)
+def hydrate_product_url(product: dict, resolver: FileResolver):
+    product["cover_image"] = resolver.file_url(product.get("cover_image"))
+    product["product_360_image"] = resolver.file_url(product.get("product_360_image"))
+    product["product_3d_video"] = resolver.video(product.get("product_3d_video"))
+    product["images"] = resolver.file_url_list(product.get("images", []))
+    product["documents"] = resolver.file_url_list(product.get("documents", []))
+    for f in product.get("features", []):
+        f["image"] = resolver.file_url(f.get("image_id"))
+    return product
 
-    features = product.get("features", [])
-    feature_tasks = [expand_file_url(f.get("image_id"), request) for f in features]
 
-    cover, p360, video, images, docs, feature_images = await asyncio.gather(
-        cover_task, p360_task, video_task, images_task, docs_task, asyncio.gather(*feature_tasks) if feature_tasks else asyncio.gather()
-    )
+async def expand_product_url_batch(products: list[dict], request: Request):
+    ids = [i for p in products for i in collect_product_file_ids(p)]
+    resolver = await FileResolver(request).load(ids)
+    return [hydrate_product_url(p, resolver) for p in products]
 
-    product["cover_image"] = cover
-    product["product_360_image"] = p360
-    product["product_3d_video"] = video
-    product["images"] = images
-    product["documents"] = docs
-    for f, img in zip(features, feature_images if feature_images else []):
-        f["image"] = img
 
-    return product
+async def expand_product_url(product: dict, request: Request):
+    return (await expand_product_url_batch([product], request))[0]
 
 
 def get_pagination(page: int, limit: int):
@@ -293,6 +193,59 @@ def get_pagination(page: int, limit: int):
     return skip, limit
 
 
+async def paginate_products(
+    query: dict,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: Optional[str],
+    count: Optional[str],
+    projection: Optional[dict] = None,
+):
+    """
+    page/limit (skip based, exact count by default) or, when `cursor` is
+    given, keyset pagination (count off by default). An empty cursor starts
+    at the first page. Returns (products, response metadata).
+    """
+    if cursor is not None:
+        limit = min(max(limit, 1), 100)
+        products, next_cursor = await ProductRepository.find_products_after(query, limit, sort, cursor, projection)
+        total = await ProductRepository.count_products_by_mode(query, check_count_mode(count, "none"))
+        return products, {"limit": limit, "next_cursor": next_cursor, "total": total}
+
+    skip, limit = get_pagination(page, limit)
+    products = await ProductRepository.filter_products(query, skip, limit, sort, projection)
+    total = await ProductRepository.count_products_by_mode(query, check_count_mode(count))
+    return products, {"page": page, "limit": limit, "total": total}
+
+
+async def paginate_matches(
+    matched: int,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    sort: Optional[str],
+    projection: Optional[dict] = None,
+):
+    """
+    `paginate_products` over a spec index match: the page is picked from the
+    index, so Mongo only loads its rows. The caller sets `total`.
+    """
+    field, direction = parse_sort(sort, ProductRepository.SORT_FIELDS)
+    if cursor is not None:
+        limit = min(max(limit, 1), 100)
+        sort = sort or "_id"
+        after = decode_cursor(cursor, sort) if cursor else None
+        ids = spec_index.page(matched, field, direction, 0, limit + 1, after)
+        next_cursor = encode_cursor(sort, spec_index.cursor_doc(ids[limit - 1])) if len(ids) > limit else None
+        products = await ProductRepository.get_products_by_ids(ids[:limit], projection)
+        return products, {"limit": limit, "next_cursor": next_cursor}
+
+    skip, limit = get_pagination(page, limit)
+    ids = spec_index.page(matched, field, direction, skip, limit)
+    return await ProductRepository.get_products_by_ids(ids, projection), {"page": page, "limit": limit}
+
+
 # ---------------- CREATE ----------------
 @router.post("/", dependencies=[Depends(verify_user)])
 async def create_product(payload: ProductCreate, user=Depends(verify_user)):
@@ -305,7 +258,7 @@ async def create_product(payload: ProductCreate, user=Depends(verify_user)):
 
     await NotificationRepository.create_notification(
         {
-            "user_email": user,
+            "user_email": user["sub"],
             "message": f"Product '{product['name']}' created",
             "type": "product_created",
             "created_at": datetime.utcnow(),
@@ -316,74 +269,111 @@ async def create_product(payload: ProductCreate, user=Depends(verify_user)):
 
 
 # ---------------- EXPAND PRODUCT ----------------
-async def expand_product(product: dict):
-    product["cover_image"] = await expand_file_with_url(product.get("cover_image"))
-    product["product_360_image"] = await expand_file_with_url(
-        product.get("product_360_image")
-    )
-    product["product_3d_video"] = await expand_file_with_url(
-        product.get("product_3d_video")
-    )
+def hydrate_product(product: dict, resolver: FileResolver):
+    product["cover_image"] = resolver.file_with_url(product.get("cover_image"))
+    product["product_360_image"] = resolver.file_with_url(product.get("product_360_image"))
+    product["product_3d_video"] = resolver.file_with_url(product.get("product_3d_video"))
 
-    product["images"] = await expand_file_with_url_list(product.get("images", []))
-    product["documents"] = await expand_file_with_url_list(product.get("documents", []))
+    product["images"] = resolver.file_with_url_list(product.get("images", []))
+    product["documents"] = resolver.file_with_url_list(product.get("documents", []))
 
     for f in product.get("features", []):
-        f["image"] = await expand_file_with_url(f.get("image_id"))
+        f["image"] = resolver.file_with_url(f.get("image_id"))
 
     return product
 
 
-# ---------------- GET ALL ----------------
-@router.get("/")
-async def get_products(page: int = 1, limit: int = 10):
-    skip, limit = get_pagination(page, limit)
+async def expand_product_batch(products: list[dict]):
+    ids = [i for p in products for i in collect_product_file_ids(p)]
+    resolver = await FileResolver(with_content=True).load(ids)
+    return [hydrate_product(p, resolver) for p in products]
 
-    products = await ProductRepository.get_products_paginated(skip, limit)
-    total = await ProductRepository.count_products()
 
-    return {
-        "page": page,
-        "limit": limit,
-        "total": total,
-        "products": [await expand_product(p) for p in products],
-    }
+async def expand_product(product: dict):
+    return (await expand_product_batch([product]))[0]
+
+
+# ---------------- EXPAND PRODUCT (LITE: METADATA + URLS) ----------------
+def hydrate_product_lite(product: dict, resolver: FileResolver):
+    product["cover_image"] = resolver.file_lite(product.get("cover_image"))
+    product["product_360_image"] = resolver.file_lite(product.get("product_360_image"))
+    product["product_3d_video"] = resolver.file_lite(product.get("product_3d_video"))
+    product["images"] = resolver.file_lite_list(product.get("images", []))
+    product["documents"] = resolver.file_lite_list(product.get("documents", []))
+    for f in product.get("features", []):
+        f["image"] = resolver.file_lite(f.get("image_id"))
+    return product
+
+
+async def expand_product_lite_batch(products: list[dict], request: Request):
+    ids = [i for p in products for i in collect_product_file_ids(p)]
+    resolver = await FileResolver(request, with_meta=True).load(ids)
+    return [hydrate_product_lite(p, resolver) for p in products]
+
+
+# ---------------- GET ALL ----------------
+@router.get("/")
+@conditional_get("products", "file_urls")
+async def get_products(
+    request: Request,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    count: Optional[str] = None,
+    lite: bool = False,
+):
+    if lite:
+        products, meta = await paginate_products(
+            {}, page, limit, cursor, sort, count, ProductRepository.LITE_PROJECTION
+        )
+        return {**meta, "products": await expand_product_lite_batch(products, request)}
+    products, meta = await paginate_products({}, page, limit, cursor, sort, count)
+    return {**meta, "products": await expand_product_batch(products)}
 
 
 # ---------------- GET ONE ----------------
 @router.get("/{product_id}")
-async def get_product(product_id: str):
-    product = await ProductRepository.get_product_by_id(product_id)
+@conditional_get("file_urls", doc=(ProductRepository.get_version, "product_id"))
+async def get_product(product_id: str, request: Request, lite: bool = False):
+    product = await ProductRepository.get_product_by_id(
+        product_id, ProductRepository.LITE_PROJECTION if lite else None
+    )
     if not product:
         raise HTTPException(404, "Product not found")
+    if lite:
+        return (await expand_product_lite_batch([product], request))[0]
     return await expand_product(product)
 
 
 @router.get("/url/")
-async def get_products_url(request: Request, page: Optional[int] = None, limit: Optional[int] = None):
-    if page is None and limit is None:
+@conditional_get("products", "file_urls")
+@cached_response("products")
+async def get_products_url(
+    request: Request,
+    page: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    count: Optional[str] = None,
+):
+    if page is None and limit is None and cursor is None:
         products = await ProductRepository.get_all_products()
         total = len(products)
-        expanded = await asyncio.gather(*[expand_product_url(p, request) for p in products]) if products else []
+        expanded = await expand_product_url_batch(products, request)
         return {
             "page": 1,
             "limit": total,
             "total": total,
             "products": expanded,
         }
-    skip, limit = get_pagination(page or 1, limit or 10)
-    products = await ProductRepository.get_products_paginated(skip, limit)
-    total = await ProductRepository.count_products()
-    expanded = await asyncio.gather(*[expand_product_url(p, request) for p in products]) if products else []
-    return {
-        "page": page or 1,
-        "limit": limit,
-        "total": total,
-        "products": expanded,
-    }
+    products, meta = await paginate_products({}, page or 1, limit or 10, cursor, sort, count)
+    return {**meta, "products": await expand_product_url_batch(products, request)}
 
 
 @router.get("/url/{product_id}")
+@conditional_get("file_urls", doc=(ProductRepository.get_version, "product_id"))
+@cached_response("products")
 async def get_product_by_id_url(product_id: str, request: Request):
     product = await ProductRepository.get_product_by_id(product_id)
 
@@ -452,9 +442,7 @@ async def delete_product(product_id: str, request: Request):
 
 
 @router.post("/filter")
-async def filter_products(payload: ProductFilterRequest):
-    skip, limit = get_pagination(payload.page, payload.limit)
-
+async def filter_products(payload: ProductFilterRequest, request: Request):
     query = {}
 
     # --- productType filter ---
@@ -476,61 +464,57 @@ async def filter_products(payload: ProductFilterRequest):
             status_code=400, detail="At least one valid filter is required"
         )
 
-    products = await ProductRepository.filter_products(query, skip, limit)
-    total = await ProductRepository.count_filtered_products(query)
-
-    return {
-        "page": payload.page,
-        "limit": payload.limit,
-        "total": total,
-        "products": [await expand_product(p) for p in products],
-    }
+    projection = ProductRepository.LITE_PROJECTION if payload.lite else None
+    if settings.SPEC_INDEX_ENABLED:
+        # match and count from the bitmap index; Mongo only loads the page
+        count = check_count_mode(payload.count, "exact" if payload.cursor is None else "none")
+        await spec_index.refresh()
+        matched = spec_index.match(payload.productType, payload.specifications)
+        products, meta = await paginate_matches(
+            matched, payload.page, payload.limit, payload.cursor, payload.sort, projection
+        )
+        meta["total"] = None if count == "none" else matched.bit_count()
+        meta["facets"] = spec_index.facets(payload.productType, payload.specifications)
+    else:
+        products, meta = await paginate_products(
+            query, payload.page, payload.limit, payload.cursor, payload.sort, payload.count, projection
+        )
+    if payload.cursor is None:
+        meta["limit"] = payload.limit
+    if payload.lite:
+        return {**meta, "products": await expand_product_lite_batch(products, request)}
+    return {**meta, "products": await expand_product_batch(products)}
 
 
 @router.get("/by-type/{product_type}")
-async def get_products_by_type(product_type: str, page: int = 1, limit: int = 10, request: Request = None):
-    # pagination
-    page = max(page, 1)
-    limit = min(max(limit, 1), 100)
-    skip = (page - 1) * limit
-
+@conditional_get("products", "file_urls")
+async def get_products_by_type(
+    product_type: str,
+    request: Request,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    count: Optional[str] = None,
+):
     query = {"productType": product_type}
+    products, meta = await paginate_products(query, max(page, 1), limit, cursor, sort, count)
 
-    products = await ProductRepository.filter_products(query, skip, limit)
-    total = await ProductRepository.count_filtered_products(query)
-
-    async def hydrate_meta(p: dict, req: Request):
-        cover_task = expand_file_meta(p.get("cover_image"), req)
-        p360_task = expand_file_meta(p.get("product_360_image"), req)
-        video_task = expand_file_meta(p.get("product_3d_video"), req)
-        images_task = expand_file_meta_list(p.get("images", []), req)
-        docs_task = expand_file_meta_list(p.get("documents", []), req)
-        feature_imgs = [expand_file_meta(f.get("image_id"), req) for f in p.get("features", [])]
-        cover, p360, video, images, docs, features_images = await asyncio.gather(
-            cover_task,
-            p360_task,
-            video_task,
-            images_task,
-            docs_task,
-            asyncio.gather(*feature_imgs) if feature_imgs else asyncio.gather()
-        )
-        p["cover_image"] = cover
-        p["product_360_image"] = p360
+    ids = [i for p in products for i in collect_product_file_ids(p)]
+    resolver = await FileResolver(request).load(ids)
+
+    def hydrate_meta(p: dict):
+        p["cover_image"] = resolver.file_meta(p.get("cover_image"))
+        p["product_360_image"] = resolver.file_meta(p.get("product_360_image"))
+        video = resolver.file_meta(p.get("product_3d_video"))
         # ensure video type key retained
         if video is not None:
             video["type"] = "video"
         p["product_3d_video"] = video
-        p["images"] = images
-        p["documents"] = docs
-        for f, img in zip(p.get("features", []), features_images if features_images else []):
-            f["image"] = img
+        p["images"] = resolver.file_meta_list(p.get("images", []))
+        p["documents"] = resolver.file_meta_list(p.get("documents", []))
+        for f in p.get("features", []):
+            f["image"] = resolver.file_meta(f.get("image_id"))
         return p
 
-    expanded = await asyncio.gather(*[hydrate_meta(p, request) for p in products]) if products else []
-
-    return {
-        "page": page,
-        "limit": limit,
-        "total": total,
-        "products": expanded,
-    }
+    return {**meta, "products": [hydrate_meta(p) for p in products]}
@@ -4,6 +4,7 @@ from typing import List
 from app.schemas.quote_schema import QuoteCreate, QuoteResponse
 from app.repository.quote_repository import QuoteRepository
 from app.services.auth_dependency import verify_user
+from app.core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/contact-us", tags=["Contact-us"])
 
@@ -22,10 +23,10 @@ async def create_quote(payload: QuoteCreate):
 @router.get("/", summary="Get all Contact Us requests", description="Returns all Contact Us submissions with count and data")
 async def get_all_quotes():
     quotes = await QuoteRepository.get_all_contacts()
-    return {
+    return FastJSONResponse({
         "count": len(quotes),
         "contact_data": quotes
-    }
+    })
 
 
 # ---------------- GET BY ID (Admin) ----------------
@@ -34,4 +35,4 @@ async def get_quote(quote_id: str):
     quote = await QuoteRepository.get_contact_by_id(quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
-    return quote
+    return FastJSONResponse(quote)
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional
+
+from app.config.config import settings
+from app.core.cache import cached_response
+from app.repository.search_repository import SOURCES
+from app.services.file_resolver import FileResolver, absolute_url
+from app.services.search_index import search_index
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+# where the full document of a hit is served
+HIT_PATHS = {
+    "product": "/products/url/{id}",
+    "industry": "/industries/url/{id}",
+    "news": "/news/url/{id}",
+}
+
+
+def search_hit(hit: dict, resolver: FileResolver, request: Request):
+    image = resolver.file_url(hit["image_id"])
+    return {
+        "type": hit["type"],
+        "id": hit["id"],
+        "title": hit["title"],
+        "snippet": hit["snippet"],
+        "url": absolute_url(HIT_PATHS[hit["type"]].format(id=hit["id"]), request),
+        "image_url": image["url"] if image else None,
+    }
+
+
+@router.get("")
+@cached_response("products", "industries", "news")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[str]] = Query(None, alias="type", description="product, industry and/or news; default all"),
+    limit: int = 20,
+    prefix: bool = Query(True, description="match the last word as a prefix (typeahead)"),
+):
+    """Ranked hits across products, industries and news: ids, titles and URLs only."""
+    kinds = set(types or ())
+    unknown = kinds - set(SOURCES)
+    if unknown:
+        raise HTTPException(400, f"Unknown type: {', '.join(sorted(unknown))}")
+
+    await search_index.refresh()
+    limit = min(max(limit, 1), settings.SEARCH_MAX_LIMIT)
+    total, hits = search_index.search(q, kinds, limit, prefix)
+    resolver = await FileResolver(request).load(h["image_id"] for h in hits)
+    return {
+        "query": q,
+        "total": total,
+        "hits": [search_hit(h, resolver, request) for h in hits],
+    }
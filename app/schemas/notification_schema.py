@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class NotificationCreate(BaseModel):
     user_email: str
@@ -15,3 +16,11 @@ class NotificationOut(BaseModel):
     type: str
     created_at: datetime
     read: bool
+
+class NotificationPage(BaseModel):
+    notifications: list[NotificationOut]
+    next_cursor: Optional[str] = None
+    unread_count: int
+
+class NotificationIds(BaseModel):
+    ids: list[str]
@@ -87,5 +87,11 @@ class ProductCreate(ProductBase):
 class ProductFilterRequest(BaseModel):
     page: int = 1
     limit: int = 10
+    # keyset pagination: "" for the first page, then the returned next_cursor
+    cursor: Optional[str] = None
+    sort: Optional[str] = None
+    count: Optional[str] = None
+    # metadata + URLs only, no base64 content
+    lite: bool = False
     productType: Optional[str] = None
     specifications: Optional[Dict[str, str]] = None
\ No newline at end of file
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class DirectUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1)
+    kind: Literal["image", "doc", "video", "3d-model"]
+    size: int = Field(..., gt=0)
+    content_type: Optional[str] = None
+    category: Optional[str] = None
+
+
+class UploadedPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str
+
+
+class DirectUploadFinalize(BaseModel):
+    # multipart only; when omitted the parts are listed from S3
+    parts: Optional[List[UploadedPart]] = None
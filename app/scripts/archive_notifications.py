@@ -0,0 +1,42 @@
+"""
+Notification retention job.
+
+    python -m app.scripts.archive_notifications [--older-than-days 90]
+    python -m app.scripts.archive_notifications --rebuild-counters
+
+Moves notifications older than NOTIFICATION_ARCHIVE_AFTER_DAYS to
+`notifications_archive` (read ones usually expired earlier through the TTL
+index) and keeps the per-user unread counters in step. Run it from cron;
+it is safe to interrupt and re-run.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from app.repository.notification_repository import NotificationRepository
+
+
+async def run(args):
+    result = {}
+    if args.rebuild_counters:
+        result["unread"] = await NotificationRepository.rebuild_unread_counts()
+    else:
+        result["archived"] = await NotificationRepository.archive_notifications(args.older_than_days)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old notifications")
+    parser.add_argument("--older-than-days", type=int, default=None,
+                        help="defaults to NOTIFICATION_ARCHIVE_AFTER_DAYS")
+    parser.add_argument("--rebuild-counters", action="store_true",
+                        help="recount unread notifications per user instead of archiving")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Builds and checks the Mongo indexes declared by the repositories.
+
+    python -m app.scripts.manage_indexes report
+    python -m app.scripts.manage_indexes apply [--collection products] [--dry-run]
+
+Meant for large collections, where the build should run from a one-off job
+with INDEXES_ON_STARTUP=verify on the app instead of during startup. Safe to
+re-run: existing indexes are left alone and conflicts are only reported.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from app.core.indexes import apply_indexes, index_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or verify registered Mongo indexes")
+    parser.add_argument("command", choices=["apply", "report"])
+    parser.add_argument("--collection", action="append", default=None,
+                        help="limit `apply` to this collection (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="list what `apply` would build")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "apply":
+        result = asyncio.run(apply_indexes(collections=args.collection, dry_run=args.dry_run))
+        failed = any(r["failed"] for r in result.values())
+    else:
+        result = asyncio.run(index_report())
+        failed = any(r["missing"] for r in result.values())
+    print(json.dumps(result, indent=2))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Moves legacy base64 `content` out of the `files` collection into the
+configured storage backend (GridFS by default).
+
+    python -m app.scripts.migrate_file_storage [--dry-run] [--limit N] [--backend local]
+
+Safe to re-run: only documents that still carry inline `content` are touched,
+and each one is rewritten only after its bytes are stored. A blob left behind
+by a run that stopped between the two is replaced.
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import mimetypes
+
+from app.repository.upload_repository import UploadRepository
+from app.services.file_storage import get_file_storage
+
+logger = logging.getLogger("migrate_file_storage")
+
+
+async def migrate(backend: str | None = None, batch_size: int = 10, limit: int | None = None, dry_run: bool = False):
+    storage = get_file_storage(backend)
+    collection = UploadRepository.COLLECTION
+    query = {"content": {"$exists": True}}
+
+    migrated = failed = 0
+    total_bytes = 0
+    cursor = collection.find(query).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    async for doc in cursor:
+        file_id = doc["_id"]
+        try:
+            raw = base64.b64decode(doc["content"])
+            content_type = mimetypes.guess_type(doc.get("filename") or "")[0] or "application/octet-stream"
+            if not dry_run:
+                # the inline copy is still the source of truth; GridFS refuses a second file with this _id
+                await storage.delete(file_id)
+                length = await storage.save(file_id, doc.get("filename"), raw, content_type)
+                await collection.update_one(
+                    {"_id": file_id},
+                    {
+                        "$set": {
+                            "content_type": content_type,
+                            "length": length,
+                            "storage": storage.name,
+                        },
+                        "$unset": {"content": ""},
+                    },
+                )
+            migrated += 1
+            total_bytes += len(raw)
+        except Exception:
+            failed += 1
+            logger.exception(f"Failed to migrate file_id={file_id}")
+
+    logger.info(
+        f"{'Would migrate' if dry_run else 'Migrated'} {migrated} files "
+        f"({total_bytes} bytes) to {storage.name}, {failed} failed"
+    )
+    return {"migrated": migrated, "failed": failed, "bytes": total_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move base64 file content into blob storage")
+    parser.add_argument("--backend", choices=["gridfs", "local"], default=None,
+                        help="storage backend (defaults to FILE_STORAGE_BACKEND)")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(migrate(args.backend, args.batch_size, args.limit, args.dry_run))
+    if result["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
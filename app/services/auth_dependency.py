@@ -1,8 +1,9 @@
-from fastapi import Request, HTTPException, Depends
+from fastapi import Request, HTTPException, Depends, Query
 from fastapi.security import HTTPBearer
 from app.services.auth_service import AuthService
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 async def verify_user(request: Request, credentials = Depends(security)):
     token = credentials.credentials
@@ -13,3 +14,21 @@ async def verify_user(request: Request, credentials = Depends(security)):
 
     request.state.user = payload["sub"]  # email of logged-in user
     return payload
+
+
+async def verify_user_or_token(
+    request: Request,
+    credentials=Depends(optional_security),
+    token: str | None = Query(None),
+):
+    """
+    Like `verify_user`, but also accepts `?token=`: browsers cannot set an
+    Authorization header on an EventSource.
+    """
+    payload = AuthService.verify_token(credentials.credentials if credentials else token)
+
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    request.state.user = payload["sub"]
+    return payload
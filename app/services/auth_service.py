@@ -1,10 +1,44 @@
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
 from jose import jwt
 from app.repository.user_repository import UserRepository
 from app.config.config import settings
+from app.core.cache import LocalTTLCache
+from app.services import password_crypto
+from app.services.password_hasher import password_hasher
 from jose import JWTError
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import hashlib
+import logging
+import time
+pwd_context = password_crypto.crypt_context(settings.BCRYPT_ROUNDS)
+
+# sha256(token) -> verified payload; see AuthService.verify_token
+token_cache = LocalTTLCache(settings.JWT_CACHE_SIZE)
+
+
+def _decode_jose(token: str):
+    try:
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+
+
+def _decode_pyjwt(token: str):
+    import jwt as pyjwt
+
+    try:
+        return pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except pyjwt.PyJWTError:
+        return None
+
+
+def _decoder():
+    if settings.JWT_BACKEND == "pyjwt":
+        try:
+            import jwt as pyjwt  # noqa: F401
+            return _decode_pyjwt
+        except ImportError:
+            logging.error("JWT_BACKEND=pyjwt but PyJWT is not installed; using python-jose")
+    return _decode_jose
 
 
 class AuthService:
@@ -26,13 +60,25 @@ class AuthService:
         if token.startswith("Bearer "):
             token = token.split(" ", 1)[1]
 
-        try:
-            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-            # Optionally you can verify exp etc. jose will raise if exp expired.
-            return payload
-        except JWTError as e:
-            # log if you want: print("Token verification failed:", e)
+        # The admin panel sends the same token on every request; once its
+        # signature has been checked, later calls are a dict lookup. Entries
+        # expire with the token (or after JWT_CACHE_MAX_TTL, whichever is first).
+        key = hashlib.sha256(token.encode()).digest() if settings.JWT_CACHE_SIZE else None
+        if key is not None:
+            cached = token_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        payload = _decoder()(token)
+        if payload is None:
             return None
+        if key is not None:
+            ttl = settings.JWT_CACHE_MAX_TTL
+            if isinstance(payload.get("exp"), (int, float)):
+                ttl = min(ttl, payload["exp"] - time.time())
+            if ttl > 0:
+                token_cache.set(key, dict(payload), ttl)
+        return payload
 
     @staticmethod
     def verify_password(password: str, hashed: str):
@@ -52,7 +98,7 @@ class AuthService:
             if existing_user:
                 return None
 
-            user_data["hashed_password"] = AuthService.hash_password(user_data.pop("password"))
+            user_data["hashed_password"] = await password_hasher.hash(user_data.pop("password"))
             user_data["created_at"] = datetime.utcnow()
 
             await UserRepository.create_user(user_data)
@@ -68,8 +114,12 @@ class AuthService:
         if not user:
             return None
 
-        if not AuthService.verify_password(password, user["hashed_password"]):
+        valid, new_hash = await password_hasher.verify_and_update(password, user.get("hashed_password"))
+        if not valid:
             return None
+        if new_hash:
+            # BCRYPT_ROUNDS changed since this hash was made
+            await UserRepository.update_password_hash(email, new_hash)
 
         await UserRepository.update_login(email, datetime.utcnow())
         token = AuthService.create_token({"sub": email})
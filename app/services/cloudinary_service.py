@@ -3,70 +3,134 @@ from pathlib import Path
 from uuid import uuid4
 import os
 import mimetypes
-from typing import Optional
+import shutil
+from typing import Optional, Union
 import logging
+from app.config.config import settings
+from app.services.upload_stream import SpooledSource
+from app.services.storage_clients import storage_clients
+from app.core.metrics import upload_timer
+
+
+def _open_source(source: Union[bytes, SpooledSource]):
+    # every backend attempt gets a fresh reader positioned at 0
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    return source.reader()
+
+
+def _source_size(source: Union[bytes, SpooledSource]) -> int:
+    return len(source) if isinstance(source, (bytes, bytearray)) else source.size
+
+
+def _transfer_config():
+    from boto3.s3.transfer import TransferConfig
+    cfg = TransferConfig(
+        multipart_threshold=settings.UPLOAD_PART_SIZE,
+        multipart_chunksize=settings.UPLOAD_PART_SIZE,
+        max_concurrency=settings.UPLOAD_MAX_CONCURRENCY,
+        use_threads=settings.UPLOAD_MAX_CONCURRENCY > 1,
+    )
+    # bound the parts buffered in memory to what is actually in flight
+    cfg.max_in_memory_upload_chunks = settings.UPLOAD_MAX_CONCURRENCY
+    return cfg
+
+
+# ---- blocking SDK calls; run on storage_clients' thread pool ----
+def _s3_put(s3, source, bucket: str, key: str, content_type: str):
+    with _open_source(source) as body:
+        s3.upload_fileobj(
+            body,
+            bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=_transfer_config(),
+        )
+
+
+def _cloudinary_put(source, filename: str, resource_type: str):
+    import cloudinary.uploader
+    with _open_source(source) as body:
+        return cloudinary.uploader.upload_large(
+            body,
+            filename=filename,
+            resource_type=resource_type,
+            chunk_size=settings.UPLOAD_PART_SIZE,
+        )
+
+
+def _local_put(source, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f, _open_source(source) as body:
+        shutil.copyfileobj(body, f, settings.UPLOAD_CHUNK_SIZE)
+
+
+def s3_configured() -> bool:
+    return all(os.environ.get(k) for k in ("AWS_S3_BUCKET", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"))
+
+
+def s3_object_key(filename: str, resource_type: str, key_prefix: str | None = None) -> str:
+    """New object key: `key_prefix` or the per-type default prefix, then a random name keeping the extension."""
+    ext = Path(filename).suffix
+    default_prefix = None
+    if not key_prefix:
+        if resource_type == "image":
+            default_prefix = os.environ.get("AWS_S3_IMAGE_PREFIX", "images")
+        elif resource_type == "video":
+            default_prefix = os.environ.get("AWS_S3_VIDEO_PREFIX", "videos")
+        elif resource_type == "raw":
+            default_prefix = os.environ.get("AWS_S3_DOC_PREFIX", "docs")
+    prefix = key_prefix or default_prefix
+    if prefix:
+        return f"{prefix.rstrip('/')}/{uuid4().hex}{ext}"
+    return f"{uuid4().hex}{ext}"
+
+
+def s3_object_url(s3, bucket: str, key: str) -> str:
+    force_presigned = os.environ.get("AWS_S3_FORCE_PRESIGNED", "").lower() in ("1", "true", "yes")
+    if force_presigned:
+        presigned = s3.generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=int(os.environ.get("AWS_S3_PRESIGNED_SECONDS", "3600")),
+        )
+        return presigned
+    base_url = os.environ.get("AWS_S3_PUBLIC_BASE_URL")
+    if base_url:
+        return f"{base_url.rstrip('/')}/{key}"
+    endpoint_url = os.environ.get("AWS_S3_ENDPOINT_URL")
+    if endpoint_url:
+        # S3-compatible store (MinIO, moto...): path-style URL on its endpoint
+        return f"{endpoint_url.rstrip('/')}/{bucket}/{key}"
+    region = os.environ.get("AWS_S3_REGION")
+    if region:
+        return f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
+
 
 async def upload_to_cloudinary(
-    file_bytes: bytes,
+    source: Union[bytes, SpooledSource],
     filename: str,
     resource_type: str,
     key_prefix: str | None = None
 ) -> str:
+    """
+    Streams `source` to S3 (multipart), Cloudinary (chunked) or the local
+    uploads folder, in that order of preference. `source` may be raw bytes or
+    a SpooledSource over an UploadFile, which is read part by part.
+    """
     require_s3 = os.environ.get("AWS_S3_REQUIRED", "").lower() in ("1", "true", "yes")
     bucket = os.environ.get("AWS_S3_BUCKET")
     access_key = os.environ.get("AWS_ACCESS_KEY_ID")
     secret_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
     if bucket and access_key and secret_key:
         try:
-            import boto3
-            from botocore.config import Config
-            connect_timeout = int(os.environ.get("AWS_S3_CONNECT_TIMEOUT", "5"))
-            read_timeout = int(os.environ.get("AWS_S3_READ_TIMEOUT", "20"))
-            max_attempts = int(os.environ.get("AWS_S3_MAX_ATTEMPTS", "2"))
-            cfg = Config(connect_timeout=connect_timeout, read_timeout=read_timeout, retries={"max_attempts": max_attempts, "mode": "standard"})
-            s3 = boto3.client(
-                "s3",
-                region_name=os.environ.get("AWS_S3_REGION"),
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-                config=cfg,
-            )
-            ext = Path(filename).suffix
-            default_prefix = None
-            if not key_prefix:
-                if resource_type == "image":
-                    default_prefix = os.environ.get("AWS_S3_IMAGE_PREFIX", "images")
-                elif resource_type == "video":
-                    default_prefix = os.environ.get("AWS_S3_VIDEO_PREFIX", "videos")
-                elif resource_type == "raw":
-                    default_prefix = os.environ.get("AWS_S3_DOC_PREFIX", "docs")
-            prefix = key_prefix or default_prefix
-            if prefix:
-                key = f"{prefix.rstrip('/')}/{uuid4().hex}{ext}"
-            else:
-                key = f"{uuid4().hex}{ext}"
+            s3 = storage_clients.s3_client()
+            key = s3_object_key(filename, resource_type, key_prefix)
             content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
-            s3.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=file_bytes,
-                ContentType=content_type,
-            )
-            force_presigned = os.environ.get("AWS_S3_FORCE_PRESIGNED", "").lower() in ("1", "true", "yes")
-            if force_presigned:
-                presigned = s3.generate_presigned_url(
-                    ClientMethod="get_object",
-                    Params={"Bucket": bucket, "Key": key},
-                    ExpiresIn=int(os.environ.get("AWS_S3_PRESIGNED_SECONDS", "3600")),
-                )
-                return presigned
-            base_url = os.environ.get("AWS_S3_PUBLIC_BASE_URL")
-            if base_url:
-                return f"{base_url.rstrip('/')}/{key}"
-            region = os.environ.get("AWS_S3_REGION")
-            if region:
-                return f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
-            return f"https://{bucket}.s3.amazonaws.com/{key}"
+            with upload_timer("s3", _source_size(source)):
+                await storage_clients.run(_s3_put, s3, source, bucket, key, content_type)
+            return s3_object_url(s3, bucket, key)
         except Exception as e:
             logging.exception(f"S3 upload failed bucket={bucket} region={os.environ.get('AWS_S3_REGION')} filename={filename}")
             if require_s3:
@@ -77,7 +141,6 @@ async def upload_to_cloudinary(
     try:
         # Lazy import to avoid hard failure when package missing
         import cloudinary
-        import cloudinary.uploader
 
         # Configure if env available
         cloudinary_url = os.environ.get("CLOUDINARY_URL")
@@ -96,11 +159,8 @@ async def upload_to_cloudinary(
             else:
                 raise Exception("Cloudinary not configured")
 
-        result = cloudinary.uploader.upload(
-            BytesIO(file_bytes),
-            filename=filename,
-            resource_type=resource_type
-        )
+        with upload_timer("cloudinary", _source_size(source)):
+            result = await storage_clients.run(_cloudinary_put, source, filename, resource_type)
         return result["secure_url"]
     except Exception as e:
         logging.exception(f"Cloudinary upload failed filename={filename} resource_type={resource_type}")
@@ -112,10 +172,8 @@ async def upload_to_cloudinary(
         else:
             root = Path(__file__).resolve().parents[2]
             uploads = root / "uploads"
-        uploads.mkdir(parents=True, exist_ok=True)
         ext = Path(filename).suffix
         unique = f"{uuid4().hex}{ext}"
-        path = uploads / unique
-        with open(path, "wb") as f:
-            f.write(file_bytes)
+        with upload_timer("local", _source_size(source)):
+            await storage_clients.run(_local_put, source, uploads / unique)
         return f"/uploads/{unique}"
@@ -0,0 +1,111 @@
+"""
+Presigned browser-to-S3 uploads: the API only mints URLs and records the
+result, the bytes never pass through a worker.
+
+    POST /upload/direct                   -> presigned POST, or multipart part URLs
+    (browser sends the file to S3)
+    POST /upload/direct/{id}/finalize     -> checks the object, writes `file_urls`
+
+Everything here is a blocking boto3 call; run it through
+`storage_clients.run`. Multipart uploads that are never finalized are
+aborted by the bucket's AbortIncompleteMultipartUpload lifecycle rule,
+which should be set on any bucket used for this.
+"""
+import math
+from pathlib import Path
+
+# kind -> (resource_type for s3_object_key, default key prefix, allowed extensions)
+DIRECT_UPLOAD_KINDS = {
+    "image": ("image", None, None),
+    "doc": ("raw", None, None),
+    "video": ("video", None, None),
+    "3d-model": ("raw", "product-3d-models", {".glb"}),
+}
+
+MAX_PARTS = 10000  # S3 limit per multipart upload
+
+
+def check_extension(kind: str, filename: str) -> bool:
+    allowed = DIRECT_UPLOAD_KINDS[kind][2]
+    return allowed is None or Path(filename).suffix.lower() in allowed
+
+
+def part_plan(size: int, part_size: int):
+    """(part size, part count), growing the parts when the file would need more than MAX_PARTS."""
+    part_size = max(part_size, math.ceil(size / MAX_PARTS))
+    return part_size, max(math.ceil(size / part_size), 1)
+
+
+def presign_post(s3, bucket: str, key: str, content_type: str, size: int, expires: int):
+    # the policy pins the exact size and type that were declared
+    return s3.generate_presigned_post(
+        Bucket=bucket,
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[{"Content-Type": content_type}, ["content-length-range", size, size]],
+        ExpiresIn=expires,
+    )
+
+
+def start_multipart(s3, bucket: str, key: str, content_type: str, parts: int, expires: int):
+    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+    urls = [
+        {
+            "part_number": n,
+            "url": s3.generate_presigned_url(
+                ClientMethod="upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": n},
+                ExpiresIn=expires,
+            ),
+        }
+        for n in range(1, parts + 1)
+    ]
+    return upload_id, urls
+
+
+def list_parts(s3, bucket: str, key: str, upload_id: str):
+    parts, marker = [], 0
+    while True:
+        page = s3.list_parts(Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker)
+        parts += [{"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in page.get("Parts", [])]
+        if not page.get("IsTruncated"):
+            return parts
+        marker = page["NextPartNumberMarker"]
+
+
+def complete_multipart(s3, bucket: str, key: str, upload_id: str, part_count: int, parts: list | None) -> bool:
+    """
+    `parts` as reported by the browser ([{part_number, etag}]); listed from
+    S3 when None. False, with the upload left open, unless parts 1..part_count
+    are all there: S3 would otherwise complete a truncated object.
+    """
+    if parts is None:
+        parts = list_parts(s3, bucket, key, upload_id)
+    else:
+        parts = [{"PartNumber": p["part_number"], "ETag": p["etag"]} for p in parts]
+    parts = sorted({p["PartNumber"]: p for p in parts}.values(), key=lambda p: p["PartNumber"])
+    if [p["PartNumber"] for p in parts] != list(range(1, part_count + 1)):
+        return False
+    s3.complete_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+    )
+    return True
+
+
+def abort_multipart(s3, bucket: str, key: str, upload_id: str):
+    s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+
+
+def object_size(s3, bucket: str, key: str):
+    """Size of the stored object, or None when it is not there."""
+    from botocore.exceptions import ClientError
+    try:
+        return s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def delete_object(s3, bucket: str, key: str):
+    s3.delete_object(Bucket=bucket, Key=key)
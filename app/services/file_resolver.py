@@ -0,0 +1,173 @@
+import asyncio
+from typing import Iterable, Optional
+
+from fastapi import Request
+
+from app.repository.upload_repository import UploadRepository
+from app.repository.file_url_repository import FileUrlRepository
+
+
+def absolute_url(url_value, request: Optional[Request]):
+    if request is not None and isinstance(url_value, str) and url_value.startswith("/"):
+        return str(request.base_url) + url_value.lstrip("/")
+    return url_value
+
+
+def variant_list(url_doc: Optional[dict], request: Optional[Request]):
+    """srcset-style list of an image's stored variants, smallest first."""
+    variants = (url_doc or {}).get("variants") or []
+    return [
+        {
+            "url": absolute_url(v.get("url"), request),
+            "width": v.get("width"),
+            "height": v.get("height"),
+            "format": v.get("format"),
+            "type": v.get("content_type"),
+        }
+        for v in sorted(variants, key=lambda v: (v.get("format") or "", v.get("width") or 0))
+    ]
+
+
+def collect_product_file_ids(product: dict):
+    ids = [
+        product.get("cover_image"),
+        product.get("product_360_image"),
+        product.get("product_3d_video"),
+    ]
+    ids += product.get("images", []) or []
+    ids += product.get("documents", []) or []
+    ids += [f.get("image_id") for f in product.get("features", []) or []]
+    return [str(i) for i in ids if i]
+
+
+class FileResolver:
+    """
+    Resolves every file reference on a page with one `$in` query per
+    collection (`files` and/or `file_urls`) and serves the expanded
+    objects from an in-memory map.
+
+    Usage:
+        resolver = await FileResolver(request).load(ids)
+        resolver.file_url(product["cover_image"])
+    """
+
+    def __init__(self, request: Optional[Request] = None, with_meta: bool = False, with_content: bool = False):
+        self.request = request
+        # also read `files` metadata, not just `file_urls`
+        self.with_meta = with_meta or with_content
+        # ... plus each file's bytes as base64 `content` (the legacy `file_with_url` shape)
+        self.with_content = with_content
+        self.files: dict = {}
+        self.urls: dict = {}
+
+    async def load(self, file_ids: Iterable[str]):
+        ids = list(dict.fromkeys(str(i) for i in file_ids if i))
+        if not ids:
+            return self
+        if self.with_meta:
+            self.files, self.urls = await asyncio.gather(
+                UploadRepository.get_files_by_ids(ids, include_content=self.with_content),
+                FileUrlRepository.get_urls_by_file_ids(ids),
+            )
+        else:
+            self.urls = await FileUrlRepository.get_urls_by_file_ids(ids)
+        return self
+
+    # ---------------- {id, filename, content, url, type} ----------------
+    def file_with_url(self, file_id: Optional[str]):
+        if not file_id:
+            return None
+        base = self.files.get(str(file_id))
+        url_doc = self.urls.get(str(file_id))
+        if not base and not url_doc:
+            return None
+        res = {}
+        if base:
+            res.update(
+                {
+                    "id": base["_id"],
+                    "filename": base["filename"],
+                    "content": base.get("content"),
+                }
+            )
+        else:
+            res.update({"id": file_id, "filename": url_doc.get("filename")})
+        if url_doc:
+            res.update({"url": url_doc.get("url"), "type": url_doc.get("type")})
+            if url_doc.get("variants"):
+                res["variants"] = variant_list(url_doc, self.request)
+        return res
+
+    def file_with_url_list(self, ids: list[str]):
+        return [self.file_with_url(i) for i in ids or [] if i]
+
+    # ---------------- {file_id, filename, url} ----------------
+    def file_url(self, file_id: Optional[str]):
+        if not file_id:
+            return None
+        f = self.urls.get(str(file_id))
+        if not f:
+            return None
+        res = {
+            "file_id": str(file_id),
+            "filename": f.get("filename"),
+            "url": absolute_url(f.get("url"), self.request),
+        }
+        if f.get("variants"):
+            res["variants"] = variant_list(f, self.request)
+        return res
+
+    def file_url_list(self, ids: list[str]):
+        return [self.file_url(i) for i in ids or [] if i]
+
+    def video(self, file_id: Optional[str]):
+        res = self.file_url(file_id)
+        if res is not None:
+            res["type"] = "video"
+        return res
+
+    # ---------------- {id, filename, url, content=None} ----------------
+    def file_meta(self, file_id: Optional[str]):
+        if not file_id:
+            return None
+        f = self.urls.get(str(file_id))
+        if not f:
+            return {"id": str(file_id), "filename": None, "content": None}
+        res = {
+            "id": str(file_id),
+            "filename": f.get("filename"),
+            "url": absolute_url(f.get("url"), self.request),
+            "content": None,
+        }
+        if f.get("variants"):
+            res["variants"] = variant_list(f, self.request)
+        return res
+
+    def file_meta_list(self, ids: list[str]):
+        return [self.file_meta(i) for i in ids or [] if i]
+
+    # ---------------- {id, filename, content_type, length, url, content_url} ----------------
+    def file_lite(self, file_id: Optional[str]):
+        """Metadata only; the bytes are fetched lazily from `content_url` (GET /{file_id})."""
+        if not file_id:
+            return None
+        base = self.files.get(str(file_id))
+        url_doc = self.urls.get(str(file_id))
+        if not base and not url_doc:
+            return None
+        base = base or {}
+        url_doc = url_doc or {}
+        res = {
+            "id": str(file_id),
+            "filename": base.get("filename") or url_doc.get("filename"),
+            "content_type": base.get("content_type"),
+            "length": base.get("length"),
+            "url": absolute_url(url_doc.get("url"), self.request),
+            "content_url": absolute_url(f"/{file_id}", self.request) if base else None,
+        }
+        if url_doc.get("variants"):
+            res["variants"] = variant_list(url_doc, self.request)
+        return res
+
+    def file_lite_list(self, ids: list[str]):
+        return [f for i in ids or [] if i and (f := self.file_lite(i))]
@@ -0,0 +1,158 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from app.config.config import settings
+from app.config.database import db
+
+ChunkSource = Union[bytes, bytearray, memoryview, AsyncIterable[bytes]]
+
+
+async def iter_chunks(source: ChunkSource, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Yield `source` as chunks, whether it is an in-memory buffer or already an async stream."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        size = chunk_size or settings.FILE_STREAM_CHUNK_SIZE
+        view = memoryview(source)
+        for offset in range(0, len(view), size):
+            yield bytes(view[offset:offset + size])
+        return
+    async for chunk in source:
+        if chunk:
+            yield chunk
+
+
+class FileStorage:
+    """
+    Raw-bytes blob store used for the `files` collection.
+
+    Documents in `files` only hold metadata plus the name of the backend
+    (`storage`) the bytes were written to, so reads keep working after the
+    configured backend changes.
+    """
+
+    name = ""
+
+    async def save(self, file_id: str, filename: str, source: ChunkSource, content_type: Optional[str] = None) -> int:
+        """Store the bytes of `source` under `file_id` and return the number of bytes written."""
+        raise NotImplementedError
+
+    def stream(self, file_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield the stored bytes from `start` to `end` (inclusive)."""
+        raise NotImplementedError
+
+    async def delete(self, file_id: str):
+        raise NotImplementedError
+
+
+class GridFSStorage(FileStorage):
+    name = "gridfs"
+
+    def __init__(self, database=None, bucket_name: Optional[str] = None):
+        self.bucket = AsyncIOMotorGridFSBucket(
+            database if database is not None else db,
+            bucket_name=bucket_name or settings.GRIDFS_BUCKET,
+        )
+
+    async def save(self, file_id, filename, source, content_type=None):
+        grid_in = self.bucket.open_upload_stream_with_id(
+            file_id, filename, metadata={"content_type": content_type}
+        )
+        length = 0
+        try:
+            async for chunk in iter_chunks(source):
+                await grid_in.write(chunk)
+                length += len(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return length
+
+    async def stream(self, file_id, start=0, end=None):
+        grid_out = await self.bucket.open_download_stream(file_id)
+        last = grid_out.length - 1 if end is None else min(end, grid_out.length - 1)
+        grid_out.seek(start)
+        remaining = last - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(settings.FILE_STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, file_id):
+        try:
+            await self.bucket.delete(file_id)
+        except NoFile:
+            pass
+
+
+class LocalDiskStorage(FileStorage):
+    """Stand-in backend that keeps blobs on local disk (dev, tests, single-node installs)."""
+
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None):
+        root = root or settings.FILE_STORAGE_DIR
+        self.root = Path(root) if root else Path(__file__).resolve().parents[2] / "storage"
+
+    def _path(self, file_id: str):
+        return self.root / file_id[:2] / file_id
+
+    async def save(self, file_id, filename, source, content_type=None):
+        path = self._path(file_id)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        fh = await asyncio.to_thread(open, tmp, "wb")
+        length = 0
+        try:
+            async for chunk in iter_chunks(source):
+                await asyncio.to_thread(fh.write, chunk)
+                length += len(chunk)
+        except BaseException:
+            await asyncio.to_thread(fh.close)
+            await asyncio.to_thread(tmp.unlink, True)
+            raise
+        await asyncio.to_thread(fh.close)
+        await asyncio.to_thread(os.replace, tmp, path)
+        return length
+
+    async def stream(self, file_id, start=0, end=None):
+        path = self._path(file_id)
+        fh = await asyncio.to_thread(open, path, "rb")
+        try:
+            size = os.fstat(fh.fileno()).st_size
+            last = size - 1 if end is None else min(end, size - 1)
+            await asyncio.to_thread(fh.seek, start)
+            remaining = last - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(fh.read, min(settings.FILE_STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(fh.close)
+
+    async def delete(self, file_id):
+        await asyncio.to_thread(self._path(file_id).unlink, True)
+
+
+_BACKENDS = {
+    GridFSStorage.name: GridFSStorage,
+    LocalDiskStorage.name: LocalDiskStorage,
+}
+_instances: dict = {}
+
+
+def get_file_storage(name: Optional[str] = None) -> FileStorage:
+    name = (name or settings.FILE_STORAGE_BACKEND).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown file storage backend: {name}")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
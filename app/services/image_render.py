@@ -0,0 +1,69 @@
+"""
+CPU-bound image work, run in worker processes by `image_variants`.
+
+Kept free of app imports so spawned workers start quickly.
+"""
+from io import BytesIO
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+
+def supported_formats(formats):
+    from PIL import features
+
+    out = []
+    for fmt in formats:
+        if fmt in ("jpeg", "png") or features.check(fmt):
+            out.append(fmt)
+    return out
+
+
+def render_variants(data: bytes, widths, formats, quality: int, max_pixels: int):
+    """
+    Decodes `data` once and encodes it at every width in `widths` (never
+    upscaled) in every format of `formats`. Returns a list of
+    {"width", "height", "format", "content_type", "data"}; empty for inputs
+    that are not still raster images.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        img = Image.open(BytesIO(data))
+        if getattr(img, "is_animated", False) or img.format in ("SVG", "ICO"):
+            return []
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except (OSError, Image.DecompressionBombError, ValueError):
+        return []
+
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+    formats = supported_formats(formats)
+    targets = sorted({w for w in widths if w < img.width}, reverse=True) or [img.width]
+
+    variants = []
+    current = img
+    for width in targets:
+        height = max(1, round(img.height * width / img.width))
+        if width != current.width:
+            # downscale from the previous (larger) step; cheaper than from the original
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            frame = current.convert("RGB") if fmt == "jpeg" and current.mode == "RGBA" else current
+            buf = BytesIO()
+            frame.save(buf, format=fmt.upper(), quality=quality)
+            variants.append({
+                "width": width,
+                "height": height,
+                "format": fmt,
+                "content_type": CONTENT_TYPES[fmt],
+                "data": buf.getvalue(),
+            })
+    return variants
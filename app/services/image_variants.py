@@ -0,0 +1,116 @@
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Union
+
+from app.config.config import settings
+from app.services.cloudinary_service import upload_to_cloudinary
+from app.services.image_render import render_variants
+from app.services.storage_clients import storage_clients
+from app.services.upload_stream import SpooledSource
+
+logger = logging.getLogger("image_variants")
+
+
+class ImageVariantPool:
+    """
+    Process pool for resizing / re-encoding uploads, so decoding large
+    images neither blocks the event loop nor competes for the GIL with
+    request handling. Workers are spawned (not forked) because the parent
+    already runs Motor and storage threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_VARIANT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def executor(self):
+        return self._executor or self.start()._executor
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM on a huge image); start a fresh pool next time
+            with self._lock:
+                self._executor = None
+            raise
+
+
+# Global instance
+image_variant_pool = ImageVariantPool()
+
+
+def variants_available():
+    return settings.IMAGE_VARIANTS_ENABLED and importlib.util.find_spec("PIL") is not None
+
+
+async def generate_image_variants(
+    source: Union[bytes, SpooledSource],
+    filename: str,
+    key_prefix: str | None = None,
+):
+    """
+    Renders the configured widths / formats of an uploaded image and stores
+    each through `upload_to_cloudinary`. Returns the `file_urls` variant
+    entries ({url, width, height, format, content_type}); an empty list if
+    the file is not a raster image or anything fails.
+    """
+    if not variants_available():
+        return []
+    try:
+        if isinstance(source, SpooledSource):
+            data = await storage_clients.run(source.read_at, 0, source.size)
+        else:
+            data = bytes(source)
+        rendered = await image_variant_pool.run(
+            render_variants,
+            data,
+            settings.IMAGE_VARIANT_WIDTHS,
+            settings.IMAGE_VARIANT_FORMATS,
+            settings.IMAGE_VARIANT_QUALITY,
+            settings.IMAGE_MAX_PIXELS,
+        )
+    except Exception:
+        logger.exception(f"Rendering image variants failed filename={filename}")
+        return []
+
+    stem = Path(filename).stem or "image"
+    prefix = key_prefix or settings.IMAGE_VARIANT_PREFIX
+
+    async def store(v):
+        url = await upload_to_cloudinary(
+            v["data"], f"{stem}-{v['width']}w.{v['format']}", resource_type="image", key_prefix=prefix
+        )
+        return {k: v[k] for k in ("width", "height", "format", "content_type")} | {"url": url}
+
+    results = await asyncio.gather(*[store(v) for v in rendered], return_exceptions=True)
+    variants = []
+    for res in results:
+        if isinstance(res, Exception):
+            logger.error(f"Storing image variant failed filename={filename}: {res}")
+        elif res["url"]:
+            variants.append(res)
+    return variants
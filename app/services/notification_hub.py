@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.config.config import settings
+
+logger = logging.getLogger("notification_hub")
+
+
+class Subscription:
+    """
+    One connected stream. A subscriber that falls `maxsize` events behind is
+    cut off (it gets `None`) and is expected to reconnect with Last-Event-ID,
+    catching up from Mongo instead of holding an unbounded backlog here.
+    """
+
+    def __init__(self, user_email: str, maxsize: int):
+        self.user_email = user_email
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def put(self, doc: Optional[dict]):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class NotificationBroker:
+    """
+    Carries stored notifications to every worker's hub. `publish` is called
+    after a batch is written; `listen` runs for the process lifetime and
+    hands every notification to `deliver`.
+    """
+
+    name = "base"
+
+    async def publish(self, docs: list[dict]):
+        raise NotImplementedError
+
+    def attach(self, deliver):
+        """Called by `NotificationHub.start` before `listen` is scheduled."""
+
+    async def listen(self, deliver):
+        pass
+
+
+class MemoryBroker(NotificationBroker):
+    """In-process stand-in: only streams connected to this worker see the events."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.deliver = None
+
+    async def publish(self, docs):
+        if self.deliver is not None:
+            for doc in docs:
+                self.deliver(doc)
+
+    def attach(self, deliver):
+        # set right away: a publish straight after `start` must not be missed
+        self.deliver = deliver
+
+    async def listen(self, deliver):
+        self.deliver = deliver
+        # nothing to consume; stay alive so the hub keeps this one task until shutdown
+        await asyncio.get_running_loop().create_future()
+
+
+class ChangeStreamBroker(NotificationBroker):
+    """
+    Every worker watches inserts on `notifications`, so nothing has to be
+    published explicitly. Needs a replica set or sharded cluster.
+    """
+
+    name = "changestream"
+
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    async def publish(self, docs):
+        pass
+
+    async def listen(self, deliver):
+        if self.collection is None:
+            from app.config.database import db
+            self.collection = db["notifications"]
+        resume_token = None
+        while True:
+            try:
+                async with self.collection.watch(
+                    [{"$match": {"operationType": "insert"}}],
+                    resume_after=resume_token,
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        deliver(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification change stream failed; reconnecting")
+                await asyncio.sleep(settings.NOTIFICATION_STREAM_RETRY_MS / 1000)
+
+
+_BROKERS = {
+    MemoryBroker.name: MemoryBroker,
+    ChangeStreamBroker.name: ChangeStreamBroker,
+}
+
+
+class NotificationHub:
+    """
+    Per-user fan-out of new notifications to open `/notifications/stream`
+    connections. Delivery between workers goes through the configured
+    broker (NOTIFICATION_BROKER).
+    """
+
+    def __init__(self, broker: Optional[NotificationBroker] = None):
+        self._broker = broker
+        self._subscribers: dict = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def broker(self) -> NotificationBroker:
+        if self._broker is None:
+            name = settings.NOTIFICATION_BROKER.lower()
+            if name not in _BROKERS:
+                raise ValueError(f"Unknown notification broker: {name}")
+            self._broker = _BROKERS[name]()
+        return self._broker
+
+    def start(self):
+        if self._listener is None or self._listener.done():
+            self.broker.attach(self.deliver)
+            self._listener = asyncio.create_task(self.broker.listen(self.deliver))
+
+    async def shutdown(self):
+        task, self._listener = self._listener, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        for subs in list(self._subscribers.values()):
+            for sub in list(subs):
+                sub.close()
+
+    async def publish(self, docs: list[dict]):
+        if not docs:
+            return
+        self.start()
+        try:
+            await self.broker.publish(docs)
+        except Exception:
+            logger.exception("Publishing notifications failed")
+
+    def deliver(self, doc: dict):
+        for sub in list(self._subscribers.get(doc.get("user_email"), ())):
+            sub.put(doc)
+
+    @asynccontextmanager
+    async def subscribe(self, user_email: str):
+        self.start()
+        sub = Subscription(user_email, settings.NOTIFICATION_STREAM_QUEUE)
+        self._subscribers[user_email].add(sub)
+        try:
+            yield sub
+        finally:
+            subs = self._subscribers.get(user_email)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[user_email]
+
+    def stats(self):
+        return {
+            "broker": self.broker.name,
+            "users": len(self._subscribers),
+            "connections": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+# Global instance
+notification_hub = NotificationHub()
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.config.config import settings
+
+logger = logging.getLogger("notification_sink")
+
+# duplicate key: a retried batch whose first attempt partly succeeded
+DUPLICATE_KEY = 11000
+
+
+class NotificationSink:
+    """
+    Write-behind buffer for notifications. `submit` only appends to an
+    in-process list; a background task writes the list with `insert_many`
+    once `batch_size` documents are waiting or `interval` seconds have
+    passed. Documents get their `_id` before they are queued, so callers
+    still receive an id and retried batches cannot insert twice.
+    `after_write` gets every document that ended up stored, once, after
+    the retries: its failures never cause a retry of the insert.
+
+    Counters (see `stats()`):
+        submitted / written     - documents accepted / stored
+        dropped                 - rejected because the queue was full, or
+                                  still pending when shutdown timed out
+        batches / failed_batches, failed - batches written / given up on,
+                                  and the documents lost with them
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list], Awaitable[None]],
+        after_write: Optional[Callable[[list], Awaitable[None]]] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.writer = writer
+        self.after_write = after_write
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.interval = interval or settings.NOTIFICATION_FLUSH_INTERVAL
+        self.max_queue = max_queue or settings.NOTIFICATION_QUEUE_MAX
+        self._pending: list = []
+        self._full: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "failed": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._lock is None:
+            self._full = asyncio.Event()
+            self._lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, doc: dict) -> bool:
+        """Queues `doc` (which must already carry its `_id`). False if it was dropped."""
+        self._ensure_started()
+        if len(self._pending) >= self.max_queue:
+            self.metrics["dropped"] += 1
+            if self.metrics["dropped"] % 100 == 1:
+                logger.warning(f"Notification queue full ({self.max_queue}); dropped={self.metrics['dropped']}")
+            return False
+        self._pending.append(doc)
+        self.metrics["submitted"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Notification flush failed")
+
+    async def flush(self):
+        """Writes everything queued so far, including a batch already being written."""
+        if self._lock is None:
+            return  # nothing was ever submitted
+        # a batch `_drain` took off `_pending` is stored only once the lock is free
+        async with self._lock:
+            await self._drain()
+
+    async def _drain(self):
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+            await self._write(batch)
+
+    async def _write(self, batch: list):
+        started = time.perf_counter()
+        remaining, stored = batch, []
+        for attempt in range(settings.NOTIFICATION_FLUSH_RETRIES + 1):
+            try:
+                await self.writer(remaining)
+                stored += remaining
+                remaining = []
+                break
+            except BulkWriteError as e:
+                # duplicates were stored by an earlier attempt that still raised
+                errors = [w for w in e.details.get("writeErrors", []) if w.get("code") != DUPLICATE_KEY]
+                failed = {w["index"] for w in errors}
+                stored += [doc for i, doc in enumerate(remaining) if i not in failed]
+                remaining = [doc for i, doc in enumerate(remaining) if i in failed]
+                if not remaining:
+                    break
+                logger.error(f"Notification batch partly failed ({len(remaining)} docs): {errors[0].get('errmsg')}")
+            except Exception as e:
+                logger.error(f"Notification batch write failed attempt={attempt + 1}: {e}")
+            await asyncio.sleep(min(0.1 * 2 ** attempt, 2.0))
+        self.metrics["written"] += len(stored)
+        self.metrics["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if remaining:
+            self.metrics["failed_batches"] += 1
+            self.metrics["failed"] += len(remaining)
+            logger.error(f"Gave up on {len(remaining)} notifications after {settings.NOTIFICATION_FLUSH_RETRIES + 1} attempts")
+        else:
+            self.metrics["batches"] += 1
+        if stored and self.after_write is not None:
+            try:
+                await self.after_write(stored)
+            except Exception:
+                logger.exception(f"Post-write hook failed for {len(stored)} stored notifications")
+
+    async def shutdown(self, timeout: Optional[float] = None):
+        """Stops the background task and flushes what is left, within `timeout` seconds."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+
+        async def stop_and_drain():
+            # holding the lock means no batch is half-written when the task is cancelled
+            async with self._lock:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await self._drain()
+
+        try:
+            await asyncio.wait_for(stop_and_drain(), timeout or settings.NOTIFICATION_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.metrics["dropped"] += len(self._pending)
+            logger.error(f"Dropped {len(self._pending)} notifications still queued at shutdown")
+            self._pending.clear()
+
+    def stats(self):
+        return {**self.metrics, "pending": len(self._pending)}
@@ -0,0 +1,33 @@
+"""
+bcrypt hashing for `password_hasher`; runs in its threads or worker processes.
+
+Kept free of app imports so spawned workers start quickly.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int):
+    from passlib.context import CryptContext
+
+    # min == max == default: a stored hash with any other cost "needs update"
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def verify_and_update(password: str, hashed: str, rounds: int):
+    """(valid, new_hash); new_hash is set when `hashed` used a different cost."""
+    try:
+        return crypt_context(rounds).verify_and_update(password, hashed)
+    except ValueError:
+        # not a hash passlib recognises
+        return False, None
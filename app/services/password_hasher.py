@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config.config import settings
+from app.services import password_crypto
+
+logger = logging.getLogger("password_hasher")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop. A bcrypt call is 100-300 ms of CPU; on
+    the loop it stalls every other request of the worker.
+
+    PASSWORD_HASH_EXECUTOR:
+        "thread"  - dedicated thread pool (bcrypt releases the GIL)
+        "process" - spawned process pool, for hosts where the API process
+                    should not spend its own CPU on hashing
+        "inline"  - on the event loop (previous behaviour; tests)
+
+    At most PASSWORD_HASH_MAX_PENDING calls may wait for a worker; beyond
+    that login / signup answer 503 instead of queueing without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def mode(self):
+        return settings.PASSWORD_HASH_EXECUTOR
+
+    def start(self):
+        with self._lock:
+            if self._executor is None and self.mode != "inline":
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS,
+                        thread_name_prefix="bcrypt",
+                    )
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        if self.mode == "inline":
+            return fn(*args)
+        if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(status_code=503, detail="Too many concurrent logins, retry shortly",
+                                headers={"Retry-After": "1"})
+        self._pending += 1
+        try:
+            executor = self._executor or self.start()._executor
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(password_crypto.hash_password, password, settings.BCRYPT_ROUNDS)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """(valid, new_hash); new_hash is set when the stored hash should be replaced."""
+        if not hashed:
+            return False, None
+        return await self._run(password_crypto.verify_and_update, password, hashed, settings.BCRYPT_ROUNDS)
+
+
+# Global instance
+password_hasher = PasswordHasher()
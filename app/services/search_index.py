@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from app.config.config import settings
+from app.repository.catalog_version_repository import CatalogVersionRepository
+from app.repository.search_repository import SOURCES, SearchRepository
+
+logger = logging.getLogger("search_index")
+
+TOKEN_RE = re.compile(r"\w+")
+
+# per-field term weights; anything not listed counts 1.0
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "productType": 2.0,
+    "short_description": 1.5,
+}
+# a term reached by prefix expansion scores this fraction of an exact match
+PREFIX_FACTOR = 0.7
+# hits whose title starts with the query are moved up
+TITLE_PREFIX_BOOST = 1.5
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form used for both documents and queries."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def field_text(value) -> str:
+    # specifications / features are lists of dicts; file id fields are skipped
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(field_text(v) for k, v in value.items() if not k.endswith("id"))
+    if isinstance(value, (list, tuple)):
+        return " ".join(field_text(v) for v in value)
+    return ""
+
+
+class SearchIndex:
+    """
+    In-process inverted index over products, industries and news.
+
+    Kept current without a full rebuild: at most every
+    SEARCH_REFRESH_INTERVAL seconds the `catalog_versions` counters are
+    read, and for a collection whose counter moved only the documents
+    whose (version, updated_at) stamp changed are re-read and re-indexed;
+    deleted ones are dropped. Each worker keeps its own copy, and writes
+    made by other workers are picked up the same way.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._postings: dict = defaultdict(dict)  # term -> {doc key: weight}
+        self._doc_terms: dict = {}  # doc key -> its terms, for removal
+        self._titles: dict = {}  # doc key -> title terms
+        self.docs: dict = {}  # doc key -> hit metadata
+        self._stamps: dict = {}  # kind -> {_id: stamp}
+        self._versions: dict = {}  # kind -> catalog version indexed
+        self._vocabulary = None  # sorted terms for prefix lookup, rebuilt lazily
+        self._checked_at = 0.0
+
+    # ---------------- maintenance ----------------
+    async def refresh(self, force: bool = False):
+        if not force and time.monotonic() - self._checked_at < settings.SEARCH_REFRESH_INTERVAL:
+            return
+        async with self._lock:
+            if not force and time.monotonic() - self._checked_at < settings.SEARCH_REFRESH_INTERVAL:
+                return
+            versions = await CatalogVersionRepository.get_versions([s["collection"] for s in SOURCES.values()])
+            for kind, source in SOURCES.items():
+                version = (versions.get(source["collection"]) or {}).get("version", 0)
+                if kind in self._versions and self._versions[kind] == version:
+                    continue
+                await self._sync(kind)
+                # a write racing with _sync bumps the version again, so it is re-synced next time
+                self._versions[kind] = version
+            self._checked_at = time.monotonic()
+
+    async def _sync(self, kind: str):
+        known = self._stamps.get(kind)
+        stamps = await SearchRepository.get_stamps(kind)
+        if known is None:
+            docs = await SearchRepository.get_documents(kind)
+            removed = []
+        else:
+            changed = [i for i, stamp in stamps.items() if known.get(i) != stamp]
+            docs = await SearchRepository.get_documents(kind, changed) if changed else []
+            removed = [i for i in known if i not in stamps]
+
+        # no awaits from here on: searches never see a half-applied sync
+        for _id in removed:
+            self._remove((kind, str(_id)))
+        for doc in docs:
+            self._add(kind, doc)
+        self._stamps[kind] = stamps
+        if docs or removed:
+            logger.info(f"Search index {kind}: {len(docs)} (re)indexed, {len(removed)} removed")
+
+    def _add(self, kind: str, doc: dict):
+        source = SOURCES[kind]
+        key = (kind, str(doc["_id"]))
+        self._remove(key)
+
+        title = doc.get(source["title"]) or ""
+        weights = Counter()
+        for field, weight in (("title", FIELD_WEIGHTS["title"]),
+                              *((f, FIELD_WEIGHTS.get(f, 1.0)) for f in source["text"])):
+            value = title if field == "title" else doc.get(field)
+            for term in tokenize(field_text(value)):
+                weights[term] += weight
+        for term, weight in weights.items():
+            # sublinear term frequency: long descriptions don't drown titles
+            self._postings[term][key] = 1.0 + math.log(weight)
+        self._doc_terms[key] = list(weights)
+        self._titles[key] = tokenize(title)
+        self.docs[key] = {
+            "type": kind,
+            "id": key[1],
+            "title": title,
+            "snippet": (doc.get("short_description") or "")[:settings.SEARCH_SNIPPET_LENGTH],
+            "image_id": next((doc[f] for f in source["image"] if isinstance(doc.get(f), str) and doc[f]), None),
+        }
+        self._vocabulary = None
+
+    def _remove(self, key):
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._titles.pop(key, None)
+        if self.docs.pop(key, None) is not None:
+            self._vocabulary = None
+
+    # ---------------- queries ----------------
+    def _expand(self, prefix: str):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        terms = []
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and len(terms) < settings.SEARCH_MAX_PREFIX_TERMS:
+            term = self._vocabulary[i]
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+            i += 1
+        return terms
+
+    def search(self, query: str, kinds=None, limit: int = 20, prefix: bool = True):
+        """
+        Every query term has to match (the last one as a prefix, for
+        typeahead). Scored by term weight x idf. Returns (total, hits).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return 0, []
+        n_docs = len(self.docs) or 1
+        scores = None
+        for pos, token in enumerate(tokens):
+            terms = self._expand(token) if prefix and pos == len(tokens) - 1 else [token]
+            matches = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + n_docs / len(postings))
+                factor = 1.0 if term == token else PREFIX_FACTOR
+                for key, weight in postings.items():
+                    score = weight * idf * factor
+                    if score > matches.get(key, 0.0):
+                        matches[key] = score
+            scores = matches if scores is None else {k: scores[k] + s for k, s in matches.items() if k in scores}
+            if not scores:
+                return 0, []
+
+        if kinds:
+            scores = {k: s for k, s in scores.items() if k[0] in kinds}
+        for key in scores:
+            title = self._titles.get(key, [])
+            if title[:len(tokens) - 1] == tokens[:-1] and len(title) >= len(tokens) \
+                    and title[len(tokens) - 1].startswith(tokens[-1]):
+                scores[key] *= TITLE_PREFIX_BOOST
+        ranked = sorted(scores, key=lambda k: (-scores[k], self._titles.get(k, [])))
+        return len(ranked), [self.docs[k] for k in ranked[:limit]]
+
+    def stats(self):
+        return {
+            "documents": len(self.docs),
+            "terms": len(self._postings),
+            "versions": dict(self._versions),
+        }
+
+
+# Global instance
+search_index = SearchIndex()
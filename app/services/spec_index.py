@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.config.config import settings
+from app.repository.catalog_version_repository import CatalogVersionRepository
+from app.repository.product_repository import ProductRepository
+
+logger = logging.getLogger("spec_index")
+
+# `updated_at` is stamped by whichever worker wrote, before the write lands;
+# re-read this much before the previous sync to cover clock skew and slow writes
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def spec_pairs(product: dict):
+    pairs = []
+    for spec in product.get("specifications") or []:
+        if isinstance(spec, dict) and isinstance(spec.get("key"), str) and isinstance(spec.get("value"), str):
+            pairs.append((spec["key"], spec["value"]))
+    return pairs
+
+
+def sort_value(value):
+    # Mongo's order for the types a sort field holds: null < numbers < strings
+    if value is None:
+        return (0, "")
+    if isinstance(value, str):
+        return (2, value)
+    return (1, str(value))
+
+
+def iter_bits(bitmap: int):
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class SpecIndex:
+    """
+    In-memory bitmap index for /products/filter. Every product gets a slot;
+    every (spec key, value) pair and every productType has an int with the
+    slots' bits set, so a multi-spec filter is a handful of ANDs and the
+    facet counts are popcounts.
+
+    Kept current from the products catalog version, read at most every
+    SPEC_INDEX_REFRESH_INTERVAL seconds. After a write only the products
+    whose `updated_at` is past the previous sync are re-read, and deletes
+    are found by diffing the collection's `_id`s with the index's.
+
+    Product names are kept as well, so a filtered page can be picked here
+    and only its rows loaded from Mongo.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._slots: dict = {}  # product _id -> slot
+        self._ids: list = []  # slot -> product _id (None once freed)
+        self._free: list = []
+        self._entries: dict = {}  # product _id -> (productType, spec pairs, name)
+        self.specs: dict = {}  # (key, value) -> bitmap
+        self.types: dict = {}  # productType -> bitmap
+        self._values: dict = defaultdict(set)  # key -> values present
+        self.all = 0  # every indexed product
+        self._synced_at: Optional[datetime] = None
+        self._version = None
+        self._checked_at = 0.0
+
+    # ---------------- maintenance ----------------
+    async def refresh(self, force: bool = False):
+        if not force and time.monotonic() - self._checked_at < settings.SPEC_INDEX_REFRESH_INTERVAL:
+            return
+        async with self._lock:
+            if not force and time.monotonic() - self._checked_at < settings.SPEC_INDEX_REFRESH_INTERVAL:
+                return
+            versions = await CatalogVersionRepository.get_versions(["products"])
+            version = (versions.get("products") or {}).get("version", 0)
+            if self._synced_at is None or version != self._version:
+                await self._sync()
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    async def _sync(self):
+        started = datetime.utcnow()
+        since = None if self._synced_at is None else self._synced_at - SYNC_OVERLAP
+        docs = await ProductRepository.get_spec_documents(since)
+        for doc in docs:
+            self._add(doc)
+        removed = []
+        if since is not None:
+            # deletes leave nothing to find by `updated_at`; the _id list is an index-only read
+            ids = await ProductRepository.get_ids()
+            removed = [i for i in self._slots if i not in ids]
+            for _id in removed:
+                self._remove(_id)
+        self._synced_at = started
+        if docs or removed:
+            logger.info(f"Spec index: {len(docs)} products (re)indexed, {len(removed)} removed")
+
+    def _add(self, doc: dict):
+        _id = doc["_id"]
+        self._remove(_id)
+        slot = self._free.pop() if self._free else len(self._ids)
+        if slot == len(self._ids):
+            self._ids.append(_id)
+        else:
+            self._ids[slot] = _id
+        self._slots[_id] = slot
+        bit = 1 << slot
+        self.all |= bit
+
+        product_type = doc.get("productType")
+        pairs = spec_pairs(doc)
+        if product_type is not None:
+            self.types[product_type] = self.types.get(product_type, 0) | bit
+        for pair in pairs:
+            self.specs[pair] = self.specs.get(pair, 0) | bit
+            self._values[pair[0]].add(pair[1])
+        self._entries[_id] = (product_type, pairs, doc.get("name"))
+
+    def _remove(self, _id):
+        slot = self._slots.pop(_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        self.all &= mask
+        product_type, pairs, _ = self._entries.pop(_id)
+        if product_type is not None:
+            self.types[product_type] &= mask
+            if not self.types[product_type]:
+                del self.types[product_type]
+        for pair in pairs:
+            if pair not in self.specs:
+                continue
+            self.specs[pair] &= mask
+            if not self.specs[pair]:
+                del self.specs[pair]
+                self._values[pair[0]].discard(pair[1])
+                if not self._values[pair[0]]:
+                    del self._values[pair[0]]
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    # ---------------- queries ----------------
+    def match(self, product_type: Optional[str] = None, specifications: Optional[dict] = None):
+        bitmap = self.all
+        if product_type:
+            bitmap &= self.types.get(product_type, 0)
+        for pair in (specifications or {}).items():
+            if not bitmap:
+                break
+            bitmap &= self.specs.get(pair, 0)
+        return bitmap
+
+    def ids(self, bitmap: int):
+        return [self._ids[slot] for slot in iter_bits(bitmap)]
+
+    def _sort_key(self, field: str):
+        if field == "_id":
+            return lambda _id: _id
+        return lambda _id: (sort_value(self._entries[_id][2]), _id)
+
+    def page(self, bitmap: int, field: str, direction: int, skip: int, limit: int, after: Optional[dict] = None):
+        """
+        `_id`s of one page of the matches, sorted like Mongo sorts
+        `sort_spec(field, direction)`. `after` is a decoded keyset cursor.
+        """
+        key = self._sort_key(field)
+        ids = self.ids(bitmap)
+        if after is not None:
+            mark = after["id"] if field == "_id" else (sort_value(after.get("v")), after["id"])
+            ids = [i for i in ids if (key(i) > mark if direction == 1 else key(i) < mark)]
+        pick = heapq.nsmallest if direction == 1 else heapq.nlargest
+        return pick(skip + limit, ids, key=key)[skip:]
+
+    def cursor_doc(self, _id):
+        """What `encode_cursor` reads from a product, for a page picked here."""
+        return {"_id": _id, "name": self._entries[_id][2]}
+
+    def facets(self, product_type: Optional[str] = None, specifications: Optional[dict] = None):
+        """
+        Matching products per productType and per spec key / value. Counts
+        for a key are taken with every filter applied except the one on
+        that key, so the UI can show how many products each alternative
+        value would give. Selected values are listed even at 0.
+        """
+        specifications = specifications or {}
+        without_type = self.match(None, specifications)
+        types = {t: (bm & without_type).bit_count() for t, bm in self.types.items()}
+
+        base = self.match(product_type, specifications)
+        spec_facets = {}
+        for key in sorted(self._values):
+            if key in specifications:
+                others = {k: v for k, v in specifications.items() if k != key}
+                key_base = self.match(product_type, others)
+            else:
+                key_base = base
+            counts = {}
+            for value in sorted(self._values[key]):
+                n = (self.specs[(key, value)] & key_base).bit_count()
+                if n or specifications.get(key) == value:
+                    counts[value] = n
+            if counts:
+                spec_facets[key] = counts
+        return {
+            "productType": {t: n for t, n in sorted(types.items()) if n or t == product_type},
+            "specifications": spec_facets,
+        }
+
+    def stats(self):
+        return {"products": len(self._slots), "spec_values": len(self.specs), "version": self._version}
+
+
+# Global instance
+spec_index = SpecIndex()
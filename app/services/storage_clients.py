@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.config.config import settings
+
+
+class StorageClients:
+    """
+    Long-lived storage SDK clients plus the bounded thread pool their
+    blocking calls run on.
+
+    boto3 clients are thread-safe and keep an HTTP connection pool, so one
+    client is built per credential set and shared by every upload instead of
+    a new client (and TLS handshake) per file. Blocking SDK calls go through
+    `run()` so concurrent uploads overlap without stalling the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._s3 = None
+        self._s3_key = None
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.STORAGE_MAX_WORKERS,
+                    thread_name_prefix="storage",
+                )
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._s3 = self._s3_key = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @property
+    def executor(self):
+        return self._executor or self.start()._executor
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    # ---------------- S3 ----------------
+    def s3_client(self):
+        region = os.environ.get("AWS_S3_REGION")
+        access_key = os.environ.get("AWS_ACCESS_KEY_ID")
+        secret_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
+        endpoint_url = os.environ.get("AWS_S3_ENDPOINT_URL") or None
+        key = (region, access_key, secret_key, endpoint_url)
+        with self._lock:
+            if self._s3 is None or self._s3_key != key:
+                self._s3 = self._build_s3(region, access_key, secret_key, endpoint_url)
+                self._s3_key = key
+            return self._s3
+
+    def use_s3_client(self, client):
+        """Pin a specific client (benchmarks / local S3 stand-ins)."""
+        with self._lock:
+            self._s3 = client
+            self._s3_key = (
+                os.environ.get("AWS_S3_REGION"),
+                os.environ.get("AWS_ACCESS_KEY_ID"),
+                os.environ.get("AWS_SECRET_ACCESS_KEY"),
+                os.environ.get("AWS_S3_ENDPOINT_URL") or None,
+            )
+
+    @staticmethod
+    def _build_s3(region, access_key, secret_key, endpoint_url=None):
+        import boto3
+        from botocore.config import Config
+        connect_timeout = int(os.environ.get("AWS_S3_CONNECT_TIMEOUT", "5"))
+        read_timeout = int(os.environ.get("AWS_S3_READ_TIMEOUT", "20"))
+        max_attempts = int(os.environ.get("AWS_S3_MAX_ATTEMPTS", "2"))
+        cfg = Config(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"max_attempts": max_attempts, "mode": "standard"},
+            max_pool_connections=settings.STORAGE_MAX_POOL_CONNECTIONS,
+            # S3-compatible stores (MinIO, moto) usually want path-style URLs
+            s3={"addressing_style": "path"} if endpoint_url else {},
+        )
+        return boto3.client(
+            "s3",
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            # local / S3-compatible stand-in instead of AWS
+            endpoint_url=endpoint_url,
+            config=cfg,
+        )
+
+
+# Global instance
+storage_clients = StorageClients()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import shutil
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from app.config.config import settings
+from app.repository.upload_job_repository import UploadJobRepository
+from app.services.upload_stream import SpooledSource
+
+logger = logging.getLogger("upload_queue")
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+def staging_dir() -> Path:
+    if settings.UPLOAD_STAGING_DIR:
+        return Path(settings.UPLOAD_STAGING_DIR)
+    return Path(__file__).resolve().parents[2] / "storage" / "staging"
+
+
+def _copy(source: SpooledSource, dest: Path):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    with source.reader() as src, open(tmp, "wb") as out:
+        shutil.copyfileobj(src, out, settings.UPLOAD_CHUNK_SIZE)
+    tmp.replace(dest)
+
+
+async def stage_upload(file_id: str, source: SpooledSource) -> str:
+    """
+    Copies a spooled upload out of the request's temp file (deleted when the
+    response is sent) into the staging directory. Returns the staged path.
+    """
+    dest = staging_dir() / file_id
+    await asyncio.to_thread(_copy, source, dest)
+    return str(dest)
+
+
+async def discard_staged(path: Optional[str]):
+    if path:
+        await asyncio.to_thread(Path(path).unlink, True)
+
+
+class JobProgress:
+    """Marks the steps of a running job in `upload_jobs` as they complete."""
+
+    def __init__(self, file_id: str, steps: tuple):
+        self.file_id = file_id
+        self.steps = steps
+        self.done: set = set()
+
+    async def complete(self, step: str):
+        self.done.add(step)
+        await UploadJobRepository.complete_step(self.file_id, step, len(self.done) / len(self.steps))
+
+
+async def tracked(progress: Optional[JobProgress], step: str, aw):
+    """Awaits `aw` and, when it succeeds, records `step` on the job."""
+    result = await aw
+    if progress is not None:
+        try:
+            await progress.complete(step)
+        except Exception as e:
+            logger.error(f"Recording upload step {step} failed file_id={progress.file_id}: {e}")
+    return result
+
+
+class UploadQueue:
+    """
+    Runs background upload jobs. Job state lives in `upload_jobs`, so the
+    queue itself only has to deliver file ids to a handler.
+    """
+
+    name = "base"
+
+    def __init__(self, handler: JobHandler):
+        self.handler = handler
+
+    async def enqueue(self, file_id: str):
+        raise NotImplementedError
+
+    async def start(self):
+        """
+        Re-delivers unfinished jobs. Ones still running in another process
+        are skipped by the claim in the worker unless they have gone stale.
+        """
+        for job in await UploadJobRepository.get_pending_jobs():
+            await self.enqueue(job["_id"])
+
+    async def shutdown(self):
+        pass
+
+
+class LocalUploadQueue(UploadQueue):
+    """
+    In-process queue: `UPLOAD_QUEUE_WORKERS` asyncio tasks in the API
+    process. Workers are started on the first enqueue, so tests can use it
+    without running the lifespan, and `join()` waits until it is drained.
+
+    Jobs running at shutdown are handed back as "queued" for the next
+    start; every UPLOAD_JOB_SWEEP_INTERVAL seconds a sweep re-delivers jobs
+    left behind by a process that died without shutting down.
+    """
+
+    name = "local"
+
+    def __init__(self, handler: JobHandler, workers: Optional[int] = None):
+        super().__init__(handler)
+        self.workers = workers or settings.UPLOAD_QUEUE_WORKERS
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._running: set = set()  # file ids claimed by this process's workers
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            file_id = await self._queue.get()
+            try:
+                job = await UploadJobRepository.claim_job(file_id)
+                if job:
+                    self._running.add(file_id)
+                    try:
+                        await self.handler(job)
+                    finally:
+                        self._running.discard(file_id)
+            except Exception:
+                logger.exception(f"Upload job crashed file_id={file_id}")
+            finally:
+                self._queue.task_done()
+
+    async def enqueue(self, file_id: str):
+        self._ensure_workers()
+        await self._queue.put(file_id)
+
+    async def start(self):
+        await super().start()
+        if settings.UPLOAD_JOB_SWEEP_INTERVAL > 0 and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(settings.UPLOAD_JOB_SWEEP_INTERVAL)
+            try:
+                for job in await UploadJobRepository.get_stale_jobs():
+                    await self.enqueue(job["_id"])
+            except Exception:
+                logger.exception("Upload job sweep failed")
+
+    async def join(self):
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self):
+        # queued jobs stay queued in Mongo; running ones are released so `start()` picks them up at once
+        tasks, self._tasks = self._tasks, []
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+            self._sweeper = None
+        running = list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await UploadJobRepository.release_jobs(running)
+        except Exception:
+            logger.exception(f"Releasing {len(running)} running upload jobs failed")
+        self._running.clear()
+        self._queue = None
+
+
+_BACKENDS = {
+    LocalUploadQueue.name: LocalUploadQueue,
+}
+
+
+def create_upload_queue(handler: JobHandler, name: Optional[str] = None) -> UploadQueue:
+    name = (name or settings.UPLOAD_QUEUE_BACKEND).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown upload queue backend: {name}")
+    return _BACKENDS[name](handler)
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import io
+import os
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from app.config.config import settings
+
+
+class SpooledSource:
+    """
+    Positional view over an upload's spooled temp file.
+
+    Starlette already spools multipart bodies to a temporary file; instead of
+    `await file.read()`-ing that into memory, every consumer (cloud upload,
+    blob storage, hashing...) gets its own cursor and reads it chunk by chunk
+    with `os.pread`, so they can run concurrently without sharing a file
+    offset or a buffer.
+    """
+
+    def __init__(self, upload: UploadFile):
+        self.filename = upload.filename
+        self.content_type = upload.content_type
+        # fileno() rolls a SpooledTemporaryFile over to disk if it is still in memory
+        self.fd = upload.file.fileno()
+        self.size = os.fstat(self.fd).st_size
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        if offset >= self.size or size <= 0:
+            return b""
+        return os.pread(self.fd, min(size, self.size - offset), offset)
+
+    def sha256(self) -> str:
+        """Hex digest of the whole upload (blocking; run it off the event loop)."""
+        digest = hashlib.sha256()
+        offset = 0
+        while offset < self.size:
+            chunk = self.read_at(offset, settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            offset += len(chunk)
+        return digest.hexdigest()
+
+    def reader(self) -> "SpooledReader":
+        return SpooledReader(self)
+
+    async def chunks(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        offset = 0
+        while offset < self.size:
+            chunk = await asyncio.to_thread(self.read_at, offset, chunk_size)
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+
+class SpooledReader(io.RawIOBase):
+    """Independent file-like reader over a SpooledSource (for boto3 / cloudinary)."""
+
+    def __init__(self, source: SpooledSource):
+        super().__init__()
+        self.source = source
+        self.name = source.filename
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.source.size + offset
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def readinto(self, buffer):
+        data = self.source.read_at(self._pos, len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.source.size - self._pos
+        data = self.source.read_at(self._pos, size)
+        self._pos += len(data)
+        return data
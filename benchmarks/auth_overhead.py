@@ -0,0 +1,86 @@
+"""
+Per-request cost of the `verify_user` dependency.
+
+    python benchmarks/auth_overhead.py --requests 2000
+
+Two measurements for every configuration (python-jose / PyJWT, token
+cache on / off):
+
+- `verify_token_us`: AuthService.verify_token called directly with the
+  same token, as the admin panel does on every request.
+- `dependency_overhead_us`: p50 of GET on a route guarded by
+  `Depends(verify_user)` minus the same route without it, through the full
+  ASGI stack. Runs on a bare FastAPI app, so no Mongo is involved.
+
+Prints a JSON report.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from common import boot_app, percentile
+
+
+def time_verify(verify, token: str, n: int):
+    verify(token)  # warm-up (fills the cache when it is on)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        verify(token)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+async def time_routes(client, paths: tuple, headers: dict, n: int):
+    """p50 per path; requests alternate between the paths so drift hits both equally."""
+    latencies = {p: [] for p in paths}
+    for _ in range(n):
+        for path in paths:
+            t0 = time.perf_counter()
+            r = await client.get(path, headers=headers)
+            latencies[path].append((time.perf_counter() - t0) * 1e6)
+            r.raise_for_status()
+    return [percentile(latencies[p], 50) for p in paths]
+
+
+async def main(args):
+    boot_app(JWT_SECRET="bench-secret-bench-secret-bench-secret")
+    import httpx
+    from fastapi import Depends, FastAPI
+    from app.config.config import settings
+    from app.services.auth_dependency import verify_user
+    from app.services.auth_service import AuthService, token_cache
+
+    bench = FastAPI()
+
+    @bench.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    @bench.get("/guarded", dependencies=[Depends(verify_user)])
+    async def guarded_route():
+        return {"ok": True}
+
+    token = AuthService.create_token({"sub": "bench@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+    cache_size = settings.JWT_CACHE_SIZE or 1024
+
+    report = {"requests": args.requests}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=bench), base_url="http://bench") as client:
+        await time_routes(client, ("/open", "/guarded"), headers, 50)  # warm-up
+        for backend in ("jose", "pyjwt"):
+            for cached in (False, True):
+                settings.JWT_BACKEND = backend
+                settings.JWT_CACHE_SIZE = cache_size if cached else 0
+                token_cache.clear()
+                open_us, guarded_us = await time_routes(client, ("/open", "/guarded"), headers, args.requests)
+                report[f"{backend}{'_cached' if cached else ''}"] = {
+                    "verify_token_us": round(time_verify(AuthService.verify_token, token, args.requests), 2),
+                    "dependency_overhead_us": round(guarded_us - open_us, 1),
+                }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
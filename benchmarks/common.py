@@ -0,0 +1,157 @@
+"""
+Shared helpers for the offline benchmarks.
+
+`boot_app()` points the app at an in-memory Mongo stand-in (mongomock-motor)
+before any repository is imported, so benchmarks never need a real cluster.
+Pass `mongo_uri` for benchmarks that need server features mongomock lacks
+(aggregation operators) or real round-trip counts. Either way every
+operation is counted by `command_counter`: on a server through a pymongo
+command listener, on mongomock by wrapping its collection methods.
+"""
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from pymongo import monitoring
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server, by name."""
+
+    def __init__(self):
+        self.commands = Counter()
+
+    def reset(self):
+        self.commands.clear()
+
+    @property
+    def total(self):
+        return sum(self.commands.values())
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+command_counter = CommandCounter()
+
+# mongomock collection method -> the server command it stands for
+MOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "estimated_document_count": "count",
+    "distinct": "distinct",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "bulk_write": "bulkWrite",
+}
+
+
+def count_mock_commands():
+    """
+    Makes mongomock report to `command_counter`. Only the outermost call
+    counts (mongomock's find_one calls find internally, and so on).
+    """
+    from mongomock.collection import Collection
+
+    if getattr(Collection, "_bench_counted", False):
+        return
+    nesting = threading.local()
+
+    def counted(method, command):
+        def wrapper(self, *args, **kwargs):
+            depth = getattr(nesting, "depth", 0)
+            if depth == 0:
+                command_counter.commands[command] += 1
+            nesting.depth = depth + 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                nesting.depth = depth
+
+        return wrapper
+
+    for name, command in MOCK_COMMANDS.items():
+        setattr(Collection, name, counted(getattr(Collection, name), command))
+    Collection._bench_counted = True
+
+
+def boot_app(mongo_uri: str | None = None, **env):
+    scratch = tempfile.mkdtemp(prefix="quest-bench-")
+    defaults = {
+        "DB_NAME": "quest_bench",
+        "JWT_SECRET": "bench-secret",
+        "UPLOADS_DIR": os.path.join(scratch, "uploads"),
+        "FILE_STORAGE_BACKEND": "local",
+        "FILE_STORAGE_DIR": os.path.join(scratch, "storage"),
+    }
+    defaults.update(env)
+    for k, v in defaults.items():
+        os.environ.setdefault(k, str(v))
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+    import app.config.database as database
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        database.client = AsyncIOMotorClient(mongo_uri, event_listeners=[command_counter])
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        count_mock_commands()
+        database.client = AsyncMongoMockClient()
+    database.db = database.client[os.environ["DB_NAME"]]
+
+    from app.main import app
+    # product_routes configures INFO logging; keep per-request client logs out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return app, database.db
+
+
+def auth_headers(email: str = "bench@example.com"):
+    from app.services.auth_service import AuthService
+    return {"Authorization": f"Bearer {AuthService.create_token({'sub': email})}"}
+
+
+def rss_mb():
+    """(current, peak) resident set size of this process in MB."""
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024  # bytes there
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        pass
+    return (round(current, 1) if current is not None else None), round(peak_kb / 1024, 1)
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
@@ -0,0 +1,140 @@
+"""
+Proxied vs. direct (presigned) uploads against an S3-compatible store.
+
+    python benchmarks/direct_upload.py --endpoint-url http://127.0.0.1:9000   # MinIO
+    python benchmarks/direct_upload.py --moto --size-mb 40                    # moto server, in-process
+
+Uploads the same file through `POST /upload/videos` (bytes pass through
+the API) and through `POST /upload/direct` + finalize (the client sends the
+bytes to the store itself). Both go through the full ASGI stack. For each
+path it reports the request bytes the API received, the time spent in API
+calls and the total time. Then it reads the object back from the store and
+checks it is byte-identical. Prints a JSON report; it exits non-zero if a
+check fails, so it can also be run as the direct-upload smoke test.
+
+--moto needs `moto[server]`. The bucket is created if it is missing.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import httpx
+
+from common import auth_headers, boot_app
+
+
+class CountingTransport(httpx.ASGITransport):
+    """Adds up the request bodies the app received and the time spent in it."""
+
+    def __init__(self, app):
+        super().__init__(app=app)
+        self.request_bytes = 0
+        self.seconds = 0.0
+
+    async def handle_async_request(self, request):
+        t0 = time.perf_counter()
+        self.request_bytes += len(await request.aread())
+        response = await super().handle_async_request(request)
+        self.seconds += time.perf_counter() - t0
+        return response
+
+
+async def proxied(client, headers, payload):
+    r = await client.post("/upload/videos", files=[("files", ("bench.mp4", payload, "video/mp4"))], headers=headers)
+    r.raise_for_status()
+    return r.json()["data"][0]["url"]
+
+
+async def direct(client, store, headers, payload):
+    r = await client.post("/upload/direct", json={"filename": "bench.mp4", "kind": "video", "size": len(payload)},
+                          headers=headers)
+    r.raise_for_status()
+    plan = r.json()
+    if plan["multipart"]:
+        parts = []
+        for part in plan["parts"]:
+            start = (part["part_number"] - 1) * plan["part_size"]
+            up = await store.put(part["url"], content=payload[start:start + plan["part_size"]])
+            up.raise_for_status()
+            parts.append({"part_number": part["part_number"], "etag": up.headers["etag"]})
+        body = {"parts": parts}
+    else:
+        up = await store.post(plan["url"], data=plan["fields"], files={"file": ("bench.mp4", payload)})
+        up.raise_for_status()
+        body = None
+    r = await client.post(f"/upload/direct/{plan['id']}/finalize", json=body, headers=headers)
+    r.raise_for_status()
+    return r.json()["url"], plan
+
+
+async def main(args):
+    server = None
+    if args.moto:
+        from moto.server import ThreadedMotoServer
+        server = ThreadedMotoServer(ip_address="127.0.0.1", port=args.moto_port)
+        server.start()
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        args.endpoint_url = f"http://127.0.0.1:{args.moto_port}"
+    os.environ.update(
+        AWS_S3_ENDPOINT_URL=args.endpoint_url,
+        AWS_S3_BUCKET=args.bucket,
+        AWS_ACCESS_KEY_ID=os.environ.get("AWS_ACCESS_KEY_ID", "bench"),
+        AWS_SECRET_ACCESS_KEY=os.environ.get("AWS_SECRET_ACCESS_KEY", "bench-secret"),
+        AWS_S3_REGION=os.environ.get("AWS_S3_REGION", "us-east-1"),
+        AWS_S3_REQUIRED="true",
+    )
+    app, db = boot_app()
+    from app.services.storage_clients import storage_clients
+
+    s3 = storage_clients.s3_client()
+    try:
+        s3.head_bucket(Bucket=args.bucket)
+    except Exception:
+        s3.create_bucket(Bucket=args.bucket)
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    headers = auth_headers()
+    report = {"size_mb": args.size_mb, "endpoint_url": args.endpoint_url}
+    ok = True
+    try:
+        async with app.router.lifespan_context(app), httpx.AsyncClient(timeout=None) as store:
+            for name in ("proxied", "direct"):
+                transport = CountingTransport(app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                    t0 = time.perf_counter()
+                    if name == "proxied":
+                        url, plan = await proxied(client, headers, payload), None
+                    else:
+                        url, plan = await direct(client, store, headers, payload)
+                    total = time.perf_counter() - t0
+                key = url.split(f"/{args.bucket}/", 1)[-1]
+                stored = s3.get_object(Bucket=args.bucket, Key=key)["Body"].read()
+                identical = stored == payload
+                ok &= identical
+                report[name] = {
+                    "api_request_bytes": transport.request_bytes,
+                    "api_time_ms": round(transport.seconds * 1000, 1),
+                    "total_ms": round(total * 1000, 1),
+                    "multipart": plan["multipart"] if plan else None,
+                    "identical": identical,
+                }
+    finally:
+        if server:
+            server.stop()
+    print(json.dumps(report, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--endpoint-url", help="S3-compatible endpoint (MinIO, localstack...)")
+    target.add_argument("--moto", action="store_true", help="run a moto S3 server in this process")
+    parser.add_argument("--moto-port", type=int, default=5055)
+    parser.add_argument("--bucket", default="quest-bench-direct")
+    parser.add_argument("--size-mb", type=int, default=80)
+    sys.exit(asyncio.run(main(parser.parse_args())))
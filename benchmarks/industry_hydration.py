@@ -0,0 +1,115 @@
+"""
+/industries/url/ hydration: per-document queries vs. one $lookup aggregation.
+
+    python benchmarks/industry_hydration.py --mongo-uri mongodb://localhost:27017 \
+        --industries 20 --links 8 --requests 30
+
+Needs a real MongoDB (mongomock does not implement the aggregation
+operators); a scratch database is created and dropped. Both paths are run on
+the same seeded data with the response cache off, their bodies are checked
+to be identical, and the report lists Mongo commands and latency per request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from bson import ObjectId
+
+from common import boot_app, command_counter, percentile
+
+
+async def seed(db, industries: int, links: int):
+    file_no = 0
+
+    def file_ids(n):
+        nonlocal file_no
+        ids = [f"file-{file_no + i}" for i in range(n)]
+        file_no += n
+        return ids
+
+    products, clients, certs = [], [], []
+    for n in range(industries * links):
+        ids = file_ids(6)
+        products.append({
+            "_id": ObjectId(), "name": f"Product {n}", "productType": "pump",
+            "cover_image": ids[0], "product_360_image": ids[1], "product_3d_video": ids[2],
+            "images": ids[3:5], "documents": ids[5:],
+            "features": [{"title": "f", "details": "d", "image_id": ids[0]}],
+        })
+        clients.append({"_id": f"client-{n}", "client_name": f"Client {n}", "client_logo": file_ids(1)[0]})
+        certs.append({"_id": f"cert-{n}", "certificate_name": f"Cert {n}", "certificate_logo": file_ids(2)})
+
+    docs = []
+    for n in range(industries):
+        window = slice(n * links, (n + 1) * links)
+        logo, cover, *images = file_ids(5)
+        docs.append({
+            "_id": f"industry-{n}", "industry_name": f"Industry {n}",
+            "industry_logo": logo, "cover_image": cover, "industry_images": images,
+            "client_ids": [c["_id"] for c in clients[window]],
+            "product_ids": [str(p["_id"]) for p in products[window]],
+            "certification_ids": [c["_id"] for c in certs[window]],
+        })
+
+    await db.products.insert_many(products)
+    await db.clients.insert_many(clients)
+    await db.certifications.insert_many(certs)
+    await db.industries.insert_many(docs)
+    await db.file_urls.insert_many([
+        {"file_id": f"file-{i}", "filename": f"file-{i}.png", "url": f"/uploads/file-{i}.png", "type": "image"}
+        for i in range(file_no)
+    ])
+    await db.file_urls.create_index("file_id")
+
+
+async def run(client, path: str, requests: int):
+    latencies, commands, body = [], [], None
+    for _ in range(requests):
+        command_counter.reset()
+        t0 = time.perf_counter()
+        r = await client.get(path)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        commands.append(command_counter.total)
+        r.raise_for_status()
+        body = r.content
+    return {
+        "commands_per_request": max(commands),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }, body
+
+
+async def main(args):
+    app, db = boot_app(mongo_uri=args.mongo_uri, DB_NAME=args.db)
+    import httpx
+    from app.config.config import settings
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    await db.client.drop_database(args.db)
+    await seed(db, args.industries, args.links)
+
+    report = {"industries": args.industries, "links_per_industry": args.links, "requests": args.requests}
+    bodies = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for name, lookup in (("per_document", False), ("lookup", True)):
+                settings.INDUSTRY_LOOKUP_HYDRATION = lookup
+                await run(client, "/industries/url/", 2)  # warm-up
+                report[name], bodies[name] = await run(client, "/industries/url/", args.requests)
+    finally:
+        await db.client.drop_database(args.db)
+
+    report["identical_responses"] = bodies["per_document"] == bodies["lookup"]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="quest_bench_industries")
+    parser.add_argument("--industries", type=int, default=20)
+    parser.add_argument("--links", type=int, default=8, help="clients, products and certifications per industry")
+    parser.add_argument("--requests", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
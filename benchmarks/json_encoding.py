@@ -0,0 +1,147 @@
+"""
+JSON encoding of catalogue pages: jsonable_encoder + stdlib json vs. orjson.
+
+    python benchmarks/json_encoding.py --products 50 --page-size 20 --requests 200
+
+Seeds products with specifications, features, timestamps and image
+variants, then for each page:
+
+- `encode_us`: rendering the endpoint's raw result to a response body, the
+  old way (`JSONResponse(jsonable_encoder(result))`) and with
+  `FastJSONResponse(result)`. Bodies are checked to be identical.
+- `request_p50_ms`: GET through the full ASGI stack with the catalogue
+  wrappers switched between the two encoders (response cache off).
+
+Prints a JSON report.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from common import boot_app, percentile
+
+
+async def seed(db, products: int):
+    now = datetime.utcnow()
+    docs, urls = [], []
+    for n in range(products):
+        ids = [f"file-{n}-{i}" for i in range(8)]
+        for i, fid in enumerate(ids):
+            urls.append({
+                "file_id": fid, "filename": f"{fid}.png", "url": f"/uploads/{fid}.png", "type": "image",
+                "variants": [
+                    {"url": f"/uploads/{fid}-{w}w.{fmt}", "width": w, "height": w * 3 // 4,
+                     "format": fmt, "content_type": f"image/{fmt}"}
+                    for w in (320, 640, 1280) for fmt in ("webp", "jpeg")
+                ],
+            })
+        docs.append({
+            "_id": ObjectId(), "name": f"Centrifugal pump {n}", "productType": "pump",
+            "short_description": "Single-stage end-suction pump. " * 3,
+            "long_description": "Cast iron casing, bronze impeller, mechanical seal. " * 40,
+            "cover_image": ids[0], "product_360_image": ids[1], "product_3d_video": ids[2],
+            "images": ids[3:6], "documents": ids[6:7],
+            "specifications": [{"key": f"spec-{k}", "value": f"{k * 1.5} bar"} for k in range(12)],
+            "features": [{"title": f"Feature {k}", "details": "Runs quietly. " * 5, "image_id": ids[7]} for k in range(4)],
+            "created_by": "admin@example.com",
+            "created_at": now - timedelta(days=n), "updated_at": now, "version": 1,
+        })
+    await db.products.insert_many(docs)
+    await db.file_urls.insert_many(urls)
+    await db.files.insert_many([
+        {"_id": u["file_id"], "filename": u["filename"], "content_type": "image/png", "content": "iVBORw0KGgo=" * 8}
+        for u in urls
+    ])
+
+
+def time_encode(fn, content, n: int):
+    fn(content)  # warm-up
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(content)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return percentile(samples, 50)
+
+
+async def time_requests(client, path: str, n: int):
+    await client.get(path)  # warm-up
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        r = await client.get(path)
+        samples.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+    return percentile(samples, 50)
+
+
+async def main(args):
+    app, db = boot_app(INDUSTRY_LOOKUP_HYDRATION="false")
+    import httpx
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.config.config import settings
+    from app.core import cache, http_cache
+    from app.core.responses import FastJSONResponse
+
+    class LegacyJSONResponse(JSONResponse):
+        # what the catalogue wrappers rendered with before FastJSONResponse
+        def __init__(self, content, *a, **kw):
+            super().__init__(jsonable_encoder(content), *a, **kw)
+
+    captured = []
+
+    class CapturingResponse(FastJSONResponse):
+        def __init__(self, content, *a, **kw):
+            captured.append(content)
+            super().__init__(content, *a, **kw)
+
+    def use(response_class):
+        cache.FastJSONResponse = http_cache.FastJSONResponse = response_class
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    await seed(db, args.products)
+    pages = {
+        "products_url": f"/products/url/?page=1&limit={args.page_size}",
+        "products_full": f"/products/?page=1&limit={args.page_size}",
+        "products_lite": f"/products/?page=1&limit={args.page_size}&lite=true",
+    }
+
+    report = {"products": args.products, "page_size": args.page_size, "requests": args.requests}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, path in pages.items():
+            use(CapturingResponse)
+            captured.clear()
+            (await client.get(path)).raise_for_status()
+            content = captured[-1]
+
+            legacy_body = JSONResponse(jsonable_encoder(content)).body
+            fast_body = FastJSONResponse(content).body
+            entry = {
+                "body_kb": round(len(fast_body) / 1024, 1),
+                "identical_bodies": legacy_body == fast_body,
+                "encode_us": {
+                    "jsonable_encoder_json": round(time_encode(
+                        lambda c: JSONResponse(jsonable_encoder(c)).body, content, args.requests), 1),
+                    "orjson": round(time_encode(lambda c: FastJSONResponse(c).body, content, args.requests), 1),
+                },
+                "request_p50_ms": {},
+            }
+            for label, response_class in (("jsonable_encoder_json", LegacyJSONResponse), ("orjson", FastJSONResponse)):
+                use(response_class)
+                entry["request_p50_ms"][label] = round(await time_requests(client, path, args.requests), 2)
+            report[name] = entry
+    use(FastJSONResponse)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,230 @@
+"""
+Load test of the hot endpoints against a seeded catalogue.
+
+    python benchmarks/loadtest.py --products 200 --industries 20 --requests 200 \\
+        --concurrency 8 --output bench-$(git rev-parse --short HEAD).json
+    python benchmarks/loadtest.py --compare bench-abc1234.json      # after a change
+
+Boots `app.main:app` with its lifespan against mongomock-motor (or a real
+server with --mongo-uri; a scratch database is created and dropped), seeds
+`seed.seed_catalogue` at the given scale and drives each scenario through
+the full ASGI stack with `--concurrency` requests in flight.
+
+Per scenario: throughput, p50 / p99 / max latency, errors, Mongo operations
+per request (mean; by command name in `mongo_ops`) and RSS after the run.
+`peak_rss_mb` is the process peak so far, so it only grows from one
+scenario to the next. The JSON report goes to stdout or --output. With
+--compare, each scenario also gets the change against an earlier report.
+
+mongomock does not implement the `$lookup` pipelines, so /industries/url/
+runs its per-document hydration unless --mongo-uri is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+from common import ROOT, auth_headers, boot_app, command_counter, percentile, rss_mb
+from seed import LOGIN_EMAIL, LOGIN_PASSWORD, seed_catalogue
+
+
+def png_payloads(n: int, size: int):
+    """n distinct PNGs (so upload dedup does not short-circuit the work)."""
+    from PIL import Image
+
+    base = Image.new("RGB", (size, size))
+    base.putdata([((x * 7) % 256, (x * 13) % 256, (x * 31) % 256) for x in range(size * size)])
+    payloads = []
+    for i in range(n):
+        img = base.copy()
+        img.putpixel((0, 0), (i % 256, (i // 256) % 256, (i // 65536) % 256))
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+        payloads.append(buf.getvalue())
+    return payloads
+
+
+def scenarios(args, headers):
+    uploads = []
+    if "upload_images" in args.scenarios:
+        uploads = png_payloads(args.requests + args.warmup, args.upload_px)
+
+    def get(path):
+        return lambda client, i: client.get(path)
+
+    return {
+        "products_url": get("/products/url/"),
+        "products_url_page": get("/products/url/?page=1&limit=20"),
+        "industries_url": get("/industries/url/"),
+        "products_filter": lambda client, i: client.post(
+            "/products/filter", json={"specifications": {"size": "3"}, "lite": True}
+        ),
+        "search": get("/search?q=centri"),
+        "upload_images": lambda client, i: client.post(
+            "/upload/images", files=[("files", (f"bench-{i}.png", uploads[i], "image/png"))], headers=headers
+        ),
+        "auth_login": lambda client, i: client.post(
+            "/auth/login", json={"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD}
+        ),
+    }
+
+
+async def run_scenario(client, make_request, requests: int, concurrency: int, warmup: int):
+    for i in range(warmup):
+        (await make_request(client, requests + i)).raise_for_status()
+
+    command_counter.reset()
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            r = await make_request(client, i)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if r.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    current, peak = rss_mb()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "mongo_ops_per_request": round(command_counter.total / requests, 2),
+        "mongo_ops": dict(sorted(command_counter.commands.items())),
+        "rss_mb": current,
+        "peak_rss_mb": peak,
+    }
+
+
+# metric -> True when higher is better
+COMPARED = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "mongo_ops_per_request": False,
+    "peak_rss_mb": False,
+}
+
+
+def compare(report: dict, baseline: dict):
+    out = {}
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        out[name] = {}
+        for metric, higher_better in COMPARED.items():
+            a, b = before.get(metric), result.get(metric)
+            if a is None or b is None:
+                continue
+            change = round((b - a) / a * 100, 1) if a else None
+            out[name][metric] = {"before": a, "after": b, "change_pct": change,
+                                 "better": None if not change else (change > 0) == higher_better}
+    return out
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    env = {"DB_NAME": args.db, "BCRYPT_ROUNDS": args.bcrypt_rounds, "INDEXES_ON_STARTUP": "apply"}
+    if not args.mongo_uri:
+        env["INDUSTRY_LOOKUP_HYDRATION"] = "false"
+    app, db = boot_app(mongo_uri=args.mongo_uri, **env)
+    import httpx
+    from app.config.config import settings
+    from app.services import password_crypto
+
+    settings.RESPONSE_CACHE_ENABLED = args.response_cache
+    if args.mongo_uri:
+        await db.client.drop_database(args.db)
+    seeded = await seed_catalogue(
+        db, args.products, args.industries, args.links, args.images_per_product,
+        password_hash=password_crypto.hash_password(LOGIN_PASSWORD, settings.BCRYPT_ROUNDS),
+    )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "mongo": "server" if args.mongo_uri else "mongomock",
+            "response_cache": args.response_cache,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "seeded": seeded,
+        },
+        "scenarios": {},
+    }
+    available = scenarios(args, auth_headers())
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                         timeout=None) as client:
+                for name in args.scenarios:
+                    print(f"running {name}...", file=sys.stderr)
+                    report["scenarios"][name] = await run_scenario(
+                        client, available[name], args.requests, args.concurrency, args.warmup
+                    )
+    finally:
+        if args.mongo_uri:
+            await db.client.drop_database(args.db)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["compare"] = compare(report, json.load(f))
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(body + "\n")
+    print(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=None, help="real server instead of mongomock")
+    parser.add_argument("--db", default="quest_bench_load")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--industries", type=int, default=20)
+    parser.add_argument("--links", type=int, default=8, help="clients, certifications and products per industry")
+    parser.add_argument("--images-per-product", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--upload-px", type=int, default=256, help="edge of the uploaded test PNGs")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--response-cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--scenarios", default="products_url,products_url_page,industries_url,products_filter,"
+                                               "search,upload_images,auth_login",
+                        type=lambda s: [x for x in s.split(",") if x])
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(scenarios(argparse.Namespace(scenarios=()), {}))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
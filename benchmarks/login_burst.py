@@ -0,0 +1,109 @@
+"""
+Catalogue latency while a burst of logins is being verified.
+
+    python benchmarks/login_burst.py --logins 64 --concurrency 16 --rounds 12
+
+For every PASSWORD_HASH_EXECUTOR ("inline" = bcrypt on the event loop, the
+previous behaviour; "thread"; "process") a burst of POST /auth/login runs
+while `GET /products/url/` is probed every 10 ms. With hashing on the loop,
+probe p99 grows to roughly one bcrypt call per queued login. The last
+section logs in once with a hash made at a lower cost and checks it was
+re-hashed to `--rounds`. Prints a JSON report.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from common import boot_app, percentile
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench-password"
+PROBE_INTERVAL = 0.01
+
+
+async def burst(client, logins: int, concurrency: int):
+    probe_latencies, login_latencies = [], []
+    done = asyncio.Event()
+
+    async def timed_get(scheduled: float):
+        await client.get("/products/url/")
+        probe_latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    async def probe():
+        # fixed-rate probes timed from when they were due, so a blocked loop
+        # shows up as latency instead of as probes that never got sent
+        pending, due = [], time.perf_counter()
+        while not done.is_set():
+            pending.append(asyncio.create_task(timed_get(due)))
+            due += PROBE_INTERVAL
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        await asyncio.gather(*pending)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with sem:
+            t0 = time.perf_counter()
+            r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            r.raise_for_status()
+            login_latencies.append((time.perf_counter() - t0) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*[login() for _ in range(logins)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return {
+        "logins_per_sec": round(logins / elapsed, 2),
+        "login_p50_ms": round(percentile(login_latencies, 50), 2),
+        "login_p99_ms": round(percentile(login_latencies, 99), 2),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(percentile(probe_latencies, 50) or 0, 2),
+        "probe_p99_ms": round(percentile(probe_latencies, 99) or 0, 2),
+    }
+
+
+async def main(args):
+    app, db = boot_app(BCRYPT_ROUNDS=args.rounds)
+    import httpx
+    from app.config.config import settings
+    from app.services import password_crypto
+    from app.services.password_hasher import password_hasher
+
+    settings.PASSWORD_HASH_WORKERS = args.workers
+    await db.users.insert_one({
+        "email": EMAIL, "firstname": "Bench", "lastname": "User",
+        "hashed_password": password_crypto.hash_password(PASSWORD, args.rounds),
+    })
+    await db.products.insert_many([{"name": f"Product {n}", "productType": "pump"} for n in range(20)])
+
+    report = {"logins": args.logins, "concurrency": args.concurrency,
+              "bcrypt_rounds": args.rounds, "workers": args.workers}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        for mode in ("inline", "thread", "process"):
+            settings.PASSWORD_HASH_EXECUTOR = mode
+            password_hasher.start()
+            await burst(client, 2, 2)  # warm-up (spawns the process workers)
+            report[mode] = await burst(client, args.logins, args.concurrency)
+            password_hasher.shutdown()
+
+        settings.PASSWORD_HASH_EXECUTOR = "thread"
+        await db.users.update_one({"email": EMAIL}, {"$set": {
+            "hashed_password": password_crypto.hash_password(PASSWORD, 4)}})
+        r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        r.raise_for_status()
+        password_hasher.shutdown()
+    stored = (await db.users.find_one({"email": EMAIL}))["hashed_password"]
+    report["rehashed_to_rounds"] = int(stored.split("$")[2])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
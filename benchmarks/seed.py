@@ -0,0 +1,139 @@
+"""
+Synthetic catalogue for the benchmarks, shaped like production data:
+products with specifications, features and files (with `file_urls` entries
+and image variants), industries linked to clients, certifications and
+products, news, and a login user.
+"""
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+LOGIN_EMAIL = "bench-login@example.com"
+LOGIN_PASSWORD = "bench-password"
+
+SPEC_KEYS = ("size", "pressure", "material", "flow", "power", "connection")
+PRODUCT_TYPES = ("pump", "valve", "compressor", "filter", "meter")
+
+
+class FileFactory:
+    def __init__(self, variants: bool):
+        self.variants = variants
+        self.files, self.urls = [], []
+
+    def make(self, kind: str = "image"):
+        fid = f"file-{len(self.files)}"
+        ext = {"image": "png", "video": "mp4", "document": "pdf"}[kind]
+        self.files.append({
+            "_id": fid, "filename": f"{fid}.{ext}", "content_type": f"{kind}/{ext}",
+            "content": "iVBORw0KGgoAAAANSUhEUg==" * 4,
+        })
+        url = {"file_id": fid, "filename": f"{fid}.{ext}", "url": f"/uploads/{fid}.{ext}", "type": kind}
+        if self.variants and kind == "image":
+            url["variants"] = [
+                {"url": f"/uploads/{fid}-{w}w.{fmt}", "width": w, "height": w * 3 // 4,
+                 "format": fmt, "content_type": f"image/{fmt}"}
+                for w in (320, 640, 1280) for fmt in ("webp", "jpeg")
+            ]
+        self.urls.append(url)
+        return fid
+
+
+async def seed_catalogue(
+    db,
+    products: int = 200,
+    industries: int = 20,
+    links: int = 8,
+    images_per_product: int = 4,
+    variants: bool = True,
+    password_hash: str | None = None,
+    rng_seed: int = 7,
+):
+    """
+    Inserts the catalogue into `db` and returns a summary of what was
+    created. `links` is the number of clients, certifications and products
+    each industry references. Deterministic for a given `rng_seed`.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    files = FileFactory(variants)
+
+    product_docs = []
+    for n in range(products):
+        product_docs.append({
+            "_id": ObjectId(f"{n + 1:024x}"),
+            "name": f"{rng.choice(('Centrifugal', 'Diaphragm', 'Screw', 'Gear'))} {PRODUCT_TYPES[n % 5]} {n}",
+            "productType": PRODUCT_TYPES[n % len(PRODUCT_TYPES)],
+            "short_description": "Industrial grade unit for continuous duty. " * 2,
+            "long_description": "Cast casing, balanced impeller, replaceable wear parts. " * 30,
+            "cover_image": files.make(),
+            "product_360_image": files.make(),
+            "product_3d_video": files.make("video"),
+            "images": [files.make() for _ in range(images_per_product)],
+            "documents": [files.make("document")],
+            "specifications": [{"key": k, "value": str(rng.randint(1, 6))} for k in SPEC_KEYS],
+            "features": [
+                {"title": f"Feature {k}", "details": "Low maintenance, long service life. " * 3, "image_id": files.make()}
+                for k in range(3)
+            ],
+            "created_by": "admin@example.com",
+            "created_at": now - timedelta(days=n),
+            "updated_at": now,
+            "version": 1,
+        })
+
+    clients, certs, industry_docs = [], [], []
+    for n in range(industries):
+        window = [rng.randrange(max(products, 1)) for _ in range(links)] if products else []
+        industry_clients = []
+        industry_certs = []
+        for k in range(links):
+            cid = f"client-{n}-{k}"
+            clients.append({"_id": cid, "client_name": f"Client {n}-{k}", "client_logo": files.make(), "version": 1})
+            industry_clients.append(cid)
+            kid = f"cert-{n}-{k}"
+            certs.append({
+                "_id": kid, "certificate_name": f"ISO {9000 + k}",
+                "certificate_logo": [files.make(), files.make()], "version": 1,
+            })
+            industry_certs.append(kid)
+        industry_docs.append({
+            "_id": f"industry-{n}",
+            "industry_name": f"Industry {n}",
+            "short_description": "Solutions for process industries. " * 2,
+            "long_description": "Engineering support from design to commissioning. " * 20,
+            "industry_logo": files.make(),
+            "cover_image": files.make(),
+            "industry_images": [files.make() for _ in range(3)],
+            "client_ids": industry_clients,
+            "product_ids": [str(product_docs[i]["_id"]) for i in window],
+            "certification_ids": industry_certs,
+            "version": 1,
+            "updated_at": now,
+        })
+
+    news = [
+        {"_id": f"news-{n}", "title": f"Plant expansion {n}", "short_description": "Capacity doubled. " * 2,
+         "long_description": "Details of the expansion. " * 20, "news_logo": files.make(),
+         "cover_image": files.make(), "news_images": [files.make()], "version": 1, "updated_at": now}
+        for n in range(max(industries // 2, 1))
+    ]
+
+    for name, docs in (("products", product_docs), ("clients", clients), ("certifications", certs),
+                       ("industries", industry_docs), ("news", news),
+                       ("files", files.files), ("file_urls", files.urls)):
+        if docs:
+            await db[name].insert_many(docs)
+    await db.file_urls.create_index("file_id")
+    if password_hash:
+        await db.users.insert_one({
+            "email": LOGIN_EMAIL, "firstname": "Bench", "lastname": "User", "hashed_password": password_hash,
+        })
+    return {
+        "products": len(product_docs),
+        "industries": len(industry_docs),
+        "clients": len(clients),
+        "certifications": len(certs),
+        "news": len(news),
+        "files": len(files.files),
+    }
@@ -0,0 +1,107 @@
+"""
+Upload throughput vs. latency of other endpoints while uploads are in flight.
+
+    python benchmarks/upload_concurrency.py --uploads 32 --concurrency 8 \
+        --size-kb 512 --s3-latency-ms 200
+
+S3 is simulated by a client whose `upload_fileobj` blocks for
+`--s3-latency-ms` per part, like a real SDK call waiting on the network.
+While the uploads run, a probe loop hits `GET /products/url/`; if blocking
+SDK calls ran on the event loop, probe p99 would grow to roughly the S3
+latency. Prints a JSON report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from common import auth_headers, boot_app, percentile
+
+
+class SlowS3Client:
+    def __init__(self, latency_s: float, part_size: int):
+        self.latency_s = latency_s
+        self.part_size = part_size
+
+    def upload_fileobj(self, body, bucket, key, ExtraArgs=None, Config=None):
+        while body.read(self.part_size):
+            time.sleep(self.latency_s)
+
+    def generate_presigned_url(self, **kwargs):
+        return "https://example.invalid/presigned"
+
+
+async def main(args):
+    os.environ.update(
+        AWS_S3_BUCKET="bench-bucket",
+        AWS_ACCESS_KEY_ID="bench",
+        AWS_SECRET_ACCESS_KEY="bench",
+        AWS_S3_REGION="us-east-1",
+    )
+    app, db = boot_app()
+    import httpx
+    from app.config.config import settings
+    from app.services.storage_clients import storage_clients
+
+    storage_clients.start()
+    storage_clients.use_s3_client(SlowS3Client(args.s3_latency_ms / 1000, settings.UPLOAD_PART_SIZE))
+    headers = auth_headers()
+    payload = os.urandom(args.size_kb * 1024)
+
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/products/url/")
+                probe_latencies.append((time.perf_counter() - t0) * 1000)
+                await asyncio.sleep(0.005)
+
+        sem = asyncio.Semaphore(args.concurrency)
+        upload_latencies = []
+
+        async def upload(i):
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post(
+                    "/upload/images",
+                    files=[("files", (f"bench-{i}.png", payload, "image/png"))],
+                    headers=headers,
+                )
+                r.raise_for_status()
+                upload_latencies.append((time.perf_counter() - t0) * 1000)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*[upload(i) for i in range(args.uploads)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    storage_clients.shutdown()
+    report = {
+        "uploads": args.uploads,
+        "concurrency": args.concurrency,
+        "size_kb": args.size_kb,
+        "s3_latency_ms": args.s3_latency_ms,
+        "storage_max_workers": settings.STORAGE_MAX_WORKERS,
+        "uploads_per_sec": round(args.uploads / elapsed, 2),
+        "upload_p50_ms": round(percentile(upload_latencies, 50), 2),
+        "upload_p99_ms": round(percentile(upload_latencies, 99), 2),
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(percentile(probe_latencies, 50) or 0, 2),
+        "probe_p99_ms": round(percentile(probe_latencies, 99) or 0, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--s3-latency-ms", type=float, default=200)
+    asyncio.run(main(parser.parse_args()))
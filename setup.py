@@ -27,6 +27,9 @@ setup(
         "console_scripts": [
             # Creates 'run-backend' CLI that calls server.app.main:main
             "run-backend = app.main:main",
+            "migrate-file-storage = app.scripts.migrate_file_storage:main",
+            "manage-indexes = app.scripts.manage_indexes:main",
+            "archive-notifications = app.scripts.archive_notifications:main",
         ]
     },
     classifiers=[